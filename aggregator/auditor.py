@@ -16,9 +16,10 @@ import sys
 
 from aggregator.fp_analysis import classify_finding
 from crawlers.db import (
+    DEFAULT_BATCH_SIZE,
     connect,
     init_schema,
-    upsert_audit_override,
+    upsert_audit_overrides,
     upsert_rule_override,
 )
 
@@ -80,6 +81,7 @@ def run_auditor(
     min_confidence: float = 0.8,
     dry_run: bool = False,
     batch_size: int = 5000,
+    write_batch_size: int = DEFAULT_BATCH_SIZE,
 ) -> dict:
     """Classify all findings and write audit overrides.
 
@@ -99,6 +101,7 @@ def run_auditor(
         if not rows:
             break
 
+        pending: list[dict] = []
         for row in rows:
             finding_id, skill_id, rule_id, severity, matched_text = row
             stats["total"] += 1
@@ -127,20 +130,20 @@ def run_auditor(
                 stats["skipped"] += 1
                 continue
 
-            if not dry_run:
-                upsert_audit_override(
-                    conn,
-                    skill_id=skill_id,
-                    rule_id=rule_id,
-                    verdict=verdict,
-                    reason=cls.reason,
-                    auditor="heuristic",
-                    confidence=confidence,
-                    matched_text_hash=_text_hash(matched_text),
-                )
-                stats["written"] += 1
-            else:
-                stats["written"] += 1
+            pending.append({
+                "skill_id": skill_id,
+                "rule_id": rule_id,
+                "verdict": verdict,
+                "reason": cls.reason,
+                "auditor": "heuristic",
+                "confidence": confidence,
+                "matched_text_hash": _text_hash(matched_text),
+            })
+
+        # One chunked multi-row upsert per fetched batch instead of one per row
+        if not dry_run:
+            upsert_audit_overrides(conn, pending, batch_size=write_batch_size)
+        stats["written"] += len(pending)
 
         batch_count += 1
         if batch_count % 10 == 0 and not dry_run:
@@ -163,6 +166,10 @@ def main():
         "--dry-run", action="store_true",
         help="Classify but don't write to DB",
     )
+    parser.add_argument(
+        "--write-batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+        help=f"Overrides per multi-row upsert (default: {DEFAULT_BATCH_SIZE})",
+    )
     args = parser.parse_args()
 
     logging.basicConfig(
@@ -174,7 +181,12 @@ def main():
     init_schema(conn)
 
     logger.info("Running auditor (min_confidence=%.2f, dry_run=%s)", args.min_confidence, args.dry_run)
-    stats = run_auditor(conn, min_confidence=args.min_confidence, dry_run=args.dry_run)
+    stats = run_auditor(
+        conn,
+        min_confidence=args.min_confidence,
+        dry_run=args.dry_run,
+        write_batch_size=args.write_batch_size,
+    )
 
     print(f"\nAuditor complete:")
     print(f"  Total findings:  {stats['total']:,}")
@@ -6,7 +6,7 @@ from __future__ import annotations
 import logging
 from datetime import datetime, timezone
 
-from crawlers.db import upsert_daily_stat
+from crawlers.db import upsert_daily_stats
 
 logger = logging.getLogger("observatory.stats")
 
@@ -30,12 +30,14 @@ def compute_daily_stats(conn, date: str | None = None) -> dict:
     for (registry_id,) in registries:
         stats = _compute_registry_stats(conn, registry_id, date)
         all_stats[registry_id] = stats
-
-        upsert_daily_stat(conn, date, registry_id, **stats)
         logger.info("[%s] %s: %d skills, %d findings, avg score %.1f",
                     date, registry_id, stats["total_skills"],
                     stats["total_findings"], stats["avg_score"])
 
+    upsert_daily_stats(conn, (
+        {"date": date, "registry_id": registry_id, **stats}
+        for registry_id, stats in all_stats.items()
+    ))
     conn.commit()
     return all_stats
 
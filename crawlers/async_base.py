@@ -0,0 +1,271 @@
+"""asyncio crawler engine for Aguara Observatory.
+
+AsyncBaseCrawler keeps everything BaseCrawler does around a crawl (crawl_runs
+bookkeeping, registration, preloaded hashes, crawl_state cache, the single
+writer thread and the manifest) and swaps the download phase for an event
+loop. One pooled keep-alive aiohttp session serves every request, so
+thousands of downloads can be in flight from a single thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from abc import abstractmethod
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from crawlers.base import BaseCrawler
+from crawlers.httpcache import AsyncHttpCache, CachedResponse
+from crawlers.models import CrawlResult
+
+logger = logging.getLogger("observatory.crawler")
+
+USER_AGENT = "AguaraObservatory/0.1 (https://github.com/garagon/aguara-observatory)"
+
+
+class AsyncBaseCrawler(BaseCrawler):
+    """Base class for asyncio registry crawlers.
+
+    Subclasses implement async hooks instead of the blocking ones:
+        - registry_id: str property
+        - adiscover(): async generator of discovered skill dicts
+        - adownload(slug): download a single skill's content
+
+    Inside the hooks, use `self.request(...)` for HTTP so every call shares the
+    pooled session, respects the per-host concurrency limits and feeds
+    429/Retry-After/X-RateLimit-* responses back into the rate limiter, and
+    `await self.rate_limiter.async_wait(url)` instead of `self.rate_limiter.wait()`.
+    `await self.get_cached(url)` is the cached, fully-read GET.
+    The blocking discover()/download() are provided as asyncio.run wrappers
+    for ad-hoc use.
+    """
+
+    # Max concurrent requests per host; hosts not listed use per_host_limit.
+    host_limits: dict[str, int] = {}
+
+    def __init__(
+        self,
+        conn,
+        *,
+        max_concurrency: int = 256,
+        per_host_limit: int = 32,
+        request_timeout_s: float = 30,
+        adaptive: bool = True,
+        **kwargs,
+    ):
+        self.max_concurrency = max_concurrency  # downloads in flight at once (adaptive ceiling)
+        super().__init__(conn, adaptive=adaptive, **kwargs)
+        self.per_host_limit = per_host_limit
+        self.request_timeout_s = request_timeout_s
+        self.session: aiohttp.ClientSession | None = None
+        self._async_cache: AsyncHttpCache | None = None
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    # --- Async hooks ---
+
+    @abstractmethod
+    def adiscover(self) -> AsyncIterator[dict]:
+        """Discover all skills in the registry (async generator of skill dicts)."""
+        ...
+
+    @abstractmethod
+    async def adownload(self, slug: str, **kwargs) -> CrawlResult:
+        """Download content for a single skill."""
+        ...
+
+    def _concurrency_ceiling(self) -> int:
+        return self.max_concurrency
+
+    # --- Blocking wrappers (BaseCrawler interface) ---
+
+    def discover(self) -> list[dict]:
+        """Run adiscover() to completion on a private event loop."""
+        async def collect():
+            async with self._session():
+                return [skill_info async for skill_info in self.adiscover()]
+        return asyncio.run(collect())
+
+    def download(self, slug: str, **kwargs) -> CrawlResult:
+        """Run adownload() for one skill on a private event loop."""
+        async def run():
+            async with self._session():
+                return await self.adownload(slug, **kwargs)
+        return asyncio.run(run())
+
+    # --- HTTP ---
+
+    @asynccontextmanager
+    async def _session(self):
+        """Open the pooled keep-alive session for the duration of a crawl."""
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=0,  # enforced by _host_semaphore instead
+            ttl_dns_cache=300,
+        )
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout_s)
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout, headers={"User-Agent": USER_AGENT},
+        ) as session:
+            self.session = session
+            self._async_cache = AsyncHttpCache(self.http_cache)
+            self._host_semaphores = {}
+            try:
+                yield session
+            finally:
+                self.session = None
+                self._async_cache = None
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).hostname or ""
+        sem = self._host_semaphores.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(self.host_limits.get(host, self.per_host_limit))
+            self._host_semaphores[host] = sem
+        return sem
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Issue a request on the pooled session, within the host's concurrency limit.
+
+        Rate-limit feedback from the response is applied to the host's bucket
+        and, with the status code and any timeout, to the adaptive controller;
+        pacing itself stays with the caller (`await self.rate_limiter.async_wait(url)`).
+        """
+        if self.session is None:
+            raise RuntimeError("request() used outside an open crawler session")
+        async with self._host_semaphore(url):
+            try:
+                resp = await self.session.request(method, url, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if self.concurrency is not None:
+                    self.concurrency.note_failure()
+                raise
+            async with resp:
+                self.rate_limiter.observe(url, resp.status, resp.headers)
+                yield resp
+
+    async def get_cached(self, url: str, **kwargs) -> CachedResponse:
+        """GET `url` through the on-disk HTTP cache, via request().
+
+        Cached URLs are revalidated (a 304 returns the stored body as a 200)
+        or, when fetched recently, served without a request. Raises what
+        request() raises.
+        """
+        if self._async_cache is None:
+            raise RuntimeError("get_cached() used outside an open crawler session")
+        return await self._async_cache.get(self.request, url, **kwargs)
+
+    # --- Engine ---
+
+    def _discover_and_download(self) -> None:
+        asyncio.run(self._acrawl(self.adiscover(), total=None, register=True))
+
+    def _crawl_sequential(self, skills: Iterable[dict], *, total: int | None = None) -> None:
+        self._crawl_concurrent(skills, total=total)
+
+    def _crawl_concurrent(self, skills: Iterable[dict], *, total: int | None = None) -> None:
+        if total is None and isinstance(skills, list):
+            total = len(skills)
+        asyncio.run(self._acrawl(skills, total=total, register=False))
+
+    async def _acrawl(
+        self,
+        skills: Iterable[dict] | AsyncIterable[dict],
+        *,
+        total: int | None,
+        register: bool,
+    ) -> None:
+        """Download skills from a (sync or async) iterable on the event loop.
+
+        At most `max_concurrency` downloads run at once. Results go to the
+        shared writer thread through the bounded queue; DB access never
+        happens on the event loop except for registration batches.
+        """
+        self._load_content_hashes()
+        with self._state_lock:
+            self._ensure_state_loaded()  # keep lazy DB loads off the event loop
+
+        results: queue.Queue = queue.Queue(maxsize=self.write_queue_size)
+        writer_errors: list[BaseException] = []
+        writer = threading.Thread(
+            target=self._writer_loop,
+            args=(results, total, writer_errors),
+            name=f"{self.registry_id}-writer",
+            daemon=True,
+        )
+        writer.start()
+
+        in_flight = self.concurrency or asyncio.Semaphore(self.max_concurrency)
+        acquire = self.concurrency.async_acquire if self.concurrency else in_flight.acquire
+        tasks: set[asyncio.Task] = set()
+
+        async def download_one(skill_info: dict) -> None:
+            slug = skill_info["slug"]
+            kwargs = {k: v for k, v in skill_info.items() if k != "slug"}
+            t0 = time.monotonic()
+            try:
+                try:
+                    item = (slug, await self.adownload(slug, **kwargs), None)
+                except Exception as e:
+                    item = (slug, None, e)
+                if self.concurrency is not None:
+                    self.concurrency.record(time.monotonic() - t0, failed=item[2] is not None)
+            finally:
+                in_flight.release()
+            while True:
+                try:
+                    results.put_nowait(item)
+                    return
+                except queue.Full:
+                    await asyncio.sleep(0.05)  # writer is behind: back-pressure
+
+        try:
+            async with self._session():
+                stream = self._aiter(skills)
+                if register:
+                    stream = self._aregister_stream(stream)
+                async for skill_info in stream:
+                    await acquire()
+                    task = asyncio.create_task(download_one(skill_info))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if tasks:
+                    await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.to_thread(results.put, None)  # sentinel: no more results
+            await asyncio.to_thread(writer.join)
+
+        if writer_errors:
+            raise writer_errors[0]
+
+    @staticmethod
+    async def _aiter(skills: Iterable[dict] | AsyncIterable[dict]) -> AsyncIterator[dict]:
+        if isinstance(skills, AsyncIterable):
+            async for skill_info in skills:
+                yield skill_info
+        else:
+            for skill_info in skills:
+                yield skill_info
+
+    async def _aregister_stream(self, skills: AsyncIterable[dict]) -> AsyncIterator[dict]:
+        """Async counterpart of _register_stream; registration runs off the loop."""
+        pending: list[dict] = []
+        async for skill_info in skills:
+            self.stats["discovered"] += 1
+            self.discovered_slugs.add(skill_info["slug"])
+            pending.append(skill_info)
+            if len(pending) >= self.write_batch_size:
+                await asyncio.to_thread(self._register, pending)
+                pending = []
+            yield skill_info
+        await asyncio.to_thread(self._register, pending)
+        logger.info("[%s] Discovered %d skills", self.registry_id, self.stats["discovered"])
@@ -3,23 +3,36 @@
 from __future__ import annotations
 
 import logging
+import queue
 import threading
 import time
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from crawlers.db import (
+    DEFAULT_BATCH_SIZE,
     ResilientConnection,
-    upsert_skill,
+    upsert_skills,
+    get_content_hashes,
+    get_raw_hashes,
     get_skill_hash,
-    get_crawl_state,
-    set_crawl_state,
+    get_crawl_states,
+    get_live_slugs,
+    mark_skills_deleted,
+    set_crawl_states,
     create_crawl_run,
     finish_crawl_run,
 )
+from crawlers.concurrency import AIMDController
+from crawlers.httpcache import cached_session, shared_cache
 from crawlers.models import CrawlResult
-from crawlers.utils import RateLimiter, content_hash
+from crawlers.normalize import canonicalize, normalizer_tag
+from crawlers.packstore import PackStore, file_name, import_files
+from crawlers.ratelimit import HostRateLimiter
+from crawlers.upstream import upstream_of
+from crawlers.utils import content_hash, shard_matches
 
 logger = logging.getLogger("observatory.crawler")
 
@@ -29,10 +42,23 @@ class BaseCrawler(ABC):
 
     Subclasses must implement:
         - registry_id: str property
-        - discover(): list discovered skill slugs
+        - discover(): list or generator of discovered skill dicts
         - download(slug): download a single skill's content
+
+    `self.rate_limiter.wait(url)` paces requests per host; hosts without an
+    entry in `rate_limits` get their own bucket at `rate_limit_ms`. GETs made
+    with `self.http` go through the on-disk HTTP cache (crawlers.httpcache).
     """
 
+    # {host or host/path prefix: (interval_ms, burst)} for self.rate_limiter
+    rate_limits: dict[str, tuple[int, int]] = {}
+    # Full crawls refuse to tombstone more than this share of live skills at
+    # once; a larger drop is more likely a broken discovery than a purge.
+    max_removed_ratio: float = 0.25
+    # Normalisation pipeline for downloaded content (crawlers.normalize);
+    # None means the registry id
+    content_profile: str | None = None
+
     def __init__(
         self,
         conn: ResilientConnection,
@@ -42,16 +68,61 @@ class BaseCrawler(ABC):
         shard: str | None = None,
         max_workers: int = 1,
         crawl_mode: str = "incremental",
+        write_batch_size: int = DEFAULT_BATCH_SIZE,
+        commit_every: int = 500,
+        progress_every: int = 200,
+        write_queue_size: int = 1000,
+        max_in_flight: int | None = None,
+        adaptive: bool = False,
     ):
         self.conn = conn
         self.output_dir = output_dir or Path(f"data/{self.registry_id}")
-        self.rate_limiter = RateLimiter(rate_limit_ms)
+        self.rate_limiter = HostRateLimiter(rate_limit_ms, limits=self.rate_limits)
+        self.http_cache = shared_cache(self.output_dir)
+        self.http = cached_session(self.http_cache, pool_size=max(10, max_workers))
+        # Crawled content, packed under output_dir/pack/ (crawlers.packstore)
+        self.store = PackStore(self.output_dir)
         self.shard = shard
         self.max_workers = max_workers
         self.crawl_mode = crawl_mode  # "full" | "incremental"
-        self.stats = {"discovered": 0, "downloaded": 0, "skipped": 0, "failed": 0}
+        self.write_batch_size = write_batch_size
+        self.commit_every = commit_every  # results processed between commits
+        self.progress_every = progress_every  # results processed between progress logs
+        self.write_queue_size = write_queue_size  # results buffered before workers block
+        # Downloads submitted but not yet finished; bounds executor memory
+        self.max_in_flight = max_in_flight or max_workers * 4
+        self.stats = {"discovered": 0, "downloaded": 0, "skipped": 0, "failed": 0,
+                      "noise": 0, "renormalised": 0}
         self.changed_slugs: list[str] = []
+        # Slugs seen by discovery this run, diffed against the DB on full crawls
+        self.discovered_slugs: set[str] = set()
+        # False once discovery missed part of the registry (see discovery_incomplete)
+        self.discovery_complete = True
+        self.discovery_diff: dict | None = None
         self._db_lock = threading.Lock()
+        # {skill_id: content_hash} preloaded before downloads start, so change
+        # detection in download threads never touches the DB.
+        self._content_hashes: dict[str, str] | None = None
+        # {skill_id: (raw_hash, normalizer)} preloaded with the content hashes
+        self._raw_hashes: dict[str, tuple[str, str | None]] = {}
+        # crawl_state cache: all keys for the registry loaded on first access,
+        # writes tracked as dirty and flushed in bulk on each commit.
+        self._state: dict[str, str] | None = None
+        self._state_dirty: set[str] = set()
+        self._state_lock = threading.Lock()
+        # crawl_state writes held back until every download finished (set_state_after_crawl)
+        self._deferred_state: dict[str, str] = {}
+        # content_hash updates buffered by _process_result, written in bulk
+        self._pending_hashes: list[dict] = []
+        # Adaptive download concurrency (AIMD), capped at the engine's ceiling
+        self.concurrency: AIMDController | None = None
+        if adaptive:
+            self.concurrency = AIMDController(self._concurrency_ceiling(), name=self.registry_id)
+            self.rate_limiter.on_status = self.concurrency.note_status
+
+    def _concurrency_ceiling(self) -> int:
+        """Upper bound for the adaptive controller: the worker pool size."""
+        return self.max_workers
 
     @property
     @abstractmethod
@@ -60,11 +131,12 @@ class BaseCrawler(ABC):
         ...
 
     @abstractmethod
-    def discover(self) -> list[dict]:
+    def discover(self) -> Iterable[dict]:
         """Discover all skills in the registry.
 
-        Returns list of dicts with at least 'slug' key.
-        May also include 'name', 'url', 'metadata'.
+        Returns (or yields) dicts with at least 'slug' key.
+        May also include 'name', 'url', 'metadata'. A generator lets downloads
+        start while later discovery pages are still being fetched.
         """
         ...
 
@@ -78,15 +150,72 @@ class BaseCrawler(ABC):
 
     # --- Crawl state helpers ---
 
+    def _ensure_state_loaded(self) -> dict[str, str]:
+        """Load all crawl_state keys for this registry once (caller holds _state_lock)."""
+        if self._state is None:
+            with self._db_lock:
+                self._state = get_crawl_states(self.conn, self.registry_id)
+            logger.debug("[%s] Loaded %d crawl state keys", self.registry_id, len(self._state))
+        return self._state
+
     def get_state(self, key: str) -> str | None:
-        """Read a crawl state value for this registry."""
-        with self._db_lock:
-            return get_crawl_state(self.conn, self.registry_id, key)
+        """Read a crawl state value for this registry (served from the cache)."""
+        with self._state_lock:
+            return self._ensure_state_loaded().get(key)
 
     def set_state(self, key: str, value: str) -> None:
-        """Write a crawl state value for this registry."""
+        """Write a crawl state value for this registry.
+
+        Only updates the cache; the key is persisted by the next flush_state().
+        Writing an unchanged value is a no-op.
+        """
+        with self._state_lock:
+            state = self._ensure_state_loaded()
+            if state.get(key) == value:
+                return
+            state[key] = value
+            self._state_dirty.add(key)
+
+    def set_state_after_crawl(self, key: str, value: str) -> None:
+        """Like set_state(), but applied only once the crawl's downloads have all been processed.
+
+        For state that vouches for downloads, e.g. listing page digests: a
+        crawl that fails part-way keeps the previous value.
+        """
+        with self._state_lock:
+            self._deferred_state[key] = value
+
+    def _apply_deferred_state(self) -> None:
+        with self._state_lock:
+            deferred, self._deferred_state = self._deferred_state, {}
+        for key, value in deferred.items():
+            self.set_state(key, value)
+
+    def flush_state(self) -> int:
+        """Persist dirty crawl state keys in chunked upserts. Returns count written."""
+        with self._state_lock:
+            if not self._state_dirty:
+                return 0
+            items = [(key, self._state[key]) for key in self._state_dirty]
+            self._state_dirty.clear()
         with self._db_lock:
-            set_crawl_state(self.conn, self.registry_id, key, value)
+            return set_crawl_states(self.conn, self.registry_id, items, batch_size=self.write_batch_size)
+
+    def _flush_hashes(self) -> None:
+        """Write buffered content_hash updates in chunked upserts."""
+        if not self._pending_hashes:
+            return
+        with self._db_lock:
+            upsert_skills(self.conn, self.registry_id, self._pending_hashes,
+                          batch_size=self.write_batch_size)
+        self._pending_hashes = []
+
+    def _commit(self) -> None:
+        """Flush buffered hashes and cached crawl state, then commit the transaction."""
+        self._flush_hashes()
+        self.flush_state()
+        with self._db_lock:
+            self.conn.commit()
 
     def crawl(self) -> dict:
         """Run full crawl: discover → download (incremental).
@@ -101,43 +230,38 @@ class BaseCrawler(ABC):
         )
 
         try:
-            # Phase 1: Discover
-            skills = self.discover()
-            self.stats["discovered"] = len(skills)
-            logger.info("[%s] Discovered %d skills", self.registry_id, len(skills))
-
-            # Phase 2a: Register all skills in DB (serial, fast)
-            for skill_info in skills:
-                upsert_skill(
-                    self.conn,
-                    self.registry_id,
-                    skill_info["slug"],
-                    name=skill_info.get("name"),
-                    url=skill_info.get("url"),
-                    metadata=skill_info.get("metadata"),
-                )
-            self.conn.commit()
-
-            # Phase 2b: Download (concurrent or sequential)
-            if self.max_workers > 1:
-                self._crawl_concurrent(skills)
-            else:
-                self._crawl_sequential(skills)
-
-            self.conn.commit()
-
-            # Write manifest of changed files
+            import_files(self.output_dir)  # one-time migration of loose .md files
+            live_before = self._live_slugs() if self.crawl_mode == "full" else None
+            self._discover_and_download()
+            if live_before is not None:
+                self._tombstone_removed(live_before)
+            self._apply_deferred_state()
+            self._commit()
+
+            # Seal this run's pack segment and write manifest of changed files
+            self.store.close()
             self._write_manifest()
 
+            self.stats["http_cache"] = self.http_cache.summary()
+            self.http_cache.prune()
             duration = time.monotonic() - t0
             logger.info(
-                "[%s] Crawl complete in %.1fs: %d discovered, %d downloaded, %d skipped, %d failed, %d changed",
+                "[%s] Crawl complete in %.1fs: %d discovered, %d downloaded, %d skipped, %d failed, %d changed"
+                " (%d noise, %d renormalised)",
                 self.registry_id, duration,
                 self.stats["discovered"],
                 self.stats["downloaded"],
                 self.stats["skipped"],
                 self.stats["failed"],
                 len(self.changed_slugs),
+                self.stats["noise"],
+                self.stats["renormalised"],
+            )
+            cache_stats = self.stats["http_cache"]
+            logger.info(
+                "[%s] HTTP cache: %d fetched (%.1f MB), %d revalidated, %d fresh (%.1f MB saved)",
+                self.registry_id, cache_stats["fetched"], cache_stats["bytes_downloaded"] / 1e6,
+                cache_stats["revalidated"], cache_stats["fresh"], cache_stats["bytes_saved"] / 1e6,
             )
 
             finish_crawl_run(
@@ -149,9 +273,20 @@ class BaseCrawler(ABC):
                 failed=self.stats["failed"],
                 changed_files=len(self.changed_slugs),
                 status="completed",
+                concurrency=self._concurrency_summary(),
+                discovery_diff=self.discovery_diff,
+                noise=self.stats["noise"],
+                renormalised=self.stats["renormalised"],
             )
         except Exception as e:
             duration = time.monotonic() - t0
+            try:
+                # Keep content, hashes, ETags and watermarks from the work that did finish
+                self.store.close()
+                self._flush_hashes()
+                self.flush_state()
+            except Exception as flush_exc:
+                logger.warning("[%s] Failed to flush pending writes: %s", self.registry_id, flush_exc)
             finish_crawl_run(
                 self.conn, run_id,
                 duration_s=duration,
@@ -162,66 +297,217 @@ class BaseCrawler(ABC):
                 changed_files=len(self.changed_slugs),
                 status="failed",
                 error=str(e),
+                concurrency=self._concurrency_summary(),
+                noise=self.stats["noise"],
+                renormalised=self.stats["renormalised"],
             )
             raise
 
         return self.stats
 
+    def _live_slugs(self) -> set[str]:
+        """Non-deleted slugs in the DB for this registry/shard (one query)."""
+        with self._db_lock:
+            return get_live_slugs(self.conn, self.registry_id, shard=self.shard)
+
+    def _tombstone_removed(self, live_before: set[str]) -> None:
+        """Diff a full crawl's discovery against the DB and soft-delete vanished skills."""
+        discovered = {s for s in self.discovered_slugs if not self.shard or shard_matches(s, self.shard)}
+        removed = live_before - discovered
+        self.discovery_diff = {
+            "added": len(discovered - live_before),
+            "removed": len(removed),
+            "retained": len(discovered & live_before),
+        }
+        if removed and not self.discovery_complete:
+            logger.warning("[%s] Discovery was incomplete; not tombstoning %d missing skills",
+                           self.registry_id, len(removed))
+            self.discovery_diff["removed"] = 0
+            return
+        if removed and len(removed) > len(live_before) * self.max_removed_ratio:
+            logger.warning(
+                "[%s] Discovery is missing %d of %d live skills (> %.0f%%); not tombstoning",
+                self.registry_id, len(removed), len(live_before), self.max_removed_ratio * 100,
+            )
+            self.discovery_diff["removed"] = 0
+            return
+        if removed:
+            with self._db_lock:
+                mark_skills_deleted(self.conn, self.registry_id, sorted(removed),
+                                    batch_size=self.write_batch_size)
+        logger.info("[%s] Discovery diff: %d added, %d removed, %d retained", self.registry_id,
+                    self.discovery_diff["added"], len(removed), self.discovery_diff["retained"])
+
+    def discovery_incomplete(self, reason: str) -> None:
+        """Record that discovery missed part of the registry (a failed page, an early stop).
+
+        A full crawl then keeps skills that discovery did not list: they may
+        just not have been reached.
+        """
+        if self.discovery_complete:
+            logger.warning("[%s] Discovery incomplete: %s", self.registry_id, reason)
+        self.discovery_complete = False
+
+    def _concurrency_summary(self) -> dict | None:
+        if self.concurrency is None:
+            return None
+        summary = self.concurrency.summary()
+        logger.info("[%s] Concurrency converged at %d (peak %d, ceiling %d, %d changes)",
+                    self.registry_id, summary["final"], summary["peak"],
+                    summary["ceiling"], len(summary["decisions"]))
+        return summary
+
+    def _discover_and_download(self) -> None:
+        """Phases 1-2: discover, register and download (overridden by AsyncBaseCrawler)."""
+        # Phase 1 + 2a: Discover, registering skills in DB as they stream in
+        discovered = self.discover()
+        total = len(discovered) if isinstance(discovered, list) else None
+        skills = self._register_stream(discovered)
+
+        # Phase 2b: Download (concurrent or sequential)
+        if self.max_workers > 1:
+            self._crawl_concurrent(skills, total=total)
+        else:
+            self._crawl_sequential(skills, total=total)
+
+    def _register_stream(self, skills: Iterable[dict]) -> Iterator[dict]:
+        """Pass discovered skills through, registering them in chunked upserts.
+
+        Only one batch of skill dicts is held at a time (plus the set of slugs
+        for the discovery diff), so memory stays flat regardless of registry size.
+        """
+        pending: list[dict] = []
+        for skill_info in skills:
+            self.stats["discovered"] += 1
+            self.discovered_slugs.add(skill_info["slug"])
+            pending.append(skill_info)
+            if len(pending) >= self.write_batch_size:
+                self._register(pending)
+                pending = []
+            yield skill_info
+        self._register(pending)
+        logger.info("[%s] Discovered %d skills", self.registry_id, self.stats["discovered"])
+
+    def _register(self, skills: list[dict]) -> None:
+        """Register a batch of discovered skills (name/url/metadata/upstream) in the DB."""
+        if not skills:
+            return
+        rows = [{**s, "upstream": s.get("upstream") or upstream_of(s)} for s in skills]
+        with self._db_lock:
+            upsert_skills(self.conn, self.registry_id, rows, batch_size=self.write_batch_size)
+
     def _write_manifest(self) -> None:
         """Write .changed_files.txt with list of changed file paths."""
         if not self.changed_slugs:
             return
         self.output_dir.mkdir(parents=True, exist_ok=True)
         manifest_path = self.output_dir / ".changed_files.txt"
-        lines = []
-        for slug in self.changed_slugs:
-            safe_name = slug.replace("/", "_").replace(":", "_")
-            lines.append(f"{safe_name}.md")
+        lines = [file_name(slug) for slug in self.changed_slugs]
         manifest_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
         logger.info("[%s] Wrote manifest: %d changed files → %s", self.registry_id, len(lines), manifest_path)
 
-    def _crawl_sequential(self, skills: list[dict]) -> None:
+    def _load_content_hashes(self) -> None:
+        """Preload stored content hashes for this registry/shard in one query."""
+        if self._content_hashes is not None:
+            return
+        self._content_hashes = get_content_hashes(self.conn, self.registry_id, shard=self.shard)
+        self._raw_hashes = get_raw_hashes(self.conn, self.registry_id, shard=self.shard)
+        logger.info("[%s] Preloaded %d content hashes", self.registry_id, len(self._content_hashes))
+
+    def _crawl_sequential(self, skills: Iterable[dict], *, total: int | None = None) -> None:
         """Download skills sequentially (original behavior)."""
+        self._load_content_hashes()
+        if total is None and isinstance(skills, list):
+            total = len(skills)
         for i, skill_info in enumerate(skills, 1):
-            slug = skill_info["slug"]
-            if i % 100 == 0:
-                logger.info("[%s] Progress: %d/%d", self.registry_id, i, len(skills))
-
             self._download_and_process(skill_info)
+            self._after_result(i, total)
 
-    def _crawl_concurrent(self, skills: list[dict]) -> None:
-        """Download skills concurrently using ThreadPoolExecutor."""
-        total = len(skills)
-        completed = 0
+    def _crawl_concurrent(self, skills: Iterable[dict], *, total: int | None = None) -> None:
+        """Download skills concurrently with a single writer thread.
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {
-                executor.submit(self._download_one, skill_info): skill_info
-                for skill_info in skills
-            }
-
-            for future in as_completed(futures):
-                completed += 1
-                if completed % 200 == 0:
-                    logger.info("[%s] Progress: %d/%d (dl=%d skip=%d fail=%d)",
-                                self.registry_id, completed, total,
-                                self.stats["downloaded"], self.stats["skipped"], self.stats["failed"])
-
-                skill_info = futures[future]
-                try:
-                    result = future.result()
-                except Exception as e:
-                    logger.warning("[%s] Failed %s: %s", self.registry_id, skill_info["slug"], e)
-                    self.stats["failed"] += 1
-                    continue
+        Skills are consumed lazily: at most `max_in_flight` downloads are
+        submitted at once, so a generator from discover() is never fully
+        materialised. Worker threads only download and push (slug, result,
+        error) onto a bounded queue; when the writer falls behind, workers
+        block on put() (back-pressure). The writer thread owns the DB
+        connection and output directory: it processes results, batches hash
+        upserts, flushes crawl state and commits every `commit_every` results.
+
+        With adaptive concurrency, the AIMD controller replaces the fixed
+        `max_in_flight` window and the pool is sized to its ceiling.
+        """
+        self._load_content_hashes()
+        if total is None and isinstance(skills, list):
+            total = len(skills)
+        in_flight = self.concurrency or threading.BoundedSemaphore(self.max_in_flight)
+        results: queue.Queue = queue.Queue(maxsize=self.write_queue_size)
+        writer_errors: list[BaseException] = []
+
+        writer = threading.Thread(
+            target=self._writer_loop,
+            args=(results, total, writer_errors),
+            name=f"{self.registry_id}-writer",
+            daemon=True,
+        )
+        writer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for skill_info in skills:
+                    in_flight.acquire()
+                    future = executor.submit(self._download_to_queue, skill_info, results)
+                    future.add_done_callback(lambda _: in_flight.release())
+        finally:
+            results.put(None)  # sentinel: no more results
+            writer.join()
+
+        if writer_errors:
+            raise writer_errors[0]
+
+    def _download_to_queue(self, skill_info: dict, results: queue.Queue) -> None:
+        """Worker: download one skill and hand the outcome to the writer."""
+        t0 = time.monotonic()
+        try:
+            item = (skill_info["slug"], self._download_one(skill_info), None)
+        except Exception as e:
+            item = (skill_info["slug"], None, e)
+        if self.concurrency is not None:
+            self.concurrency.record(time.monotonic() - t0, failed=item[2] is not None)
+        results.put(item)
 
-                # Process result (DB writes + file saves) under lock
-                self._process_result(skill_info["slug"], result)
+    def _writer_loop(self, results: queue.Queue, total: int | None, errors: list[BaseException]) -> None:
+        """Writer thread: drain the result queue until the sentinel arrives.
 
-                # Commit periodically to avoid holding transactions too long
-                if completed % 500 == 0:
-                    with self._db_lock:
-                        self.conn.commit()
+        After a write error the loop keeps draining (discarding results) so
+        blocked workers can finish; the error is re-raised by the caller.
+        """
+        completed = 0
+        while (item := results.get()) is not None:
+            if errors:
+                continue
+            slug, result, exc = item
+            completed += 1
+            try:
+                if exc is not None:
+                    logger.warning("[%s] Failed %s: %s", self.registry_id, slug, exc)
+                    self.stats["failed"] += 1
+                else:
+                    self._process_result(slug, result)
+                self._after_result(completed, total)
+            except Exception as e:
+                logger.error("[%s] Writer failed on %s: %s", self.registry_id, slug, e)
+                errors.append(e)
+
+    def _after_result(self, completed: int, total: int | None) -> None:
+        """Progress logging and commit cadence, shared by both download modes."""
+        if completed % self.progress_every == 0:
+            logger.info("[%s] Progress: %d/%s (dl=%d skip=%d fail=%d)",
+                        self.registry_id, completed, total if total is not None else "?",
+                        self.stats["downloaded"], self.stats["skipped"], self.stats["failed"])
+
+        # Commit periodically to avoid holding transactions too long
+        if completed % self.commit_every == 0:
+            self._commit()
 
     def _download_one(self, skill_info: dict) -> CrawlResult:
         """Download a single skill (thread-safe, no DB access)."""
@@ -230,9 +516,23 @@ class BaseCrawler(ABC):
         return self.download(slug, **kwargs)
 
     def _process_result(self, slug: str, result: CrawlResult) -> None:
-        """Process a download result: update DB and save file."""
+        """Process a download result: buffer the hash update and save the file."""
+        # Upstream change markers, stored whether or not the content changed
+        markers = {k: getattr(result, k) for k in
+                   ("blob_sha", "commit_sha", "source_lastmod", "upstream", "raw_hash", "normalizer")}
+        previous = self._raw_hashes.get(f"{self.registry_id}:{slug}") if result.raw_hash else None
+        # Same raw content through a newer pipeline: hash updated, but not a change
+        renormalised = bool(previous) and previous[0] == result.raw_hash and previous[1] != result.normalizer
+
         if result.skipped:
             self.stats["skipped"] += 1
+            if previous and previous[0] != result.raw_hash:
+                self.stats["noise"] += 1  # raw content changed, canonical content did not
+            # Not saved: raw_hash/normalizer keep describing the stored content
+            markers["raw_hash"] = markers["normalizer"] = None
+            if any(markers.values()):
+                # Unchanged content seen at a newer upstream version: advance the markers
+                self._pending_hashes.append({"slug": slug, **markers})
             return
 
         if result.error:
@@ -240,19 +540,24 @@ class BaseCrawler(ABC):
             self.stats["failed"] += 1
             return
 
-        with self._db_lock:
-            if result.content_hash:
-                upsert_skill(
-                    self.conn,
-                    self.registry_id,
-                    slug,
-                    content_hash=result.content_hash,
-                    content_size=result.content_size,
-                )
+        if result.content_hash:
+            self._pending_hashes.append({
+                "slug": slug,
+                "content_hash": result.content_hash,
+                "content_size": result.content_size,
+                **markers,
+            })
+            if self._content_hashes is not None:
+                self._content_hashes[f"{self.registry_id}:{slug}"] = result.content_hash
+            if len(self._pending_hashes) >= self.write_batch_size:
+                self._flush_hashes()
 
         if result.content:
             self._save_content(slug, result.content)
-            self.changed_slugs.append(slug)
+            if renormalised:
+                self.stats["renormalised"] += 1
+            else:
+                self.changed_slugs.append(slug)
 
         self.stats["downloaded"] += 1
 
@@ -268,14 +573,31 @@ class BaseCrawler(ABC):
         self._process_result(slug, result)
 
     def _save_content(self, slug: str, content: str) -> None:
-        """Save skill content to disk."""
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        safe_name = slug.replace("/", "_").replace(":", "_")
-        filepath = self.output_dir / f"{safe_name}.md"
-        filepath.write_text(content, encoding="utf-8")
+        """Save skill content to the pack store."""
+        self.store.put(slug, content)
+
+    def canonical_hash(self, content: str, profile: str | None = None) -> tuple[str, dict]:
+        """content_hash of content's canonical form, plus its CrawlResult markers.
+
+        Only change detection sees the canonical form (crawlers.normalize);
+        the content itself is saved and scanned as fetched. Markers
+        (raw_hash, normalizer) are empty for profiles hashed as-is.
+        """
+        profile = profile or self.content_profile or self.registry_id
+        tag = normalizer_tag(profile)
+        if tag is None:
+            return content_hash(content), {}
+        markers = {"raw_hash": content_hash(content), "normalizer": tag}
+        return content_hash(canonicalize(profile, content)), markers
 
     def is_content_changed(self, skill_id: str, new_hash: str) -> bool:
-        """Check if content has changed since last crawl."""
+        """Check if content has changed since last crawl.
+
+        Served from the preloaded hash map during a crawl; falls back to a DB
+        lookup only when called outside the download phase.
+        """
+        if self._content_hashes is not None:
+            return self._content_hashes.get(skill_id) != new_hash
         with self._db_lock:
             old_hash = get_skill_hash(self.conn, skill_id)
         return old_hash != new_hash
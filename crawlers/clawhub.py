@@ -7,18 +7,21 @@ Changes from original:
   - Incremental via sort=updated + content hash
   - Writes to Turso DB
   - Incremental mode: watermark updatedAt + ETag HEAD pre-check
+  - Runs on the asyncio engine (AsyncBaseCrawler)
 """
 
 from __future__ import annotations
 
+import asyncio
 import io
 import logging
 import time
 import zipfile
+from collections.abc import AsyncIterator
 
-import requests
+import aiohttp
 
-from crawlers.base import BaseCrawler
+from crawlers.async_base import AsyncBaseCrawler
 from crawlers.models import CrawlResult
 from crawlers.utils import content_hash
 
@@ -28,18 +31,22 @@ CLAWHUB_API = "https://clawhub.ai/api/v1"
 DOWNLOAD_RATE_LIMIT_MS = 3100  # 20 downloads/min limit
 
 
-class ClawHubCrawler(BaseCrawler):
+class ClawHubCrawler(AsyncBaseCrawler):
     registry_id = "clawhub"
+    # Listing pages are cheap; downloads fall back to rate_limit_ms (20/min)
+    rate_limits = {"clawhub.ai/api/v1/skills": (300, 1)}
 
-    def __init__(self, conn, *, output_dir=None, rate_limit_ms=3100, shard=None, max_workers=1, crawl_mode="incremental"):
-        super().__init__(conn, output_dir=output_dir, rate_limit_ms=rate_limit_ms, shard=shard, max_workers=max_workers, crawl_mode=crawl_mode)
+    def __init__(self, conn, *, output_dir=None, rate_limit_ms=3100, shard=None, max_workers=1, crawl_mode="incremental", max_concurrency=4):
+        super().__init__(conn, output_dir=output_dir, rate_limit_ms=rate_limit_ms, shard=shard, max_workers=max_workers, crawl_mode=crawl_mode, max_concurrency=max_concurrency)
 
-    def discover(self) -> list[dict]:
+    async def adiscover(self) -> AsyncIterator[dict]:
         """Fetch all skills from ClawHub API with pagination.
 
+        Yields skills page by page so downloads can start before pagination ends.
         In incremental mode, stops paginating when reaching skills older than last_crawl_at.
         """
-        all_skills = []
+        discovered = 0
+        newest = None  # updatedAt of the first item (sorted desc)
         cursor = None
         last_updated_at = None  # stored as str(epoch_ms) from API
 
@@ -59,11 +66,13 @@ class ClawHubCrawler(BaseCrawler):
                 url += f"&cursor={cursor}"
 
             try:
-                resp = requests.get(url, timeout=30)
-                resp.raise_for_status()
-                data = resp.json()
+                await self.rate_limiter.async_wait(url)
+                async with self.request("GET", url) as resp:
+                    resp.raise_for_status()
+                    data = await resp.json()
             except Exception as e:
                 logger.error("ClawHub API error: %s", e)
+                self.discovery_incomplete(f"listing failed after {discovered} skills")
                 break
 
             items = data.get("items", [])
@@ -81,11 +90,14 @@ class ClawHubCrawler(BaseCrawler):
                 # In incremental mode, stop when we reach skills older than watermark
                 # updatedAt is epoch ms (int) from the API
                 if last_updated_at and raw_updated is not None and int(raw_updated) <= last_updated_at:
-                    logger.info("Reached watermark at %s, stopping pagination (%d skills so far)", raw_updated, len(all_skills))
+                    logger.info("Reached watermark at %s, stopping pagination (%d skills so far)", raw_updated, discovered)
                     stop_paginating = True
                     break
 
-                all_skills.append({
+                if discovered == 0 and raw_updated:
+                    newest = str(raw_updated)
+                discovered += 1
+                yield {
                     "slug": slug,
                     "name": item.get("name", slug),
                     "url": f"https://clawhub.ai/skills/{slug}",
@@ -94,7 +106,7 @@ class ClawHubCrawler(BaseCrawler):
                         for k in ("description", "author", "version", "updatedAt")
                         if item.get(k)
                     },
-                })
+                }
 
             if stop_paginating:
                 break
@@ -103,22 +115,21 @@ class ClawHubCrawler(BaseCrawler):
             if not cursor:
                 break
 
-            time.sleep(0.3)
-            logger.info("Discovered %d skills so far...", len(all_skills))
-
-        # Update watermark to the newest updatedAt seen (first item, since sorted desc)
-        if all_skills and all_skills[0].get("metadata", {}).get("updatedAt"):
-            newest = str(all_skills[0]["metadata"]["updatedAt"])
-            self.set_state("last_updated_at", newest)
-            logger.info("Updated watermark last_updated_at=%s", newest)
-        elif not all_skills and not last_updated_at:
+            logger.info("Discovered %d skills so far...", discovered)
+
+        # Update watermark to the newest updatedAt seen (first item, since sorted desc).
+        # It vouches for every skill above it, so it is only stored once they are all
+        # downloaded, and never after a cut-short listing.
+        if not self.discovery_complete:
+            return
+        if newest:
+            self.set_state_after_crawl("last_updated_at", newest)
+            logger.info("Watermark last_updated_at=%s (stored when the crawl completes)", newest)
+        elif not discovered and not last_updated_at:
             # First run with no skills found — store current epoch ms as fallback
-            import time as _time
-            self.set_state("last_updated_at", str(int(_time.time() * 1000)))
-
-        return all_skills
+            self.set_state_after_crawl("last_updated_at", str(int(time.time() * 1000)))
 
-    def download(self, slug: str, **kwargs) -> CrawlResult:
+    async def adownload(self, slug: str, **kwargs) -> CrawlResult:
         """Download a skill zip from ClawHub and extract SKILL.md.
 
         In incremental mode, does a HEAD request first to check ETag before
@@ -132,42 +143,42 @@ class ClawHubCrawler(BaseCrawler):
             stored_etag = self.get_state(f"etag:{slug}")
             if stored_etag:
                 try:
-                    head_resp = requests.head(url, timeout=15)
-                    if head_resp.status_code == 200:
-                        remote_etag = head_resp.headers.get("ETag", "")
-                        if remote_etag and remote_etag == stored_etag:
-                            return CrawlResult(skill_id=skill_id, slug=slug, skipped=True)
-                except requests.RequestException:
+                    async with self.request("HEAD", url, timeout=aiohttp.ClientTimeout(total=15)) as head_resp:
+                        if head_resp.status == 200:
+                            remote_etag = head_resp.headers.get("ETag", "")
+                            if remote_etag and remote_etag == stored_etag:
+                                return CrawlResult(skill_id=skill_id, slug=slug, skipped=True)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
                     pass  # Fall through to full download
 
         for attempt in range(3):
-            self.rate_limiter.wait()
+            await self.rate_limiter.async_wait(url)
             try:
-                resp = requests.get(url, timeout=30)
-                if resp.status_code == 410:
-                    return CrawlResult(skill_id=skill_id, slug=slug, error="soft-deleted (410)")
-                if resp.status_code == 429:
-                    wait = 10 * (attempt + 1)
-                    logger.warning("ClawHub 429 for %s, backing off %ds", slug, wait)
-                    time.sleep(wait)
-                    continue
-                resp.raise_for_status()
+                async with self.request("GET", url) as resp:
+                    if resp.status == 410:
+                        return CrawlResult(skill_id=skill_id, slug=slug, error="soft-deleted (410)")
+                    if resp.status == 429:
+                        # request() already held the host per Retry-After
+                        logger.warning("ClawHub 429 for %s (attempt %d)", slug, attempt + 1)
+                        continue
+                    resp.raise_for_status()
+                    etag = resp.headers.get("ETag", "")
+                    body = await resp.read()
                 break
-            except requests.RequestException as e:
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 if attempt == 2:
-                    return CrawlResult(skill_id=skill_id, slug=slug, error=str(e))
-                time.sleep(5)
+                    return CrawlResult(skill_id=skill_id, slug=slug, error=str(e) or type(e).__name__)
+                await asyncio.sleep(5)
         else:
             return CrawlResult(skill_id=skill_id, slug=slug, error="429 after retries")
 
-        # Store ETag for future incremental runs
-        etag = resp.headers.get("ETag", "")
+        # Store ETag for future incremental runs, once the crawl has saved the content
         if etag:
-            self.set_state(f"etag:{slug}", etag)
+            self.set_state_after_crawl(f"etag:{slug}", etag)
 
         # Extract SKILL.md from zip
         try:
-            with zipfile.ZipFile(io.BytesIO(resp.content)) as zf:
+            with zipfile.ZipFile(io.BytesIO(body)) as zf:
                 for name in zf.namelist():
                     if name.upper().endswith("SKILL.MD"):
                         content_bytes = zf.read(name)
@@ -204,13 +215,17 @@ def main():
     parser = argparse.ArgumentParser(description="Crawl ClawHub registry")
     parser.add_argument("--output-dir", type=Path, help="Output directory")
     parser.add_argument("--mode", choices=["full", "incremental"], default="incremental", help="Crawl mode")
+    parser.add_argument("--max-concurrency", type=int, default=4,
+                        help="Ceiling for adaptive download concurrency")
     args = parser.parse_args()
 
     setup_logging()
     conn = connect()
     init_schema(conn)
 
-    crawler = ClawHubCrawler(conn, output_dir=args.output_dir, crawl_mode=args.mode)
+    crawler = ClawHubCrawler(
+        conn, output_dir=args.output_dir, crawl_mode=args.mode, max_concurrency=args.max_concurrency,
+    )
     stats = crawler.crawl()
     conn.commit()
     print(json.dumps(stats, indent=2))
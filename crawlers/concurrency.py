@@ -0,0 +1,170 @@
+"""Adaptive (AIMD) concurrency control for crawler downloads.
+
+The controller bounds how many downloads are in flight. After each window of
+completions it adds one slot while latency and errors stay healthy, halves
+the limit on 429/503, 5xx or timeouts, and holds steady when latency climbs
+well above the best window seen (the extra slots are only queueing). Every
+change is recorded so the crawl run can store how the registry converged.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger("observatory.concurrency")
+
+# Keep at most this many decisions in the crawl_runs log
+MAX_LOGGED_DECISIONS = 200
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease limit on downloads in flight.
+
+    Usable from worker threads (acquire/release) and from a single event loop
+    (async_acquire/release). Health signals come from record() per finished
+    download and from note_status()/note_failure() per HTTP request.
+    """
+
+    def __init__(
+        self,
+        ceiling: int,
+        *,
+        initial: int | None = None,
+        floor: int = 1,
+        increase: int = 1,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+        max_error_rate: float = 0.1,
+        name: str = "",
+    ):
+        self.ceiling = max(1, ceiling)
+        self.floor = max(1, min(floor, self.ceiling))
+        self.limit = max(self.floor, min(initial or min(4, self.ceiling), self.ceiling))
+        self.initial = self.limit
+        self.peak = self.limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.name = name
+        self.decisions: list[dict] = []
+
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._started = time.monotonic()
+        self._baseline_s: float | None = None  # best window mean latency
+        self._window_n = 0
+        self._window_latency_s = 0.0
+        self._window_failed = 0
+        self._window_throttled = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._slot_freed: asyncio.Event | None = None
+
+    # --- Slots ---
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self._in_flight < self.limit:
+                self._in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        """Block the calling thread until a download slot is free."""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    async def async_acquire(self) -> None:
+        """Await a free download slot without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slot_freed = asyncio.Event()
+        while not self.try_acquire():
+            self._slot_freed.clear()
+            await self._slot_freed.wait()
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+        if self._slot_freed is not None:
+            self._loop.call_soon_threadsafe(self._slot_freed.set)
+
+    # --- Signals ---
+
+    def note_status(self, status: int) -> None:
+        """Count a throttled (429/503) or failed (5xx) HTTP response."""
+        with self._cond:
+            if status in (429, 503):
+                self._window_throttled += 1
+            elif status >= 500:
+                self._window_failed += 1
+
+    def note_failure(self) -> None:
+        """Count a timeout or connection error."""
+        with self._cond:
+            self._window_failed += 1
+
+    def record(self, latency_s: float, *, failed: bool = False) -> None:
+        """Record a finished download; evaluates the limit once per window."""
+        with self._cond:
+            self._window_n += 1
+            self._window_latency_s += latency_s
+            if failed:
+                self._window_failed += 1
+            if self._window_n >= self.limit:
+                self._evaluate()
+
+    def _evaluate(self) -> None:
+        """Apply AIMD to the finished window (caller holds the lock)."""
+        n = self._window_n
+        mean_s = self._window_latency_s / n
+        error_rate = self._window_failed / n
+        throttled = self._window_throttled
+        self._window_n = self._window_failed = self._window_throttled = 0
+        self._window_latency_s = 0.0
+
+        old = self.limit
+        if throttled or error_rate > self.max_error_rate:
+            self.limit = max(self.floor, int(self.limit * self.decrease))
+            reason = "throttled" if throttled else "errors"
+        elif self._baseline_s is not None and mean_s > self._baseline_s * self.latency_tolerance:
+            reason = "latency"  # more slots would only queue; hold
+        else:
+            self.limit = min(self.ceiling, self.limit + self.increase)
+            reason = "healthy"
+        if self._baseline_s is None or mean_s < self._baseline_s:
+            self._baseline_s = mean_s
+
+        if self.limit != old:
+            self.peak = max(self.peak, self.limit)
+            self._cond.notify_all()
+            decision = {
+                "t": round(time.monotonic() - self._started, 1),
+                "from": old,
+                "to": self.limit,
+                "reason": reason,
+                "latency_ms": round(mean_s * 1000),
+                "error_rate": round(error_rate, 3),
+            }
+            if len(self.decisions) < MAX_LOGGED_DECISIONS:
+                self.decisions.append(decision)
+            level = logging.INFO if self.limit < old else logging.DEBUG
+            logger.log(level, "[%s] concurrency %d -> %d (%s, %.0fms, err=%.1f%%)",
+                       self.name, old, self.limit, reason, mean_s * 1000, error_rate * 100)
+
+    def summary(self) -> dict:
+        """Convergence summary stored on the crawl run."""
+        return {
+            "initial": self.initial,
+            "final": self.limit,
+            "peak": self.peak,
+            "ceiling": self.ceiling,
+            "decisions": self.decisions,
+        }
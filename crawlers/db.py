@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
 import time
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
 
 import libsql_experimental as libsql
@@ -23,6 +26,11 @@ _RETRIABLE_ERRORS = ("stream not found", "stream expired", "connection", "hrana"
 _MAX_RETRIES = 3
 _RETRY_BACKOFF = 1.0  # seconds, doubles each attempt
 
+# Rows per multi-row INSERT in the bulk write helpers. Each chunk is a single
+# round trip to Turso; 200 rows x 10 columns stays well under SQLite's
+# bound-parameter limit.
+DEFAULT_BATCH_SIZE = 200
+
 
 def _raw_connect(url: str, auth_token: str) -> libsql.Connection:
     if url.startswith("libsql://"):
@@ -74,6 +82,15 @@ class ResilientConnection:
                 self._reconnect()
         raise RuntimeError("unreachable")
 
+    def rollback(self):
+        try:
+            return self._conn.rollback()
+        except Exception as exc:
+            if not self._is_retriable(exc):
+                raise
+            # The transaction died with the stream; start over on a fresh one
+            self._reconnect()
+
     def close(self):
         self._conn.close()
 
@@ -130,6 +147,35 @@ def _now() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
+def _chunked(rows: Iterable, size: int) -> Iterator[list]:
+    """Yield successive lists of at most `size` items from an iterable."""
+    it = iter(rows)
+    while chunk := list(islice(it, max(1, size))):
+        yield chunk
+
+
+def _insert_many(
+    conn: libsql.Connection,
+    insert_sql: str,
+    conflict_sql: str,
+    rows: Iterable[tuple],
+    batch_size: int,
+) -> int:
+    """Write rows as chunked multi-row `INSERT ... VALUES (...), (...) ON CONFLICT ...`.
+
+    One statement (one round trip) per chunk instead of one per row.
+    Returns count of rows written.
+    """
+    written = 0
+    for chunk in _chunked(rows, batch_size):
+        row_placeholder = "(" + ", ".join(["?"] * len(chunk[0])) + ")"
+        values = ", ".join([row_placeholder] * len(chunk))
+        params = tuple(v for row in chunk for v in row)
+        conn.execute(f"{insert_sql} VALUES {values} {conflict_sql}", params)
+        written += len(chunk)
+    return written
+
+
 # --- Skills ---
 
 def upsert_skill(
@@ -144,15 +190,53 @@ def upsert_skill(
     metadata: dict | None = None,
 ) -> str:
     """Insert or update a skill. Returns the skill ID."""
-    skill_id = f"{registry_id}:{slug}"
+    upsert_skills(conn, registry_id, [{
+        "slug": slug,
+        "name": name,
+        "url": url,
+        "content_hash": content_hash,
+        "content_size": content_size,
+        "metadata": metadata,
+    }])
+    return f"{registry_id}:{slug}"
+
+
+def upsert_skills(
+    conn: libsql.Connection,
+    registry_id: str,
+    skills: Iterable[dict],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Insert or update many skills in chunked multi-row statements.
+
+    Each dict needs a 'slug' and may carry 'name', 'url', 'content_hash',
+    'content_size', 'metadata' (same semantics as upsert_skill), 'blob_sha',
+    'commit_sha', 'source_lastmod', 'upstream', 'raw_hash' and 'normalizer'.
+    raw_hash/normalizer describe the content behind content_hash, so they are
+    written together with it (NULL for content hashed as-is) and kept only by
+    rows that carry no content_hash.
+    Returns count of rows written.
+    """
     now = _now()
-    meta_json = json.dumps(metadata) if metadata else None
-
-    conn.execute(
+    rows = (
+        (
+            f"{registry_id}:{s['slug']}", registry_id, s["slug"], s.get("name"), s.get("url"),
+            s.get("content_hash"), s.get("content_size") or 0, now, now,
+            json.dumps(s["metadata"]) if s.get("metadata") else None,
+            s.get("blob_sha"), s.get("commit_sha"), s.get("source_lastmod"), s.get("upstream"),
+            s.get("raw_hash"), s.get("normalizer"),
+        )
+        for s in skills
+    )
+    return _insert_many(
+        conn,
         """
         INSERT INTO skills (id, registry_id, slug, name, url, content_hash, content_size,
-                           first_seen, last_seen, metadata)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                           first_seen, last_seen, metadata, blob_sha, commit_sha, source_lastmod,
+                           upstream, raw_hash, normalizer)
+        """,
+        """
         ON CONFLICT(id) DO UPDATE SET
             name = COALESCE(excluded.name, skills.name),
             url = COALESCE(excluded.url, skills.url),
@@ -160,11 +244,17 @@ def upsert_skill(
             content_size = CASE WHEN excluded.content_size > 0 THEN excluded.content_size ELSE skills.content_size END,
             last_seen = excluded.last_seen,
             metadata = COALESCE(excluded.metadata, skills.metadata),
+            blob_sha = COALESCE(excluded.blob_sha, skills.blob_sha),
+            commit_sha = COALESCE(excluded.commit_sha, skills.commit_sha),
+            source_lastmod = COALESCE(excluded.source_lastmod, skills.source_lastmod),
+            upstream = COALESCE(excluded.upstream, skills.upstream),
+            raw_hash = CASE WHEN excluded.content_hash IS NULL THEN skills.raw_hash ELSE excluded.raw_hash END,
+            normalizer = CASE WHEN excluded.content_hash IS NULL THEN skills.normalizer ELSE excluded.normalizer END,
             deleted = 0
         """,
-        (skill_id, registry_id, slug, name, url, content_hash, content_size, now, now, meta_json),
+        rows,
+        batch_size,
     )
-    return skill_id
 
 
 def get_skill_hash(conn: libsql.Connection, skill_id: str) -> str | None:
@@ -175,6 +265,92 @@ def get_skill_hash(conn: libsql.Connection, skill_id: str) -> str | None:
     return row[0] if row else None
 
 
+def get_content_hashes(
+    conn: libsql.Connection,
+    registry_id: str,
+    *,
+    shard: str | None = None,
+) -> dict[str, str]:
+    """Load {skill_id: content_hash} for a registry (optionally one letter-range shard).
+
+    Includes soft-deleted skills so a reappearing skill with unchanged content
+    is still recognised. Skills never downloaded are omitted.
+    """
+    from crawlers.utils import shard_bounds
+
+    sql = "SELECT id, content_hash FROM skills WHERE registry_id = ? AND content_hash IS NOT NULL"
+    params: tuple = (registry_id,)
+    bounds = shard_bounds(shard)
+    if bounds:
+        sql += " AND UPPER(SUBSTR(slug, 1, 1)) BETWEEN ? AND ?"
+        params += bounds
+    return {row[0]: row[1] for row in conn.execute(sql, params).fetchall()}
+
+
+def get_raw_hashes(
+    conn: libsql.Connection,
+    registry_id: str,
+    *,
+    shard: str | None = None,
+) -> dict[str, tuple[str, str | None]]:
+    """Load {skill_id: (raw_hash, normalizer)} for a registry's downloaded skills.
+
+    Skills stored before normalisation existed hashed their raw content, so
+    their content_hash stands in for the raw hash (normalizer NULL).
+    """
+    from crawlers.utils import shard_bounds
+
+    sql = ("SELECT id, COALESCE(raw_hash, content_hash), normalizer FROM skills"
+           " WHERE registry_id = ? AND content_hash IS NOT NULL")
+    params: tuple = (registry_id,)
+    bounds = shard_bounds(shard)
+    if bounds:
+        sql += " AND UPPER(SUBSTR(slug, 1, 1)) BETWEEN ? AND ?"
+        params += bounds
+    return {row[0]: (row[1], row[2]) for row in conn.execute(sql, params).fetchall()}
+
+
+def get_git_shas(
+    conn: libsql.Connection,
+    registry_id: str,
+    *,
+    shard: str | None = None,
+) -> dict[str, tuple[str, str | None]]:
+    """Load {skill_id: (blob_sha, commit_sha)} for skills fetched from GitHub.
+
+    Only skills with a stored content hash are included, so a blob that was
+    recorded but never successfully saved is fetched again.
+    """
+    from crawlers.utils import shard_bounds
+
+    sql = ("SELECT id, blob_sha, commit_sha FROM skills"
+           " WHERE registry_id = ? AND blob_sha IS NOT NULL AND content_hash IS NOT NULL")
+    params: tuple = (registry_id,)
+    bounds = shard_bounds(shard)
+    if bounds:
+        sql += " AND UPPER(SUBSTR(slug, 1, 1)) BETWEEN ? AND ?"
+        params += bounds
+    return {row[0]: (row[1], row[2]) for row in conn.execute(sql, params).fetchall()}
+
+
+def get_source_lastmods(
+    conn: libsql.Connection,
+    registry_id: str,
+    *,
+    shard: str | None = None,
+) -> dict[str, str | None]:
+    """Load {slug: source_lastmod} for a registry's live skills (optionally one shard)."""
+    from crawlers.utils import shard_bounds
+
+    sql = "SELECT slug, source_lastmod FROM skills WHERE registry_id = ? AND deleted = 0"
+    params: tuple = (registry_id,)
+    bounds = shard_bounds(shard)
+    if bounds:
+        sql += " AND UPPER(SUBSTR(slug, 1, 1)) BETWEEN ? AND ?"
+        params += bounds
+    return {row[0]: row[1] for row in conn.execute(sql, params).fetchall()}
+
+
 def mark_skill_deleted(conn: libsql.Connection, skill_id: str) -> None:
     """Mark a skill as deleted (soft delete)."""
     conn.execute(
@@ -183,6 +359,45 @@ def mark_skill_deleted(conn: libsql.Connection, skill_id: str) -> None:
     )
 
 
+def mark_skills_deleted(
+    conn: libsql.Connection,
+    registry_id: str,
+    slugs: Iterable[str],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Soft-delete many skills of a registry in chunked updates. Returns rows updated."""
+    now = _now()
+    total = 0
+    for chunk in _chunked(slugs, batch_size):
+        placeholders = ", ".join("?" * len(chunk))
+        cur = conn.execute(
+            f"UPDATE skills SET deleted = 1, last_seen = ?"
+            f" WHERE registry_id = ? AND deleted = 0 AND slug IN ({placeholders})",
+            (now, registry_id, *chunk),
+        )
+        total += max(cur.rowcount, 0)
+    return total
+
+
+def get_live_slugs(
+    conn: libsql.Connection,
+    registry_id: str,
+    *,
+    shard: str | None = None,
+) -> set[str]:
+    """Slugs of a registry's non-deleted skills (optionally one letter-range shard)."""
+    from crawlers.utils import shard_bounds
+
+    sql = "SELECT slug FROM skills WHERE registry_id = ? AND deleted = 0"
+    params: tuple = (registry_id,)
+    bounds = shard_bounds(shard)
+    if bounds:
+        sql += " AND UPPER(SUBSTR(slug, 1, 1)) BETWEEN ? AND ?"
+        params += bounds
+    return {row[0] for row in conn.execute(sql, params).fetchall()}
+
+
 def get_skills_by_registry(
     conn: libsql.Connection,
     registry_id: str,
@@ -201,6 +416,206 @@ def get_skills_by_registry(
     ).fetchall()
 
 
+# --- Upstreams (cross-registry entities) ---
+
+def set_skill_upstreams(
+    conn: libsql.Connection,
+    pairs: Iterable[tuple[str, str]],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Set skills.upstream for (skill_id, upstream) pairs in chunked updates."""
+    total = 0
+    for chunk in _chunked(pairs, batch_size):
+        cases = " ".join(["WHEN ? THEN ?"] * len(chunk))
+        placeholders = ", ".join("?" * len(chunk))
+        cur = conn.execute(
+            f"UPDATE skills SET upstream = CASE id {cases} END WHERE id IN ({placeholders})",
+            (*(v for pair in chunk for v in pair), *(skill_id for skill_id, _ in chunk)),
+        )
+        total += max(cur.rowcount, 0)
+    return total
+
+
+def get_upstream_listings(conn: libsql.Connection) -> dict[str, list[tuple[str, str, str | None]]]:
+    """{upstream: [(skill_id, registry_id, content_hash)]} over live skills."""
+    listings: dict[str, list[tuple[str, str, str | None]]] = {}
+    rows = conn.execute(
+        "SELECT upstream, id, registry_id, content_hash FROM skills"
+        " WHERE deleted = 0 AND upstream IS NOT NULL"
+    ).fetchall()
+    for upstream, skill_id, registry_id, content in rows:
+        listings.setdefault(upstream, []).append((skill_id, registry_id, content))
+    return listings
+
+
+def get_skill_hashes(
+    conn: libsql.Connection,
+    skill_ids: Iterable[str],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict[str, str]:
+    """{skill_id: blob hash} for the given live skills that have content.
+
+    The blob hash identifies the stored (raw) content: raw_hash for
+    normalised registries, content_hash otherwise.
+    """
+    hashes: dict[str, str] = {}
+    for chunk in _chunked(skill_ids, batch_size):
+        placeholders = ", ".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT id, COALESCE(raw_hash, content_hash) FROM skills WHERE id IN ({placeholders})"
+            " AND deleted = 0 AND content_hash IS NOT NULL",
+            tuple(chunk),
+        ).fetchall()
+        hashes.update((skill_id, content) for skill_id, content in rows)
+    return hashes
+
+
+def get_scored_blobs(
+    conn: libsql.Connection,
+    hashes: Iterable[str],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict[str, list[str]]:
+    """{blob hash: [skill_id]} of live skills with that content and a score (see get_skill_hashes)."""
+    holders: dict[str, list[str]] = {}
+    for chunk in _chunked(hashes, batch_size):
+        placeholders = ", ".join("?" * len(chunk))
+        rows = conn.execute(
+            f"""SELECT COALESCE(s.raw_hash, s.content_hash), s.id FROM skills s
+                JOIN skill_scores ss ON ss.skill_id = s.id
+                WHERE COALESCE(s.raw_hash, s.content_hash) IN ({placeholders}) AND s.deleted = 0""",
+            tuple(chunk),
+        ).fetchall()
+        for content, skill_id in rows:
+            holders.setdefault(content, []).append(skill_id)
+    return holders
+
+
+def get_blob_stats(conn: libsql.Connection) -> list[tuple]:
+    """Per-registry blob sharing over live skills (see the content_blobs view).
+
+    Rows of (registry_id, listings, distinct_blobs, representatives, bytes,
+    representative_bytes, findings, representative_findings). A
+    representative is the listing a blob is scanned through (the smallest
+    skill id holding it); every other listing is a duplicate.
+    """
+    return conn.execute(
+        """
+        WITH findings AS (
+            SELECT skill_id, COUNT(*) AS n FROM findings_latest GROUP BY skill_id
+        )
+        SELECT s.registry_id,
+               COUNT(*),
+               COUNT(DISTINCT COALESCE(s.raw_hash, s.content_hash)),
+               SUM(s.id = b.representative),
+               COALESCE(SUM(s.content_size), 0),
+               COALESCE(SUM(CASE WHEN s.id = b.representative THEN s.content_size END), 0),
+               COALESCE(SUM(f.n), 0),
+               COALESCE(SUM(CASE WHEN s.id = b.representative THEN f.n END), 0)
+        FROM skills s
+        JOIN content_blobs b ON b.content_hash = COALESCE(s.raw_hash, s.content_hash)
+        LEFT JOIN findings f ON f.skill_id = s.id
+        WHERE s.deleted = 0
+        GROUP BY s.registry_id
+        ORDER BY s.registry_id
+        """
+    ).fetchall()
+
+
+def get_top_blobs(conn: libsql.Connection, limit: int = 20) -> list[tuple]:
+    """Most widely shared blobs: (content_hash, skills, registries, content_size, representative)."""
+    return conn.execute(
+        "SELECT content_hash, skills, registries, content_size, representative"
+        " FROM content_blobs WHERE skills > 1 ORDER BY skills DESC LIMIT ?",
+        (limit,),
+    ).fetchall()
+
+
+def copy_findings(
+    conn: libsql.Connection,
+    pairs: Iterable[tuple[str, str]],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict:
+    """Make each (target, source) pair's target carry the source's findings and score.
+
+    Used for listings whose stored content (get_skill_hashes) is identical to a
+    listing that was scanned. Only differing findings are written and unchanged scores are
+    skipped, like reconcile_staged_findings. Targets whose source has no
+    score yet are left alone. The caller commits.
+
+    Returns counts: inserted, removed, skills.
+    """
+    counts = {"inserted": 0, "removed": 0, "skills": 0}
+    now = _now()
+    for chunk in _chunked(pairs, batch_size):
+        chunk = [(t, src) for t, src in chunk if t != src]
+        if not chunk:
+            continue
+        values = ", ".join(["(?, ?)"] * len(chunk))
+        pair_params = tuple(v for pair in chunk for v in pair)
+        pairs_cte = f"""
+            WITH pairs(target, source) AS (
+                SELECT column1, column2 FROM (VALUES {values})
+                WHERE EXISTS (SELECT 1 FROM skill_scores ss WHERE ss.skill_id = column2)
+            )
+        """
+        counts["removed"] += max(conn.execute(
+            f"""
+            {pairs_cte}
+            DELETE FROM findings_latest
+            WHERE skill_id IN (SELECT target FROM pairs)
+              AND NOT EXISTS (
+                  SELECT 1 FROM pairs p JOIN findings_latest src ON src.skill_id = p.source
+                  WHERE p.target = findings_latest.skill_id
+                    AND src.rule_id = findings_latest.rule_id
+                    AND src.severity = findings_latest.severity
+                    AND COALESCE(src.matched_text, '') = COALESCE(findings_latest.matched_text, '')
+              )
+            """,
+            pair_params,
+        ).rowcount, 0)
+        counts["inserted"] += max(conn.execute(
+            f"""
+            {pairs_cte}
+            INSERT INTO findings_latest (skill_id, scan_id, rule_id, severity, category,
+                                        subcategory, line, matched_text, message, score_impact,
+                                        rule_name, description, analyzer, confidence, context)
+            SELECT p.target, src.scan_id, src.rule_id, src.severity, src.category,
+                   src.subcategory, src.line, src.matched_text, src.message, src.score_impact,
+                   src.rule_name, src.description, src.analyzer, src.confidence, src.context
+            FROM pairs p JOIN findings_latest src ON src.skill_id = p.source
+            WHERE NOT EXISTS (
+                SELECT 1 FROM findings_latest fl
+                WHERE fl.skill_id = p.target
+                  AND fl.rule_id = src.rule_id
+                  AND fl.severity = src.severity
+                  AND COALESCE(fl.matched_text, '') = COALESCE(src.matched_text, '')
+            )
+            """,
+            pair_params,
+        ).rowcount, 0)
+        conn.execute(
+            f"""
+            {pairs_cte}
+            INSERT INTO skill_scores (skill_id, score, grade, finding_count,
+                critical_count, high_count, medium_count, low_count, categories,
+                last_scan_id, updated_at)
+            SELECT p.target, ss.score, ss.grade, ss.finding_count,
+                   ss.critical_count, ss.high_count, ss.medium_count, ss.low_count, ss.categories,
+                   ss.last_scan_id, ?
+            FROM pairs p JOIN skill_scores ss ON ss.skill_id = p.source
+            WHERE 1
+            {_SCORE_UPSERT_CONFLICT_SQL}
+            """,
+            (*pair_params, now),
+        )
+        counts["skills"] += len(chunk)
+    return counts
+
+
 # --- Scans ---
 
 def create_scan(
@@ -262,38 +677,323 @@ def refresh_findings_latest(
     skill_id: str,
     scan_id: int,
     findings: list[Finding] | None = None,
+    *,
+    diff: bool = True,
 ) -> int:
-    """Replace latest findings for a skill. Writes directly, no historical copy.
+    """Bring findings_latest for a skill in line with a new scan.
+
+    By default only the churn is written (see diff_findings_latest); unchanged
+    rows keep their original scan_id and updated_at. With diff=False every row
+    for the skill is deleted and reinserted.
 
-    Returns count of findings written.
+    Returns count of findings for the skill after the refresh.
     """
-    from crawlers.models import SEVERITY_SCORE_IMPACT
+    if diff:
+        diff_findings_latest(conn, skill_id, scan_id, findings)
+        return len(findings or [])
 
     conn.execute("DELETE FROM findings_latest WHERE skill_id = ?", (skill_id,))
-
     if not findings:
         return 0
+    _insert_findings_latest(conn, skill_id, scan_id, findings)
+    return len(findings)
+
+
+def finding_fingerprint(rule_id: str, severity: str, matched_text: str | None) -> tuple[str, str, str]:
+    """Identity of a finding within a skill: (rule_id, severity, matched_text hash).
+
+    Mirrors the idx_findings_latest_dedup unique index, which treats NULL and
+    empty matched_text as equal.
+    """
+    text_hash = hashlib.sha256((matched_text or "").encode("utf-8")).hexdigest()[:16]
+    return rule_id, severity, text_hash
 
-    for f in findings:
-        impact = SEVERITY_SCORE_IMPACT.get(f.severity, 0)
-        context_json = json.dumps(f.context) if f.context else None
+
+def diff_findings_latest(
+    conn: libsql.Connection,
+    skill_id: str,
+    scan_id: int,
+    findings: list[Finding] | None = None,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> tuple[int, int]:
+    """Write only the difference between stored and newly scanned findings.
+
+    Loads the skill's current fingerprints in one query, inserts findings whose
+    fingerprint is new and deletes rows whose fingerprint disappeared. A skill
+    whose findings did not change costs a single SELECT and no writes.
+
+    Returns (inserted, removed).
+    """
+    existing: dict[tuple[str, str, str], int] = {}
+    for row_id, rule_id, severity, matched_text in conn.execute(
+        "SELECT id, rule_id, severity, matched_text FROM findings_latest WHERE skill_id = ?",
+        (skill_id,),
+    ).fetchall():
+        existing[finding_fingerprint(rule_id, severity, matched_text)] = row_id
+
+    new: dict[tuple[str, str, str], Finding] = {}
+    for f in findings or []:
+        new[finding_fingerprint(f.rule_id, f.severity.value, f.matched_text)] = f
+
+    removed_ids = [row_id for fp, row_id in existing.items() if fp not in new]
+    for chunk in _chunked(removed_ids, batch_size):
         conn.execute(
-            """
-            INSERT INTO findings_latest (skill_id, scan_id, rule_id, severity, category,
-                                        subcategory, line, matched_text, message, score_impact,
-                                        rule_name, description, analyzer, confidence, context)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(skill_id, rule_id, severity, COALESCE(matched_text, ''))
-            DO UPDATE SET scan_id = excluded.scan_id, updated_at = excluded.updated_at,
-                rule_name = excluded.rule_name, description = excluded.description,
-                analyzer = excluded.analyzer, confidence = excluded.confidence,
-                context = excluded.context
+            f"DELETE FROM findings_latest WHERE id IN ({', '.join(['?'] * len(chunk))})",
+            tuple(chunk),
+        )
+
+    added = [f for fp, f in new.items() if fp not in existing]
+    if added:
+        _insert_findings_latest(conn, skill_id, scan_id, added, batch_size=batch_size)
+
+    return len(added), len(removed_ids)
+
+
+def _insert_findings_latest(
+    conn: libsql.Connection,
+    skill_id: str,
+    scan_id: int,
+    findings: list[Finding],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Upsert findings_latest rows for a skill in chunked multi-row statements."""
+    from crawlers.models import SEVERITY_SCORE_IMPACT
+
+    rows = (
+        (skill_id, scan_id, f.rule_id, f.severity.value, f.category,
+         f.subcategory, f.line, f.matched_text, f.message,
+         SEVERITY_SCORE_IMPACT.get(f.severity, 0),
+         f.rule_name, f.description, f.analyzer, f.confidence,
+         json.dumps(f.context) if f.context else None)
+        for f in findings
+    )
+    return _insert_many(
+        conn,
+        """
+        INSERT INTO findings_latest (skill_id, scan_id, rule_id, severity, category,
+                                    subcategory, line, matched_text, message, score_impact,
+                                    rule_name, description, analyzer, confidence, context)
+        """,
+        """
+        ON CONFLICT(skill_id, rule_id, severity, COALESCE(matched_text, ''))
+        DO UPDATE SET scan_id = excluded.scan_id, updated_at = excluded.updated_at,
+            rule_name = excluded.rule_name, description = excluded.description,
+            analyzer = excluded.analyzer, confidence = excluded.confidence,
+            context = excluded.context
+        """,
+        rows,
+        batch_size,
+    )
+
+
+# --- Findings staging (set-based ingest) ---
+
+# Rows per multi-row INSERT when bulk-loading the staging table. Staging rows
+# have 15 columns, so 500 rows is 7,500 bound parameters per statement.
+STAGING_BATCH_SIZE = 500
+
+# Score/grade expressions shared by the set-based score upserts. Mirror
+# scanner.ingest.compute_score and models.score_to_grade.
+_STAGED_SCORE_SQL = "MAX(0, 100 - COALESCE(SUM(st.score_impact), 0))"
+_STAGED_GRADE_SQL = f"""CASE
+    WHEN {_STAGED_SCORE_SQL} >= 90 THEN 'A'
+    WHEN {_STAGED_SCORE_SQL} >= 75 THEN 'B'
+    WHEN {_STAGED_SCORE_SQL} >= 50 THEN 'C'
+    WHEN {_STAGED_SCORE_SQL} >= 25 THEN 'D'
+    ELSE 'F'
+END"""
+
+# Only rewrite a score row when something visible changed (same rule as
+# upsert_skill_score's pre-check, but evaluated inside the statement).
+_SCORE_UPSERT_CONFLICT_SQL = """
+    ON CONFLICT(skill_id) DO UPDATE SET
+        score = excluded.score, grade = excluded.grade,
+        finding_count = excluded.finding_count,
+        critical_count = excluded.critical_count,
+        high_count = excluded.high_count,
+        medium_count = excluded.medium_count,
+        low_count = excluded.low_count,
+        categories = excluded.categories,
+        last_scan_id = excluded.last_scan_id,
+        updated_at = excluded.updated_at
+    WHERE skill_scores.score != excluded.score
+       OR skill_scores.grade != excluded.grade
+       OR skill_scores.finding_count != excluded.finding_count
+"""
+
+
+def stage_findings(
+    conn: libsql.Connection,
+    scan_id: int,
+    findings: Iterable[tuple[str, Finding]],
+    *,
+    batch_size: int = STAGING_BATCH_SIZE,
+) -> int:
+    """Bulk-load (skill_id, Finding) pairs into findings_staging for a scan.
+
+    Returns count of rows staged.
+    """
+    from crawlers.models import SEVERITY_SCORE_IMPACT
+
+    rows = (
+        (scan_id, skill_id, f.rule_id, f.severity.value, f.category,
+         f.subcategory, f.line, f.matched_text, f.message,
+         SEVERITY_SCORE_IMPACT.get(f.severity, 0),
+         f.rule_name, f.description, f.analyzer, f.confidence,
+         json.dumps(f.context) if f.context else None)
+        for skill_id, f in findings
+    )
+    return _insert_many(
+        conn,
+        """
+        INSERT INTO findings_staging (scan_id, skill_id, rule_id, severity, category,
+                                     subcategory, line, matched_text, message, score_impact,
+                                     rule_name, description, analyzer, confidence, context)
+        """,
+        "",
+        rows,
+        batch_size,
+    )
+
+
+def reconcile_staged_findings(
+    conn: libsql.Connection,
+    scan_id: int,
+    registry_id: str,
+    *,
+    full: bool = True,
+    skip: Iterable[str] = (),
+) -> dict:
+    """Apply a staged scan to findings_latest and skill_scores with set-based SQL.
+
+    Scope is every live skill of the registry when `full` is True (skills with
+    no staged rows are scanned-clean: their stale findings are removed and they
+    score 100), otherwise only skills that have staged rows. `skip` lists skill
+    ids left out of the scan on purpose (duplicates whose findings are copied
+    from another listing); a full scope excludes them. Unchanged findings and
+    scores are left untouched. Clears the staged rows; the caller commits.
+
+    Returns counts: inserted, removed, skills_scanned, findings.
+    """
+    skip_json = json.dumps(sorted(skip))
+    if full:
+        scope_sql = ("SELECT id FROM skills WHERE registry_id = ? AND deleted = 0"
+                     " AND id NOT IN (SELECT value FROM json_each(?))")
+        scope_params: tuple = (registry_id, skip_json)
+    else:
+        scope_sql = "SELECT DISTINCT skill_id FROM findings_staging WHERE scan_id = ?"
+        scope_params = (scan_id,)
+
+    removed = conn.execute(
+        f"""
+        DELETE FROM findings_latest
+        WHERE skill_id IN ({scope_sql})
+          AND NOT EXISTS (
+              SELECT 1 FROM findings_staging st
+              WHERE st.scan_id = ?
+                AND st.skill_id = findings_latest.skill_id
+                AND st.rule_id = findings_latest.rule_id
+                AND st.severity = findings_latest.severity
+                AND COALESCE(st.matched_text, '') = COALESCE(findings_latest.matched_text, '')
+          )
+        """,
+        (*scope_params, scan_id),
+    ).rowcount
+
+    inserted = conn.execute(
+        """
+        INSERT INTO findings_latest (skill_id, scan_id, rule_id, severity, category,
+                                    subcategory, line, matched_text, message, score_impact,
+                                    rule_name, description, analyzer, confidence, context)
+        SELECT st.skill_id, st.scan_id, st.rule_id, st.severity, st.category,
+               st.subcategory, st.line, st.matched_text, st.message, st.score_impact,
+               st.rule_name, st.description, st.analyzer, st.confidence, st.context
+        FROM findings_staging st
+        WHERE st.scan_id = ?
+          AND NOT EXISTS (
+              SELECT 1 FROM findings_latest fl
+              WHERE fl.skill_id = st.skill_id
+                AND fl.rule_id = st.rule_id
+                AND fl.severity = st.severity
+                AND COALESCE(fl.matched_text, '') = COALESCE(st.matched_text, '')
+          )
+        ON CONFLICT(skill_id, rule_id, severity, COALESCE(matched_text, ''))
+        DO UPDATE SET scan_id = excluded.scan_id, updated_at = excluded.updated_at,
+            rule_name = excluded.rule_name, description = excluded.description,
+            analyzer = excluded.analyzer, confidence = excluded.confidence,
+            context = excluded.context
+        """,
+        (scan_id,),
+    ).rowcount
+
+    now = _now()
+    conn.execute(
+        f"""
+        INSERT INTO skill_scores (skill_id, score, grade, finding_count,
+            critical_count, high_count, medium_count, low_count, categories,
+            last_scan_id, updated_at)
+        SELECT st.skill_id,
+               {_STAGED_SCORE_SQL},
+               {_STAGED_GRADE_SQL},
+               COUNT(*),
+               SUM(CASE WHEN st.severity = 'CRITICAL' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN st.severity = 'HIGH' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN st.severity = 'MEDIUM' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN st.severity = 'LOW' THEN 1 ELSE 0 END),
+               (SELECT json_group_array(category) FROM (
+                    SELECT DISTINCT c.category FROM findings_staging c
+                    WHERE c.scan_id = st.scan_id AND c.skill_id = st.skill_id
+                    ORDER BY c.category)),
+               st.scan_id,
+               ?
+        FROM findings_staging st
+        WHERE st.scan_id = ?
+        GROUP BY st.skill_id
+        {_SCORE_UPSERT_CONFLICT_SQL}
+        """,
+        (now, scan_id),
+    )
+
+    skills_scanned, findings_count = conn.execute(
+        "SELECT COUNT(DISTINCT skill_id), COUNT(*) FROM findings_staging WHERE scan_id = ?",
+        (scan_id,),
+    ).fetchone()
+
+    if full:
+        clean_sql = """
+            FROM skills s
+            WHERE s.registry_id = ? AND s.deleted = 0
+              AND s.id NOT IN (SELECT value FROM json_each(?))
+              AND NOT EXISTS (
+                  SELECT 1 FROM findings_staging st
+                  WHERE st.scan_id = ? AND st.skill_id = s.id
+              )
+        """
+        conn.execute(
+            f"""
+            INSERT INTO skill_scores (skill_id, score, grade, finding_count,
+                critical_count, high_count, medium_count, low_count, categories,
+                last_scan_id, updated_at)
+            SELECT s.id, 100, 'A', 0, 0, 0, 0, 0, '[]', ?, ?
+            {clean_sql}
+            {_SCORE_UPSERT_CONFLICT_SQL}
             """,
-            (skill_id, scan_id, f.rule_id, f.severity.value, f.category,
-             f.subcategory, f.line, f.matched_text, f.message, impact,
-             f.rule_name, f.description, f.analyzer, f.confidence, context_json),
+            (scan_id, now, registry_id, skip_json, scan_id),
         )
-    return len(findings)
+        skills_scanned += conn.execute(
+            f"SELECT COUNT(*) {clean_sql}", (registry_id, skip_json, scan_id),
+        ).fetchone()[0]
+
+    conn.execute("DELETE FROM findings_staging WHERE scan_id = ?", (scan_id,))
+
+    return {
+        "inserted": inserted,
+        "removed": removed,
+        "skills_scanned": skills_scanned,
+        "findings": findings_count,
+    }
 
 
 # --- Scores ---
@@ -336,21 +1036,39 @@ def upsert_skill_score(conn: libsql.Connection, score: SkillScore, scan_id: int)
 
 def upsert_vendor_audit(conn: libsql.Connection, audit: VendorAudit) -> None:
     """Insert or update a vendor audit result."""
-    conn.execute(
+    upsert_vendor_audits(conn, [audit])
+
+
+def upsert_vendor_audits(
+    conn: libsql.Connection,
+    audits: Iterable[VendorAudit],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Insert or update many vendor audit results. Returns count of rows written."""
+    now = _now()
+    rows = (
+        (audit.skill_id, audit.vendor, audit.verdict, audit.risk_level,
+         audit.risk_score, audit.alert_count,
+         json.dumps(audit.findings), json.dumps(audit.raw_data) if audit.raw_data else None,
+         now)
+        for audit in audits
+    )
+    return _insert_many(
+        conn,
         """
         INSERT INTO vendor_audits (skill_id, vendor, verdict, risk_level, risk_score,
             alert_count, findings, raw_data, scraped_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        """
         ON CONFLICT(skill_id, vendor) DO UPDATE SET
             verdict = excluded.verdict, risk_level = excluded.risk_level,
             risk_score = excluded.risk_score, alert_count = excluded.alert_count,
             findings = excluded.findings, raw_data = excluded.raw_data,
             scraped_at = excluded.scraped_at
         """,
-        (audit.skill_id, audit.vendor, audit.verdict, audit.risk_level,
-         audit.risk_score, audit.alert_count,
-         json.dumps(audit.findings), json.dumps(audit.raw_data) if audit.raw_data else None,
-         _now()),
+        rows,
+        batch_size,
     )
 
 
@@ -366,24 +1084,50 @@ _DAILY_STAT_COLUMNS = frozenset({
 
 def upsert_daily_stat(conn: libsql.Connection, date: str, registry_id: str, **kwargs) -> None:
     """Insert or update daily stats. Only whitelisted column names are accepted."""
-    # Validate column names to prevent SQL injection
-    invalid = set(kwargs.keys()) - _DAILY_STAT_COLUMNS
-    if invalid:
-        raise ValueError(f"Invalid daily_stats columns: {invalid}")
+    upsert_daily_stats(conn, [{"date": date, "registry_id": registry_id, **kwargs}])
 
-    cols = ["date", "registry_id"] + list(kwargs.keys())
-    placeholders = ", ".join(["?"] * len(cols))
-    updates = ", ".join(f"{k} = excluded.{k}" for k in kwargs)
-    values = tuple([date, registry_id] + list(kwargs.values()))
 
-    conn.execute(
-        f"""
-        INSERT INTO daily_stats ({", ".join(cols)})
-        VALUES ({placeholders})
-        ON CONFLICT(date, registry_id) DO UPDATE SET {updates}
-        """,
-        values,
-    )
+def upsert_daily_stats(
+    conn: libsql.Connection,
+    stats: Iterable[dict],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Insert or update many daily stats rows.
+
+    Each dict needs 'date' and 'registry_id'; every other key must be a
+    whitelisted daily_stats column. Consecutive rows with the same column set
+    share a statement. Returns count of rows written.
+    """
+    groups: list[tuple[tuple[str, ...], list[tuple]]] = []
+    for row in stats:
+        row = dict(row)
+        date, registry_id = row.pop("date"), row.pop("registry_id")
+        # Validate column names to prevent SQL injection
+        invalid = set(row.keys()) - _DAILY_STAT_COLUMNS
+        if invalid:
+            raise ValueError(f"Invalid daily_stats columns: {invalid}")
+        keys = tuple(row.keys())
+        if not groups or groups[-1][0] != keys:
+            groups.append((keys, []))
+        groups[-1][1].append((date, registry_id, *row.values()))
+
+    written = 0
+    for keys, rows in groups:
+        cols = ["date", "registry_id", *keys]
+        updates = ", ".join(f"{k} = excluded.{k}" for k in keys)
+        conflict = (
+            f"ON CONFLICT(date, registry_id) DO UPDATE SET {updates}"
+            if updates else "ON CONFLICT(date, registry_id) DO NOTHING"
+        )
+        written += _insert_many(
+            conn,
+            f"INSERT INTO daily_stats ({', '.join(cols)})",
+            conflict,
+            rows,
+            batch_size,
+        )
+    return written
 
 
 # --- Crawl State (incremental watermarks) ---
@@ -397,17 +1141,41 @@ def get_crawl_state(conn: libsql.Connection, registry_id: str, key: str) -> str
     return row[0] if row else None
 
 
+def get_crawl_states(conn: libsql.Connection, registry_id: str) -> dict[str, str]:
+    """Read every crawl state value for a registry in one query."""
+    rows = conn.execute(
+        "SELECT key, value FROM crawl_state WHERE registry_id = ?",
+        (registry_id,),
+    ).fetchall()
+    return {row[0]: row[1] for row in rows}
+
+
 def set_crawl_state(conn: libsql.Connection, registry_id: str, key: str, value: str) -> None:
     """Write a crawl state value (upsert)."""
-    conn.execute(
+    set_crawl_states(conn, registry_id, {key: value})
+
+
+def set_crawl_states(
+    conn: libsql.Connection,
+    registry_id: str,
+    items: dict[str, str] | Iterable[tuple[str, str]],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Write many crawl state values for a registry. Returns count of rows written."""
+    if isinstance(items, dict):
+        items = items.items()
+    now = _now()
+    return _insert_many(
+        conn,
+        "INSERT INTO crawl_state (registry_id, key, value, updated_at)",
         """
-        INSERT INTO crawl_state (registry_id, key, value, updated_at)
-        VALUES (?, ?, ?, ?)
         ON CONFLICT(registry_id, key) DO UPDATE SET
             value = excluded.value,
             updated_at = excluded.updated_at
         """,
-        (registry_id, key, value, _now()),
+        ((registry_id, key, value, now) for key, value in items),
+        batch_size,
     )
 
 
@@ -435,19 +1203,149 @@ def finish_crawl_run(
     changed_files: int = 0,
     status: str = "completed",
     error: str | None = None,
+    concurrency: dict | None = None,
+    discovery_diff: dict | None = None,
+    noise: int = 0,
+    renormalised: int = 0,
 ) -> None:
-    """Mark a crawl run as completed or failed."""
+    """Mark a crawl run as completed or failed.
+
+    `concurrency` is the adaptive controller's summary (stored as JSON);
+    `discovery_diff` holds the added/removed/retained counts of a full crawl;
+    `noise`/`renormalised` count skills whose change was normalised away
+    (crawlers.normalize).
+    """
+    diff = discovery_diff or {}
     conn.execute(
         """
         UPDATE crawl_runs SET finished_at = ?, duration_s = ?,
             discovered = ?, downloaded = ?, skipped = ?, failed = ?,
-            changed_files = ?, status = ?, error = ?
+            changed_files = ?, status = ?, error = ?, concurrency = ?,
+            added = ?, removed = ?, retained = ?, noise = ?, renormalised = ?
         WHERE id = ?
         """,
         (_now(), duration_s, discovered, downloaded, skipped, failed,
-         changed_files, status, error, run_id),
+         changed_files, status, error,
+         json.dumps(concurrency) if concurrency else None,
+         diff.get("added"), diff.get("removed"), diff.get("retained"),
+         noise, renormalised, run_id),
+    )
+    conn.commit()
+
+
+# --- API Quota (shared across crawl shards) ---
+
+def observe_api_quota(
+    conn: libsql.Connection,
+    resource: str,
+    remaining: int,
+    reset_at: int,
+) -> None:
+    """Fold an observed X-RateLimit-Remaining/Reset into the shared pool.
+
+    Within a window the pool only shrinks (other shards' leases are already
+    deducted); a new window restarts it at the observed value minus the budget
+    still unspent in live leases.
+    """
+    now = int(time.time())
+    conn.execute(
+        """
+        INSERT INTO api_quota (resource, remaining, reset_at, updated_at)
+        VALUES (?, ? - COALESCE((
+            SELECT SUM(MAX(granted - used, 0)) FROM api_quota_leases
+            WHERE resource = ? AND expires_at > ?
+        ), 0), ?, ?)
+        ON CONFLICT(resource) DO UPDATE SET
+            remaining = CASE
+                WHEN excluded.reset_at > api_quota.reset_at THEN excluded.remaining
+                ELSE MIN(api_quota.remaining, excluded.remaining)
+            END,
+            reset_at = MAX(api_quota.reset_at, excluded.reset_at),
+            updated_at = excluded.updated_at
+        """,
+        (resource, remaining, resource, now, reset_at, _now()),
+    )
+    conn.commit()
+
+
+def lease_api_quota(
+    conn: libsql.Connection,
+    resource: str,
+    holder: str,
+    want: int,
+    *,
+    used: int = 0,
+    reserve: int = 0,
+    ttl_s: int = 900,
+) -> tuple[int, int | None]:
+    """Take up to `want` requests from the shared pool for `holder`.
+
+    Never dips below `reserve`. `used` is the holder's running total, recorded
+    on the lease. Returns (granted, reset_at); with no observation yet the
+    full request is granted and reset_at is None.
+    """
+    now = int(time.time())
+    for _ in range(5):
+        row = conn.execute(
+            "SELECT remaining, reset_at FROM api_quota WHERE resource = ?", (resource,),
+        ).fetchone()
+        if row is None:
+            granted, reset_at = want, None
+            break
+        remaining, reset_at = row
+        if reset_at <= now:
+            granted = want  # window already reset; next observation corrects the pool
+            break
+        granted = max(0, min(want, remaining - reserve))
+        if granted == 0:
+            break
+        # Compare-and-set: another shard may have leased since the SELECT
+        if conn.execute(
+            "UPDATE api_quota SET remaining = remaining - ? WHERE resource = ? AND remaining = ?",
+            (granted, resource, remaining),
+        ).rowcount:
+            break
+    else:
+        granted = 0
+
+    conn.execute(
+        """
+        INSERT INTO api_quota_leases (resource, holder, granted, used, expires_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(resource, holder) DO UPDATE SET
+            granted = api_quota_leases.granted + excluded.granted,
+            used = excluded.used,
+            expires_at = excluded.expires_at
+        """,
+        (resource, holder, granted, used, now + ttl_s),
+    )
+    conn.commit()
+    return granted, reset_at
+
+
+def release_api_quota(
+    conn: libsql.Connection,
+    resource: str,
+    holder: str,
+    *,
+    used: int,
+) -> int:
+    """Return the holder's unspent budget to the pool and drop its lease."""
+    row = conn.execute(
+        "SELECT granted FROM api_quota_leases WHERE resource = ? AND holder = ?",
+        (resource, holder),
+    ).fetchone()
+    unspent = max(0, row[0] - used) if row else 0
+    if unspent:
+        conn.execute(
+            "UPDATE api_quota SET remaining = remaining + ? WHERE resource = ?",
+            (unspent, resource),
+        )
+    conn.execute(
+        "DELETE FROM api_quota_leases WHERE resource = ? AND holder = ?", (resource, holder),
     )
     conn.commit()
+    return unspent
 
 
 # --- Audit Overrides ---
@@ -464,11 +1362,43 @@ def upsert_audit_override(
     matched_text_hash: str | None = None,
 ) -> None:
     """Insert or update an audit override for a specific finding."""
-    conn.execute(
+    upsert_audit_overrides(conn, [{
+        "skill_id": skill_id,
+        "rule_id": rule_id,
+        "verdict": verdict,
+        "reason": reason,
+        "auditor": auditor,
+        "confidence": confidence,
+        "matched_text_hash": matched_text_hash,
+    }])
+
+
+def upsert_audit_overrides(
+    conn: libsql.Connection,
+    overrides: Iterable[dict],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Insert or update many audit overrides.
+
+    Each dict needs 'skill_id', 'rule_id' and 'verdict' and may carry 'reason',
+    'auditor', 'confidence' and 'matched_text_hash' (same defaults as
+    upsert_audit_override). Returns count of rows written.
+    """
+    now = _now()
+    rows = (
+        (o["skill_id"], o["rule_id"], o["verdict"], o.get("reason"),
+         o.get("auditor", "heuristic"), o.get("confidence", 0.5),
+         o.get("matched_text_hash"), now)
+        for o in overrides
+    )
+    return _insert_many(
+        conn,
         """
         INSERT INTO audit_overrides (skill_id, rule_id, verdict, reason, auditor,
             confidence, matched_text_hash, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        """
         ON CONFLICT(skill_id, rule_id, matched_text_hash) DO UPDATE SET
             verdict = excluded.verdict,
             reason = excluded.reason,
@@ -476,8 +1406,8 @@ def upsert_audit_override(
             confidence = excluded.confidence,
             updated_at = excluded.updated_at
         """,
-        (skill_id, rule_id, verdict, reason, auditor, confidence,
-         matched_text_hash, _now()),
+        rows,
+        batch_size,
     )
 
 
@@ -0,0 +1,186 @@
+"""Fast content extraction for the HTML-scraping crawlers.
+
+Scraped registries are mostly Next.js sites, so a detail page usually carries
+its data twice: rendered HTML and an embedded JSON payload (`__NEXT_DATA__`
+on the pages router, `self.__next_f.push(...)` RSC chunks on the app
+router). Extraction tries the payload first, which needs no DOM at all, and
+falls back to one lxml parse plus targeted XPath lookups. Both are much
+cheaper than building a BeautifulSoup tree for every page.
+
+text_of() matches BeautifulSoup's get_text(separator, strip=True), so the
+fallback path yields the same content (and content hashes) as the old
+BeautifulSoup extraction.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterable, Iterator
+
+import lxml.html
+from lxml import etree
+
+# XPath namespace for EXSLT regular expressions: re:test(@class, 'a|b', 'i')
+XPATH_NS = {"re": "http://exslt.org/regular-expressions"}
+
+_NEXT_DATA_RE = re.compile(
+    r'<script[^>]*\bid="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL,
+)
+_RSC_PUSH_RE = re.compile(r"self\.__next_f\.push\((\[.*?\])\)\s*</script>", re.DOTALL)
+# Elements whose text is not page content (BeautifulSoup's get_text skips them too)
+_SKIP_TAGS = frozenset({"script", "style", "template"})
+
+
+# --- Embedded JSON payloads ---
+
+def next_data(html: str) -> dict | None:
+    """The page's `__NEXT_DATA__` JSON (Next.js pages router), if any."""
+    m = _NEXT_DATA_RE.search(html)
+    if not m:
+        return None
+    try:
+        return json.loads(m.group(1))
+    except ValueError:
+        return None
+
+
+def rsc_payload(html: str) -> str:
+    """Concatenated React Server Components flight data (Next.js app router)."""
+    parts = []
+    for m in _RSC_PUSH_RE.finditer(html):
+        try:
+            chunk = json.loads(m.group(1))
+        except ValueError:
+            continue
+        if len(chunk) > 1 and isinstance(chunk[1], str):
+            parts.append(chunk[1])
+    return "".join(parts)
+
+
+def rsc_rows(payload: str) -> Iterator[tuple[str, object]]:
+    """Parse flight data into (row id, value) pairs.
+
+    JSON rows (`id:<json>\\n`) yield the decoded value; text rows
+    (`id:T<hex byte length>,<text>`) yield the raw string, typically long
+    markdown referenced elsewhere as "$id". Rows that aren't plain JSON
+    (module and hint rows) are skipped.
+    """
+    data = payload.encode("utf-8")
+    pos = 0
+    while pos < len(data):
+        colon = data.find(b":", pos)
+        if colon < 0:
+            return
+        row_id = data[pos:colon].decode("utf-8", errors="replace").strip()
+        if data[colon + 1:colon + 2] == b"T":
+            comma = data.find(b",", colon)
+            try:
+                length = int(data[colon + 2:comma], 16)
+            except ValueError:
+                return
+            end = comma + 1 + length
+            yield row_id, data[comma + 1:end].decode("utf-8", errors="replace")
+            pos = end
+            continue
+        newline = data.find(b"\n", colon)
+        if newline < 0:
+            newline = len(data)
+        try:
+            yield row_id, json.loads(data[colon + 1:newline])
+        except ValueError:
+            pass
+        pos = newline + 1
+
+
+def find_strings(obj: object, keys: Iterable[str]) -> Iterator[str]:
+    """Every string stored under one of `keys` in a decoded JSON value."""
+    keys = frozenset(keys)
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for k, v in node.items():
+                if k in keys and isinstance(v, str):
+                    yield v
+                elif isinstance(v, (dict, list)):
+                    stack.append(v)
+        elif isinstance(node, list):
+            stack.extend(v for v in node if isinstance(v, (dict, list)))
+
+
+def embedded_string(html: str, keys: Iterable[str], *, min_len: int = 1) -> str | None:
+    """Longest string under one of `keys` in the page's `__NEXT_DATA__` or RSC payload.
+
+    The longest candidate wins so that e.g. a README "content" beats a
+    <meta content=...> prop. RSC references to text rows ("$1a") are
+    resolved to the row's text. Returns None below `min_len` chars.
+    """
+    keys = tuple(keys)
+    candidates: list[str] = []
+    data = next_data(html)
+    if data is not None:
+        candidates.extend(find_strings(data, keys))
+
+    payload = rsc_payload(html)
+    if payload:
+        texts: dict[str, str] = {}
+        rows = []
+        for row_id, value in rsc_rows(payload):
+            if isinstance(value, str):
+                texts[row_id] = value
+            else:
+                rows.append(value)
+        for value in rows:
+            for found in find_strings(value, keys):
+                if found.startswith("$") and found[1:] in texts:
+                    found = texts[found[1:]]
+                candidates.append(found)
+
+    best = max(candidates, key=len, default=None)
+    return best if best is not None and len(best) >= min_len else None
+
+
+# --- lxml fallback ---
+
+def parse_html(html: str) -> etree._Element | None:
+    """Parse HTML with lxml (the same libxml2 parser BeautifulSoup's "lxml" uses)."""
+    if not html or not html.strip():
+        return None
+    try:
+        return lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def first(tree: etree._Element, *xpaths: str) -> etree._Element | None:
+    """First element matched by the first XPath (in order) that matches anything."""
+    for xpath in xpaths:
+        found = tree.xpath(xpath, namespaces=XPATH_NS)
+        if found:
+            return found[0]
+    return None
+
+
+def text_of(element: etree._Element, separator: str = "\n") -> str:
+    """Stripped, non-empty text nodes joined by `separator` (like get_text(strip=True))."""
+    parts: list[str] = []
+    _collect_text(element, parts)
+    return separator.join(parts)
+
+
+def _collect_text(node: etree._Element, parts: list[str]) -> None:
+    if not isinstance(node.tag, str) or node.tag in _SKIP_TAGS:
+        return  # comments, processing instructions, scripts
+    if node.text and node.text.strip():
+        parts.append(node.text.strip())
+    for child in node:
+        _collect_text(child, parts)
+        if child.tail and child.tail.strip():
+            parts.append(child.tail.strip())
+
+
+def meta_content(tree: etree._Element, name: str) -> str:
+    """content of <meta name=...>, or ""."""
+    found = tree.xpath("//meta[@name=$name]/@content", name=name)
+    return found[0] if found else ""
@@ -0,0 +1,400 @@
+"""In-process GitHub client shared by the crawlers.
+
+One keep-alive requests.Session per crawler replaces `gh api` subprocesses
+and ad-hoc raw.githubusercontent.com fetches:
+    - REST calls carry the token from GH_TOKEN/GITHUB_TOKEN and send
+      If-None-Match for URLs seen before (304s don't count against the quota)
+    - default branches are resolved once per repo and cached
+    - trees and raw files use the default branch (or HEAD) instead of
+      probing main then master
+Requests go through the crawler's HostRateLimiter and, when given, the
+shared QuotaCoordinator and on-disk HttpCache (which persists validators
+and bodies across runs, so README and tree fetches revalidate instead of
+re-downloading).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tarfile
+import threading
+from collections.abc import Callable, Iterable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from crawlers.httpcache import CachingAdapter, HttpCache
+from crawlers.quota import QuotaCoordinator, QuotaExhausted
+from crawlers.ratelimit import HostRateLimiter
+from crawlers.upstream import repo_of
+
+logger = logging.getLogger("observatory.github")
+
+GITHUB_API = "https://api.github.com"
+GITHUB_GRAPHQL = "https://api.github.com/graphql"
+RAW_BASE = "https://raw.githubusercontent.com"
+USER_AGENT = "AguaraObservatory/0.1 (https://github.com/garagon/aguara-observatory)"
+
+# Abort an archive stream beyond this many compressed bytes
+ARCHIVE_MAX_BYTES = 200 * 1024 * 1024
+
+
+def parse_repo_url(url: str) -> tuple[str, str] | None:
+    """Return canonical (owner, repo) for a github.com repo URL, else None.
+
+    Canonical (lowercase, no .git or /tree/... suffix) so every registry
+    linking one repo requests the same URLs and shares the HTTP cache.
+    """
+    parsed = repo_of(url)
+    if not parsed or parsed[0] != "github.com":
+        return None
+    return parsed[1], parsed[2]
+
+
+def raw_url(owner: str, repo: str, path: str, ref: str = "HEAD") -> str:
+    """raw.githubusercontent.com URL; ref HEAD resolves to the default branch."""
+    return f"{RAW_BASE}/{owner}/{repo}/{ref}/{path}"
+
+
+def git_blob_sha(content: str) -> str:
+    """Git blob SHA-1 of UTF-8 text, as `git hash-object` would report it."""
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class ArchiveTooLarge(Exception):
+    """Raised when a repo archive exceeds the configured size limit."""
+
+
+class _LimitedReader:
+    """File-like wrapper that stops a stream after `limit` bytes."""
+
+    def __init__(self, raw, limit: int):
+        self.raw = raw
+        self.remaining = limit
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        self.remaining -= len(data)
+        if self.remaining < 0:
+            raise ArchiveTooLarge()
+        return data
+
+
+class GitHubClient:
+    """Pooled, thread-safe GitHub REST + raw content client."""
+
+    def __init__(
+        self,
+        *,
+        token: str | None = None,
+        rate_limiter: HostRateLimiter | None = None,
+        quota: QuotaCoordinator | None = None,
+        quota_timeout_s: float | None = None,
+        cache: HttpCache | None = None,
+        pool_size: int = 32,
+        timeout: int = 30,
+    ):
+        self.token = token if token is not None else (
+            os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN", "")
+        )
+        self.rate_limiter = rate_limiter
+        self.quota = quota
+        self.quota_timeout_s = quota_timeout_s
+        self.timeout = timeout
+        self.session = requests.Session()
+        if cache is not None:
+            adapter = CachingAdapter(cache, pool_connections=4, pool_maxsize=pool_size)
+        else:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = USER_AGENT
+        self._api_headers = {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        if self.token:
+            self._api_headers["Authorization"] = f"Bearer {self.token}"
+        # {url: (etag, payload)} for conditional REST requests
+        self._etags: dict[str, tuple[str, object]] = {}
+        # {"owner/repo": default branch, or None for missing repos}
+        self._default_branches: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self.session.close()
+
+    # --- Transport ---
+
+    def _get(self, url: str, headers: dict | None = None) -> requests.Response | None:
+        if self.rate_limiter:
+            self.rate_limiter.wait(url)
+        try:
+            resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.debug("GitHub request failed for %s: %s", url, e)
+            return None
+        if self.rate_limiter:
+            self.rate_limiter.observe(url, resp.status_code, resp.headers)
+        return resp
+
+    def api(self, endpoint: str) -> dict | list | None:
+        """GET a REST endpoint; returns parsed JSON, or None on any failure.
+
+        Raises QuotaExhausted when the shared quota is dry for longer than
+        `quota_timeout_s`.
+        """
+        url = f"{GITHUB_API}/{endpoint.lstrip('/')}"
+        if self.quota and not self.quota.acquire(timeout=self.quota_timeout_s):
+            raise QuotaExhausted(endpoint)
+
+        headers = dict(self._api_headers)
+        with self._lock:
+            cached = self._etags.get(url)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+        resp = self._get(url, headers)
+        if resp is None:
+            return None
+        if self.quota:
+            self.quota.observe(resp.headers)
+        if resp.status_code == 304 and cached:
+            return cached[1]
+        if resp.status_code != 200:
+            if resp.status_code not in (404, 409):  # 409: empty repository
+                logger.debug("GitHub API %s -> %d", endpoint, resp.status_code)
+            return None
+        try:
+            data = resp.json()
+        except ValueError:
+            return None
+        etag = resp.headers.get("ETag")
+        if etag:
+            with self._lock:
+                self._etags[url] = (etag, data)
+        return data
+
+    # --- Repos ---
+
+    def default_branch(self, owner: str, repo: str) -> str | None:
+        """Default branch of a repo (one API call per repo per run)."""
+        key = f"{owner}/{repo}"
+        with self._lock:
+            if key in self._default_branches:
+                return self._default_branches[key]
+        data = self.api(f"repos/{owner}/{repo}")
+        branch = data.get("default_branch") if isinstance(data, dict) else None
+        with self._lock:
+            self._default_branches[key] = branch
+        return branch
+
+    def _ref(self, owner: str, repo: str) -> str:
+        """Cached default branch if already known, else HEAD (resolved server-side)."""
+        with self._lock:
+            return self._default_branches.get(f"{owner}/{repo}") or "HEAD"
+
+    def tree(self, owner: str, repo: str, ref: str | None = None) -> list[dict] | None:
+        """Recursive git tree entries for `ref` (default branch when omitted)."""
+        ref = ref or self._ref(owner, repo)
+        data = self.api(f"repos/{owner}/{repo}/git/trees/{ref}?recursive=1")
+        if isinstance(data, dict) and "tree" in data:
+            if data.get("truncated"):
+                logger.debug("Tree for %s/%s truncated", owner, repo)
+            return data["tree"]
+        return None
+
+    def raw(self, owner: str, repo: str, path: str, ref: str | None = None) -> str | None:
+        """File contents from raw.githubusercontent.com (no REST quota)."""
+        resp = self._get(raw_url(owner, repo, path, ref or self._ref(owner, repo)))
+        if resp is not None and resp.status_code == 200:
+            return resp.text
+        return None
+
+    def readme(self, owner: str, repo: str, *, api_fallback: bool = False) -> str | None:
+        """README.md from the default branch.
+
+        With `api_fallback` (and a token), a missing README.md falls back to the
+        REST readme endpoint, which finds any README name/case but spends quota.
+        """
+        content = self.raw(owner, repo, "README.md")
+        if content or not api_fallback or not self.token:
+            return content
+        if self.quota and not self.quota.acquire(timeout=0):
+            return None
+        url = f"{GITHUB_API}/repos/{owner}/{repo}/readme"
+        resp = self._get(url, {**self._api_headers, "Accept": "application/vnd.github.raw+json"})
+        if resp is not None and self.quota:
+            self.quota.observe(resp.headers)
+        if resp is not None and resp.status_code == 200:
+            return resp.text
+        return None
+
+    def archive_files(
+        self,
+        owner: str,
+        repo: str,
+        want: Callable[[str], bool],
+        *,
+        max_bytes: int = ARCHIVE_MAX_BYTES,
+    ) -> dict[str, str] | None:
+        """Stream the default-branch tarball and return {path: text} for wanted members.
+
+        The archive is read as a stream (never written to disk or held whole);
+        only members whose repo-relative path passes `want` are decoded. Costs
+        one REST call. Returns None on failure or past `max_bytes`.
+        """
+        endpoint = f"repos/{owner}/{repo}/tarball"
+        url = f"{GITHUB_API}/{endpoint}"
+        if self.quota and not self.quota.acquire(timeout=self.quota_timeout_s):
+            raise QuotaExhausted(endpoint)
+        if self.rate_limiter:
+            self.rate_limiter.wait(url)
+        try:
+            resp = self.session.get(url, headers=self._api_headers, stream=True, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.debug("Archive request failed for %s/%s: %s", owner, repo, e)
+            return None
+        with resp:
+            if self.rate_limiter:
+                self.rate_limiter.observe(url, resp.status_code, resp.headers)
+            if self.quota:
+                self.quota.observe(resp.headers)
+            if resp.status_code != 200:
+                return None
+            files: dict[str, str] = {}
+            try:
+                with tarfile.open(fileobj=_LimitedReader(resp.raw, max_bytes), mode="r|gz") as tar:
+                    for member in tar:
+                        if not member.isfile():
+                            continue
+                        # Strip the "<owner>-<repo>-<sha>/" top-level directory
+                        path = member.name.split("/", 1)[1] if "/" in member.name else member.name
+                        if want(path):
+                            f = tar.extractfile(member)
+                            if f is not None:
+                                files[path] = f.read().decode("utf-8", errors="replace")
+            except ArchiveTooLarge:
+                logger.info("Archive for %s/%s exceeds %d bytes, skipping", owner, repo, max_bytes)
+                return None
+            except (tarfile.TarError, OSError, EOFError, requests.RequestException) as e:
+                logger.debug("Archive read failed for %s/%s: %s", owner, repo, e)
+                return None
+        return files
+
+    # --- GraphQL ---
+
+    def graphql(self, query: str) -> dict | None:
+        """POST a GraphQL query; returns `data` (possibly partial), None on failure.
+
+        GraphQL has its own point budget, so the REST quota coordinator is not
+        charged; the api.github.com rate-limit bucket still applies.
+        """
+        if not self.token:
+            return None
+        if self.rate_limiter:
+            self.rate_limiter.wait(GITHUB_GRAPHQL)
+        try:
+            resp = self.session.post(
+                GITHUB_GRAPHQL, json={"query": query},
+                headers=self._api_headers, timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            logger.debug("GraphQL request failed: %s", e)
+            return None
+        if self.rate_limiter:
+            self.rate_limiter.observe(GITHUB_GRAPHQL, resp.status_code, resp.headers)
+        if resp.status_code != 200:
+            logger.debug("GraphQL -> %d", resp.status_code)
+            return None
+        try:
+            payload = resp.json()
+        except ValueError:
+            return None
+        if payload.get("errors") and not payload.get("data"):
+            logger.debug("GraphQL errors: %s", payload["errors"][:3])
+        return payload.get("data")
+
+    def fetch_blobs(
+        self,
+        paths: Iterable[tuple[str, str, str]],
+        *,
+        ref: str = "HEAD",
+        batch_size: int = 100,
+    ) -> dict[tuple[str, str, str], tuple[str, str]]:
+        """Resolve many (owner, repo, path) text blobs with batched GraphQL queries.
+
+        Each query asks for up to `batch_size` paths, grouped per repository.
+        Returns {(owner, repo, path): (blob oid, text)} for the paths that
+        exist as non-binary, untruncated text; misses are simply absent.
+        """
+        pending = list(dict.fromkeys(paths))
+        found: dict[tuple[str, str, str], tuple[str, str]] = {}
+        for i in range(0, len(pending), batch_size):
+            chunk = pending[i:i + batch_size]
+            by_repo: dict[tuple[str, str], list[str]] = {}
+            for owner, repo, path in chunk:
+                by_repo.setdefault((owner, repo), []).append(path)
+
+            aliases: dict[tuple[str, str], tuple[str, str, str]] = {}
+            parts = []
+            for r, ((owner, repo), repo_paths) in enumerate(by_repo.items()):
+                fields = []
+                for p, path in enumerate(repo_paths):
+                    aliases[(f"r{r}", f"p{p}")] = (owner, repo, path)
+                    fields.append(
+                        f"p{p}: object(expression: {json.dumps(f'{ref}:{path}')}) "
+                        "{ ... on Blob { oid text isBinary isTruncated } }"
+                    )
+                parts.append(
+                    f"r{r}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) "
+                    f"{{ {' '.join(fields)} }}"
+                )
+            data = self.graphql(f"query {{ {' '.join(parts)} }}")
+            if not data:
+                continue
+            for (r, p), key in aliases.items():
+                blob = (data.get(r) or {}).get(p)
+                if blob and blob.get("text") is not None and not blob.get("isBinary") \
+                        and not blob.get("isTruncated"):
+                    found[key] = (blob["oid"], blob["text"])
+        return found
+
+    def head_commits(
+        self,
+        repos: Iterable[tuple[str, str]],
+        *,
+        batch_size: int = 100,
+    ) -> dict[tuple[str, str], str]:
+        """Default-branch HEAD commit SHA of many repos, `batch_size` per GraphQL query.
+
+        Also caches each repo's default branch. Missing or empty repos are absent.
+        """
+        pending = list(dict.fromkeys(repos))
+        heads: dict[tuple[str, str], str] = {}
+        for i in range(0, len(pending), batch_size):
+            chunk = pending[i:i + batch_size]
+            parts = [
+                f"r{n}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) "
+                "{ defaultBranchRef { name target { oid } } }"
+                for n, (owner, repo) in enumerate(chunk)
+            ]
+            data = self.graphql(f"query {{ {' '.join(parts)} }}")
+            if not data:
+                continue
+            for n, (owner, repo) in enumerate(chunk):
+                ref = (data.get(f"r{n}") or {}).get("defaultBranchRef")
+                if not ref:
+                    continue
+                heads[(owner, repo)] = ref["target"]["oid"]
+                with self._lock:
+                    self._default_branches.setdefault(f"{owner}/{repo}", ref["name"])
+        return heads
+
+    def readme_for_url(self, github_url: str) -> str | None:
+        """README for a github.com repo URL (None for non-repo URLs)."""
+        parsed = parse_repo_url(github_url)
+        return self.readme(*parsed) if parsed else None
@@ -5,20 +5,21 @@ Glama publishes a REST API at glama.ai/api/mcp/v1.
 Discovery uses cursor-based pagination, download fetches server detail.
 
 Incremental mode: uses index hash to detect changes in the listing.
+Runs on the asyncio engine (AsyncBaseCrawler).
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-import re
-import time
+from collections.abc import AsyncIterator
 
-import requests
+import aiohttp
 
-from crawlers.base import BaseCrawler
+from crawlers.async_base import AsyncBaseCrawler
+from crawlers.github import parse_repo_url, raw_url
 from crawlers.models import CrawlResult
-from crawlers.utils import content_hash
 
 logger = logging.getLogger("observatory.glama")
 
@@ -26,19 +27,24 @@ GLAMA_API = "https://glama.ai/api/mcp/v1"
 PAGE_SIZE = 100  # Max supported by the API
 
 
-class GlamaCrawler(BaseCrawler):
+class GlamaCrawler(AsyncBaseCrawler):
     registry_id = "glama"
+    # Glama documents 100 req/s; README fetches get their own GitHub bucket
+    rate_limits = {
+        "glama.ai": (10, 10),
+        "raw.githubusercontent.com": (100, 5),
+    }
 
-    def __init__(self, conn, *, output_dir=None, rate_limit_ms=1000, shard=None, max_workers=4, crawl_mode="incremental"):
-        super().__init__(conn, output_dir=output_dir, rate_limit_ms=rate_limit_ms, shard=shard, max_workers=max_workers, crawl_mode=crawl_mode)
+    def __init__(self, conn, *, output_dir=None, rate_limit_ms=1000, shard=None, max_workers=4, crawl_mode="incremental", max_concurrency=64):
+        super().__init__(conn, output_dir=output_dir, rate_limit_ms=rate_limit_ms, shard=shard, max_workers=max_workers, crawl_mode=crawl_mode, max_concurrency=max_concurrency)
 
-    def discover(self) -> list[dict]:
+    async def adiscover(self) -> AsyncIterator[dict]:
         """Fetch all servers from Glama API with cursor-based pagination.
 
-        Uses first/after pagination (GraphQL relay-style).
-        Rate limit: 100 requests/second.
+        Uses first/after pagination (GraphQL relay-style), yielding each page
+        as it arrives. Rate limit: 100 requests/second.
         """
-        all_servers = []
+        discovered = 0
         cursor = None
 
         while True:
@@ -47,14 +53,13 @@ class GlamaCrawler(BaseCrawler):
                 url += f"&after={cursor}"
 
             try:
-                self.rate_limiter.wait()
-                resp = requests.get(url, timeout=30, headers={
-                    "User-Agent": "AguaraObservatory/0.1 (https://github.com/garagon/aguara-observatory)",
-                })
-                resp.raise_for_status()
-                data = resp.json()
+                await self.rate_limiter.async_wait(url)
+                async with self.request("GET", url) as resp:
+                    resp.raise_for_status()
+                    data = await resp.json()
             except Exception as e:
                 logger.error("Glama API error: %s", e)
+                self.discovery_incomplete(f"listing failed after {discovered} servers")
                 break
 
             servers = data.get("servers", [])
@@ -79,7 +84,8 @@ class GlamaCrawler(BaseCrawler):
                     slug = namespace
                     qualified_name = namespace
 
-                all_servers.append({
+                discovered += 1
+                yield {
                     "slug": slug,
                     "name": server.get("name", qualified_name),
                     "url": server.get("url", f"https://glama.ai/mcp/servers/{server_id}"),
@@ -91,7 +97,7 @@ class GlamaCrawler(BaseCrawler):
                         "repository_url": (server.get("repository") or {}).get("url", ""),
                     },
                     "qualified_name": qualified_name,
-                })
+                }
 
             has_next = page_info.get("hasNextPage", False)
             cursor = page_info.get("endCursor")
@@ -99,13 +105,12 @@ class GlamaCrawler(BaseCrawler):
             if not has_next or not cursor:
                 break
 
-            if len(all_servers) % 500 == 0:
-                logger.info("Discovered %d servers so far...", len(all_servers))
+            if discovered % 500 == 0:
+                logger.info("Discovered %d servers so far...", discovered)
 
-        logger.info("Glama: discovered %d total servers", len(all_servers))
-        return all_servers
+        logger.info("Glama: discovered %d total servers", discovered)
 
-    def download(self, slug: str, **kwargs) -> CrawlResult:
+    async def adownload(self, slug: str, **kwargs) -> CrawlResult:
         """Download server detail from Glama API.
 
         Fetches detail endpoint and GitHub README for full content.
@@ -115,17 +120,17 @@ class GlamaCrawler(BaseCrawler):
         metadata = kwargs.get("metadata", {})
 
         # Try to get detail from the API
-        detail = self._fetch_detail(qualified_name)
+        detail = await self._fetch_detail(qualified_name)
 
         # Build content from detail + GitHub README
-        content = self._build_content(detail, metadata, kwargs)
+        content = await self._build_content(detail, metadata, kwargs)
 
         if not content:
             return CrawlResult(skill_id=skill_id, slug=slug, error="No content available")
 
-        new_hash = content_hash(content)
+        new_hash, canon = self.canonical_hash(content)
         if not self.is_content_changed(skill_id, new_hash):
-            return CrawlResult(skill_id=skill_id, slug=slug, skipped=True)
+            return CrawlResult(skill_id=skill_id, slug=slug, skipped=True, **canon)
 
         return CrawlResult(
             skill_id=skill_id,
@@ -135,28 +140,35 @@ class GlamaCrawler(BaseCrawler):
             content=content,
             content_hash=new_hash,
             content_size=len(content),
+            **canon,
         )
 
-    def _fetch_detail(self, qualified_name: str) -> dict | None:
-        """Fetch server detail from Glama API."""
+    async def _fetch_detail(self, qualified_name: str) -> dict | None:
+        """Fetch server detail from Glama API.
+
+        A 429 holds the host in the rate limiter and the fetch is retried, so
+        throttling doesn't silently degrade content to the metadata fallback.
+        """
         url = f"{GLAMA_API}/servers/{qualified_name}"
-        try:
-            self.rate_limiter.wait()
-            resp = requests.get(url, timeout=20, headers={
-                "User-Agent": "AguaraObservatory/0.1 (https://github.com/garagon/aguara-observatory)",
-            })
-            if resp.status_code == 404:
-                return None
-            if resp.status_code == 429:
-                time.sleep(2)
+        for _attempt in range(3):
+            try:
+                await self.rate_limiter.async_wait(url)
+                resp = await self.get_cached(url, timeout=aiohttp.ClientTimeout(total=20))
+                if resp.status == 404:
+                    return None
+                if resp.status == 429:
+                    continue
+                if resp.status != 200:
+                    logger.debug("Glama detail fetch for %s -> %d", qualified_name, resp.status)
+                    return None
+                return resp.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.debug("Glama detail fetch failed for %s: %s", qualified_name, e)
                 return None
-            resp.raise_for_status()
-            return resp.json()
-        except requests.RequestException as e:
-            logger.debug("Glama detail fetch failed for %s: %s", qualified_name, e)
-            return None
+        logger.debug("Glama detail fetch for %s still throttled after retries", qualified_name)
+        return None
 
-    def _build_content(self, detail: dict | None, metadata: dict, kwargs: dict) -> str | None:
+    async def _build_content(self, detail: dict | None, metadata: dict, kwargs: dict) -> str | None:
         """Build a Markdown document from Glama server detail + metadata."""
         name = kwargs.get("name", "")
         desc = metadata.get("description", "")
@@ -212,7 +224,7 @@ class GlamaCrawler(BaseCrawler):
             repo_url = (detail.get("repository") or {}).get("url", "")
 
         if repo_url and "github.com" in repo_url:
-            readme = self._download_github_readme(repo_url)
+            readme = await self._download_github_readme(repo_url)
             if readme:
                 parts.append("\n## README\n")
                 parts.append(readme)
@@ -220,21 +232,19 @@ class GlamaCrawler(BaseCrawler):
         content = "\n".join(parts)
         return content if len(content) > 20 else None
 
-    def _download_github_readme(self, github_url: str) -> str | None:
-        """Download README.md from a GitHub repo URL."""
-        m = re.match(r"https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$", github_url)
-        if not m:
+    async def _download_github_readme(self, github_url: str) -> str | None:
+        """Download README.md from a GitHub repo URL (default branch, one request)."""
+        parsed = parse_repo_url(github_url)
+        if not parsed:
             return None
-        owner, repo = m.group(1), m.group(2)
-        for branch in ("main", "master"):
-            url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/README.md"
-            try:
-                self.rate_limiter.wait()
-                resp = requests.get(url, timeout=15)
-                if resp.status_code == 200:
-                    return resp.text
-            except requests.RequestException:
-                pass
+        url = raw_url(*parsed, "README.md")
+        try:
+            await self.rate_limiter.async_wait(url)
+            resp = await self.get_cached(url, timeout=aiohttp.ClientTimeout(total=15))
+            if resp.status == 200:
+                return resp.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
         return None
 
 
@@ -249,6 +259,8 @@ def main():
     parser = argparse.ArgumentParser(description="Crawl Glama.ai registry")
     parser.add_argument("--output-dir", type=Path, help="Output directory")
     parser.add_argument("--mode", choices=["full", "incremental"], default="incremental", help="Crawl mode")
+    parser.add_argument("--max-concurrency", type=int, default=64,
+                        help="Ceiling for adaptive download concurrency")
     parser.add_argument("--limit", type=int, default=0, help="Max servers to crawl (0=unlimited)")
     args = parser.parse_args()
 
@@ -256,7 +268,9 @@ def main():
     conn = connect()
     init_schema(conn)
 
-    crawler = GlamaCrawler(conn, output_dir=args.output_dir, crawl_mode=args.mode)
+    crawler = GlamaCrawler(
+        conn, output_dir=args.output_dir, crawl_mode=args.mode, max_concurrency=args.max_concurrency,
+    )
     stats = crawler.crawl()
     conn.commit()
     print(json.dumps(stats, indent=2))
@@ -0,0 +1,366 @@
+"""On-disk HTTP conditional-request cache shared by the crawlers.
+
+Layout under the cache root:
+    index/<aa>/<sha256 of URL>.json   validators and body digest per URL
+    bodies/<aa>/<sha256 of body>      response bodies, content-addressed
+
+A cached URL is revalidated with If-None-Match / If-Modified-Since and a 304
+is answered from the stored body, so an unchanged page costs a round trip
+but no body bytes. Entries fetched less than `fresh_s` ago are served with
+no request at all: the same README URL asked for by several registries (or
+several skills) in one run hits the network once. Concurrent requests for
+one URL within a process are collapsed into a single fetch.
+
+Requests that carry their own validators (a crawler doing its own ETag
+bookkeeping), streamed downloads and non-GET methods bypass the cache.
+Writes go through a temp file + os.replace, so crawler processes can share
+one cache directory: OBSERVATORY_HTTP_CACHE, else `.http-cache` next to the
+crawler's output dir (data/.http-cache), kept out of the scanned data/<registry>
+trees.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger("observatory.httpcache")
+
+CACHE_DIR_ENV = "OBSERVATORY_HTTP_CACHE"
+# Entries younger than this are served without revalidation
+DEFAULT_FRESH_S = 6 * 3600
+# Entries not fetched or revalidated for this long are pruned
+MAX_AGE_S = 30 * 24 * 3600
+# Larger bodies are passed through uncached
+MAX_BODY_BYTES = 20 * 1024 * 1024
+# Response headers kept with an entry and replayed on cache hits
+_STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+_CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since", "Range")
+
+
+class HttpCache:
+    """Content-addressed HTTP body store keyed by URL. Thread-safe."""
+
+    def __init__(self, root: Path, *, fresh_s: float = DEFAULT_FRESH_S):
+        self.root = Path(root)
+        self.fresh_s = fresh_s
+        self.stats = {
+            "fresh": 0,  # served without a request
+            "revalidated": 0,  # 304 answered from the stored body
+            "fetched": 0,  # full 200 responses
+            "bytes_downloaded": 0,
+            "bytes_saved": 0,
+        }
+        self._stats_lock = threading.Lock()
+        # {url: (lock, holders)}: one fetch per URL at a time across threads
+        self._url_locks: dict[str, tuple[threading.Lock, int]] = {}
+        self._url_locks_lock = threading.Lock()
+
+    # --- Entries ---
+
+    @staticmethod
+    def cacheable(method: str, headers: Mapping[str, str]) -> bool:
+        """GETs whose conditional headers aren't managed by the caller."""
+        return method.upper() == "GET" and not any(h in headers for h in _CONDITIONAL_HEADERS)
+
+    def _index_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / "index" / key[:2] / f"{key}.json"
+
+    def _body_path(self, digest: str) -> Path:
+        return self.root / "bodies" / digest[:2] / digest
+
+    def lookup(self, url: str) -> dict | None:
+        """Stored entry for `url`, or None."""
+        try:
+            return json.loads(self._index_path(url).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry.get("fetched_at", 0) < self.fresh_s
+
+    @staticmethod
+    def validators(entry: dict) -> dict[str, str]:
+        """Conditional request headers replaying the entry's validators."""
+        headers = {}
+        stored = entry.get("headers", {})
+        if stored.get("ETag"):
+            headers["If-None-Match"] = stored["ETag"]
+        if stored.get("Last-Modified"):
+            headers["If-Modified-Since"] = stored["Last-Modified"]
+        return headers
+
+    def read_body(self, entry: dict) -> bytes | None:
+        try:
+            return self._body_path(entry["body"]).read_bytes()
+        except (OSError, KeyError):
+            return None
+
+    def store(self, url: str, body: bytes, headers: Mapping[str, str]) -> None:
+        """Record a 200 response's body and validators."""
+        if len(body) > MAX_BODY_BYTES:
+            return
+        digest = hashlib.sha256(body).hexdigest()
+        body_path = self._body_path(digest)
+        try:
+            if not body_path.exists():
+                _atomic_write(body_path, body)
+            self._write_entry(url, {
+                "url": url,
+                "body": digest,
+                "headers": {h: headers[h] for h in _STORED_HEADERS if h in headers},
+                "fetched_at": time.time(),
+            })
+        except OSError as e:
+            logger.debug("Failed to cache %s: %s", url, e)
+
+    def refresh(self, url: str, entry: dict, headers: Mapping[str, str]) -> None:
+        """Restart an entry's freshness after a 304, taking any updated validators."""
+        entry = dict(entry, fetched_at=time.time())
+        entry["headers"] = dict(entry.get("headers", {}))
+        for h in ("ETag", "Last-Modified"):
+            if headers.get(h):
+                entry["headers"][h] = headers[h]
+        try:
+            self._write_entry(url, entry)
+        except OSError as e:
+            logger.debug("Failed to refresh cache entry for %s: %s", url, e)
+
+    def _write_entry(self, url: str, entry: dict) -> None:
+        _atomic_write(self._index_path(url), json.dumps(entry).encode("utf-8"))
+
+    def prune(self, max_age_s: float = MAX_AGE_S) -> int:
+        """Drop entries untouched for `max_age_s` and bodies no entry references."""
+        cutoff = time.time() - max_age_s
+        live: set[str] = set()
+        removed = 0
+        for path in self.root.glob("index/*/*.json"):
+            try:
+                entry = json.loads(path.read_text())
+                if entry.get("fetched_at", 0) < cutoff:
+                    path.unlink()
+                    removed += 1
+                else:
+                    live.add(entry.get("body", ""))
+            except (OSError, ValueError):
+                continue
+        for path in self.root.glob("bodies/*/*"):
+            # Recent bodies may belong to entries written after the index walk
+            try:
+                if path.name not in live and path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+        if removed:
+            logger.info("Pruned %d HTTP cache entries older than %.0f days", removed, max_age_s / 86400)
+        return removed
+
+    # --- Bookkeeping ---
+
+    @contextmanager
+    def url_lock(self, url: str) -> Iterator[None]:
+        """Hold the URL's lock; released locks are dropped once nobody waits on them."""
+        with self._url_locks_lock:
+            lock, holders = self._url_locks.get(url) or (threading.Lock(), 0)
+            self._url_locks[url] = (lock, holders + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._url_locks_lock:
+                lock, holders = self._url_locks[url]
+                if holders == 1:
+                    del self._url_locks[url]
+                else:
+                    self._url_locks[url] = (lock, holders - 1)
+
+    def note(self, outcome: str, nbytes: int) -> None:
+        """Count a request outcome: fresh, revalidated or fetched."""
+        with self._stats_lock:
+            self.stats[outcome] += 1
+            if outcome == "fetched":
+                self.stats["bytes_downloaded"] += nbytes
+            else:
+                self.stats["bytes_saved"] += nbytes
+
+    def summary(self) -> dict:
+        with self._stats_lock:
+            return dict(self.stats)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+_shared: dict[Path, HttpCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_cache(output_dir: Path) -> HttpCache:
+    """The process-wide cache for OBSERVATORY_HTTP_CACHE, else `<output_dir>/../.http-cache`."""
+    root = Path(os.environ.get(CACHE_DIR_ENV) or Path(output_dir).resolve().parent / ".http-cache")
+    with _shared_lock:
+        if root not in _shared:
+            _shared[root] = HttpCache(root)
+        return _shared[root]
+
+
+# --- requests ---
+
+class CachingAdapter(HTTPAdapter):
+    """HTTPAdapter that serves and revalidates GETs through an HttpCache."""
+
+    def __init__(self, cache: HttpCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, stream=False, **kwargs):
+        if stream or not self.cache.cacheable(request.method, request.headers):
+            return super().send(request, stream=stream, **kwargs)
+
+        url = request.url
+        with self.cache.url_lock(url):
+            entry = self.cache.lookup(url)
+            body = self.cache.read_body(entry) if entry else None
+            if body is not None and self.cache.is_fresh(entry):
+                self.cache.note("fresh", len(body))
+                return _cached_response(request, entry, body)
+            if body is not None:
+                request.headers.update(self.cache.validators(entry))
+
+            resp = super().send(request, stream=stream, **kwargs)
+            if resp.status_code == 304 and body is not None:
+                resp.close()
+                self.cache.refresh(url, entry, resp.headers)
+                self.cache.note("revalidated", len(body))
+                return _cached_response(request, entry, body, resp.headers)
+            if resp.status_code == 200:
+                self.cache.note("fetched", len(resp.content))
+                self.cache.store(url, resp.content, resp.headers)
+            return resp
+
+
+def _cached_response(request, entry: dict, body: bytes, live_headers=None) -> requests.Response:
+    """A 200 Response carrying a cached body (and the live 304's headers, if any)."""
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.reason = "OK"
+    resp.headers = CaseInsensitiveDict(entry.get("headers", {}))
+    if live_headers:
+        resp.headers.update(live_headers)
+    resp._content = body
+    resp.encoding = get_encoding_from_headers(resp.headers)
+    resp.url = request.url
+    resp.request = request
+    resp.from_cache = True
+    return resp
+
+
+def cached_session(cache: HttpCache, *, pool_size: int = 10) -> requests.Session:
+    """A requests.Session whose GETs go through `cache`."""
+    session = requests.Session()
+    adapter = CachingAdapter(cache, pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# --- aiohttp ---
+
+class CachedResponse:
+    """Fully read response from AsyncHttpCache.get()."""
+
+    def __init__(self, status: int, body: bytes, headers: Mapping[str, str], *, from_cache: bool = False):
+        self.status = status
+        self.body = body
+        self.headers = headers
+        self.from_cache = from_cache
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class AsyncHttpCache:
+    """Cached GETs on an aiohttp session; disk I/O runs off the event loop."""
+
+    def __init__(self, cache: HttpCache):
+        self.cache = cache
+        self._flights: dict[str, asyncio.Future] = {}
+
+    async def get(self, request, url: str, **kwargs) -> CachedResponse:
+        """GET `url` via `request(method, url, **kwargs)` (an async context manager).
+
+        Concurrent calls for the same URL share one fetch. Errors from the
+        request propagate to every waiter.
+        """
+        if not self.cache.cacheable("GET", kwargs.get("headers") or {}):
+            async with request("GET", url, **kwargs) as resp:
+                return CachedResponse(resp.status, await resp.read(), resp.headers)
+        flight = self._flights.get(url)
+        if flight is not None:
+            return await asyncio.shield(flight)
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[url] = flight
+        try:
+            resp = await self._get(request, url, **kwargs)
+        except BaseException as e:
+            flight.set_exception(e)
+            flight.exception()  # retrieved: no "never retrieved" warning without waiters
+            raise
+        else:
+            flight.set_result(resp)
+            return resp
+        finally:
+            del self._flights[url]
+
+    async def _get(self, request, url: str, **kwargs) -> CachedResponse:
+        cache = self.cache
+        entry = await asyncio.to_thread(cache.lookup, url)
+        body = await asyncio.to_thread(cache.read_body, entry) if entry else None
+        if body is not None and cache.is_fresh(entry):
+            cache.note("fresh", len(body))
+            return CachedResponse(200, body, entry.get("headers", {}), from_cache=True)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if body is not None:
+            headers.update(cache.validators(entry))
+        async with request("GET", url, headers=headers, **kwargs) as resp:
+            if resp.status == 304 and body is not None:
+                await asyncio.to_thread(cache.refresh, url, entry, resp.headers)
+                cache.note("revalidated", len(body))
+                return CachedResponse(200, body, {**entry.get("headers", {}), **resp.headers},
+                                      from_cache=True)
+            data = await resp.read()
+            if resp.status == 200:
+                cache.note("fetched", len(data))
+                await asyncio.to_thread(cache.store, url, data, resp.headers)
+            return CachedResponse(resp.status, data, resp.headers)
@@ -9,11 +9,11 @@ Incremental mode: hashes the index JSON responses. If unchanged, skips entirely.
 from __future__ import annotations
 
 import logging
-import re
 
 import requests
 
 from crawlers.base import BaseCrawler
+from crawlers.github import GitHubClient
 from crawlers.models import CrawlResult
 from crawlers.utils import content_hash
 
@@ -29,6 +29,7 @@ class LobeHubCrawler(BaseCrawler):
 
     def __init__(self, conn, *, output_dir=None, rate_limit_ms=500, shard=None, max_workers=1, crawl_mode="incremental"):
         super().__init__(conn, output_dir=output_dir, rate_limit_ms=rate_limit_ms, shard=shard, max_workers=max_workers, crawl_mode=crawl_mode)
+        self.github = GitHubClient(rate_limiter=self.rate_limiter, cache=self.http_cache)
 
     def discover(self) -> list[dict]:
         """Fetch all plugins/tools from LobeHub indexes.
@@ -44,10 +45,11 @@ class LobeHubCrawler(BaseCrawler):
         ]:
             try:
                 self.rate_limiter.wait()
-                resp = requests.get(index_url, timeout=30)
+                resp = self.http.get(index_url, timeout=30)
                 resp.raise_for_status()
             except Exception as e:
                 logger.warning("Failed to fetch LobeHub %s index: %s", kind, e)
+                self.discovery_incomplete(f"{kind} index")
                 continue
 
             # Incremental: check if index content changed
@@ -63,6 +65,7 @@ class LobeHubCrawler(BaseCrawler):
                 data = resp.json()
             except Exception as e:
                 logger.warning("Failed to parse LobeHub %s index JSON: %s", kind, e)
+                self.discovery_incomplete(f"{kind} index")
                 continue
 
             plugins = data.get(items_key, [])
@@ -135,7 +138,7 @@ class LobeHubCrawler(BaseCrawler):
         """Download and stringify a plugin manifest JSON."""
         try:
             self.rate_limiter.wait()
-            resp = requests.get(manifest_url, timeout=15)
+            resp = self.http.get(manifest_url, timeout=15)
             if resp.status_code == 200:
                 # Return the raw JSON as content for scanning
                 return resp.text
@@ -144,21 +147,8 @@ class LobeHubCrawler(BaseCrawler):
         return None
 
     def _download_github_readme(self, github_url: str) -> str | None:
-        """Download README.md from a GitHub repo URL."""
-        m = re.match(r"https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$", github_url)
-        if not m:
-            return None
-        owner, repo = m.group(1), m.group(2)
-        for branch in ("main", "master"):
-            url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/README.md"
-            try:
-                self.rate_limiter.wait()
-                resp = requests.get(url, timeout=15)
-                if resp.status_code == 200:
-                    return resp.text
-            except requests.RequestException:
-                pass
-        return None
+        """Download README.md from a GitHub repo URL (default branch)."""
+        return self.github.readme_for_url(github_url)
 
 
 def main():
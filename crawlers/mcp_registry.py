@@ -16,6 +16,7 @@ import requests
 from bs4 import BeautifulSoup
 
 from crawlers.base import BaseCrawler
+from crawlers.github import GitHubClient
 from crawlers.models import CrawlResult
 from crawlers.utils import content_hash
 
@@ -29,6 +30,7 @@ class PulseMCPCrawler(BaseCrawler):
 
     def __init__(self, conn, *, output_dir=None, rate_limit_ms=500, shard=None, max_workers=1, crawl_mode="incremental"):
         super().__init__(conn, output_dir=output_dir, rate_limit_ms=rate_limit_ms, shard=shard, max_workers=max_workers, crawl_mode=crawl_mode)
+        self.github = GitHubClient(rate_limiter=self.rate_limiter, cache=self.http_cache)
 
     def _api_headers(self) -> dict:
         """Build API headers with auth if available."""
@@ -79,6 +81,7 @@ class PulseMCPCrawler(BaseCrawler):
                 data = resp.json()
             except Exception as e:
                 logger.error("PulseMCP API error: %s", e)
+                self.discovery_incomplete(f"API listing failed after {len(all_servers)} servers")
                 break
 
             servers = data.get("servers", [])
@@ -141,6 +144,7 @@ class PulseMCPCrawler(BaseCrawler):
                 resp.raise_for_status()
             except Exception as e:
                 logger.error("PulseMCP scraper page %d error: %s", page, e)
+                self.discovery_incomplete(f"listing page {page}")
                 break
 
             soup = BeautifulSoup(resp.text, "html.parser")
@@ -176,6 +180,7 @@ class PulseMCPCrawler(BaseCrawler):
                 logger.info("Scraped %d servers (page %d)...", len(all_servers), page)
             page += 1
             if page > 250:
+                self.discovery_incomplete("listing safety limit (250 pages)")
                 break
 
         logger.info("HTML scraper discovered %d servers", len(all_servers))
@@ -216,24 +221,8 @@ class PulseMCPCrawler(BaseCrawler):
         )
 
     def _download_github_readme(self, github_url: str) -> str | None:
-        """Download README.md from a GitHub repo."""
-        # Extract owner/repo from GitHub URL
-        import re
-        m = re.match(r"https?://github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$", github_url)
-        if not m:
-            return None
-
-        owner, repo = m.group(1), m.group(2)
-        for branch in ("main", "master"):
-            url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/README.md"
-            try:
-                self.rate_limiter.wait()
-                resp = requests.get(url, timeout=15)
-                if resp.status_code == 200:
-                    return resp.text
-            except requests.RequestException:
-                pass
-        return None
+        """Download README.md from a GitHub repo URL (default branch)."""
+        return self.github.readme_for_url(github_url)
 
     @staticmethod
     def _make_slug(name: str, url: str) -> str:
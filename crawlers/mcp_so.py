@@ -4,56 +4,83 @@
 mcp.so is an HTML-based directory. We scrape server listings and their
 detail pages to extract README/description content.
 
-Incremental mode: stores ETag per detail page, uses conditional requests.
+Incremental mode: walks the newest-first listing until a page holds only
+known servers (with a periodic full sweep that skips unchanged listing
+pages), and stores ETag per detail page for conditional requests.
 """
 
 from __future__ import annotations
 
 import logging
 import re
+import time
+from collections.abc import Iterator
 
 import requests
-from bs4 import BeautifulSoup
 
+from crawlers import extract
 from crawlers.base import BaseCrawler
+from crawlers.db import get_live_slugs
 from crawlers.models import CrawlResult
-from crawlers.utils import content_hash, shard_matches
+from crawlers.pagination import changed_pages_only, fetch_pages, listing_walk, new_items_only
+from crawlers.upstream import upstream_key
+from crawlers.utils import shard_matches
 
 logger = logging.getLogger("observatory.mcp_so")
 
 MCP_SO_BASE = "https://mcp.so"
+LISTING_RATE_LIMIT_MS = 150
+LISTING_CONCURRENCY = 8
+MAX_LISTING_PAGES = 500  # safety limit
+# Newest-first listing used by incremental discovery
+NEWEST_LISTING_URL = MCP_SO_BASE + "/servers?tag=latest&page={page}"
+MAX_NEWEST_PAGES = 50
+
+
+def _slug_from_href(href: str) -> str:
+    """DB slug for a /server/... link, sanitized for filesystem safety (consistent with _save_content)."""
+    return href.removeprefix("/server/").strip("/").replace("/", "_").replace(":", "_")
 
 
 class McpSoCrawler(BaseCrawler):
     registry_id = "mcp-so"
+    # Listing pages get their own bucket; detail pages keep the default pacing
+    rate_limits = {"mcp.so/servers": (LISTING_RATE_LIMIT_MS, 4)}
 
     def __init__(self, conn, *, output_dir=None, rate_limit_ms=500, shard=None, max_workers=1, crawl_mode="incremental"):
         super().__init__(conn, output_dir=output_dir, rate_limit_ms=rate_limit_ms, shard=shard, max_workers=max_workers, crawl_mode=crawl_mode)
 
-    def discover(self) -> list[dict]:
-        """Discover MCP servers from mcp.so listing pages."""
-        all_servers = []
-        page = 1
-
-        while True:
-            url = f"{MCP_SO_BASE}/servers?page={page}"
-            try:
-                self.rate_limiter.wait()
-                resp = requests.get(url, timeout=30, headers={
-                    "User-Agent": "AguaraObservatory/0.1"
-                })
-                if resp.status_code != 200:
-                    break
-            except requests.RequestException as e:
-                logger.error("mcp.so request error at page %d: %s", page, e)
-                break
-
-            soup = BeautifulSoup(resp.text, "lxml")
-            cards = soup.select("a[href^='/server/']")
-
-            if not cards:
-                break
+    def discover(self) -> Iterator[dict]:
+        """Discover MCP servers from mcp.so listing pages, yielding page by page.
 
+        Full mode walks every listing page (LISTING_CONCURRENCY at a time,
+        paced by the listing bucket). Incremental mode walks the newest-first
+        listing until a page holds only known servers, with a periodic full
+        sweep that skips pages whose per-page hash is unchanged.
+        """
+        discovered = 0
+        walk = listing_walk(self.crawl_mode, self.get_state("last_full_sweep"))
+        logger.info("Listing walk: %s", walk)
+
+        if walk == "newest":
+            known = get_live_slugs(self.conn, self.registry_id)
+            pages = new_items_only(
+                fetch_pages(self._fetch_newest_page, max_pages=MAX_NEWEST_PAGES, concurrency=1),
+                key=lambda card: _slug_from_href(card.get("href", "")), known=known,
+            )
+        else:
+            pages = changed_pages_only(
+                fetch_pages(
+                    self._fetch_listing_page, max_pages=MAX_LISTING_PAGES,
+                    concurrency=LISTING_CONCURRENCY, key=lambda card: card.get("href", ""),
+                    on_incomplete=lambda page: self.discovery_incomplete(f"listing page {page}"),
+                ),
+                key=lambda card: card.get("href", ""),
+                get_state=self.get_state, set_state=self.set_state_after_crawl,
+                skip_unchanged=walk == "sweep",
+            )
+
+        for page, cards in pages:
             seen_this_page = set()
             for card in cards:
                 href = card.get("href", "")
@@ -61,29 +88,48 @@ class McpSoCrawler(BaseCrawler):
                 if not raw_slug or raw_slug in seen_this_page:
                     continue
                 seen_this_page.add(raw_slug)
-                # Sanitize slug for filesystem safety (consistent with _save_content)
-                slug = raw_slug.replace("/", "_").replace(":", "_")
+                slug = _slug_from_href(href)
 
                 # Apply shard filter
                 if self.shard and not shard_matches(slug, self.shard):
                     continue
 
-                name = card.get_text(strip=True) or slug
-                all_servers.append({
+                name = extract.text_of(card, "") or slug
+                discovered += 1
+                yield {
                     "slug": slug,
                     "name": name,
                     "url": f"{MCP_SO_BASE}/server/{raw_slug}",
-                })
+                }
 
-            logger.info("Page %d: found %d servers (total: %d)", page, len(seen_this_page), len(all_servers))
-            page += 1
+            logger.info("Page %d: found %d servers (total: %d)", page, len(seen_this_page), discovered)
 
-            # Safety: stop if we've gone too many pages
-            if page > 500:
-                logger.warning("Stopping at page %d (safety limit)", page)
-                break
+        if walk != "newest" and self.discovery_complete:
+            self.set_state_after_crawl("last_full_sweep", str(int(time.time())))
 
-        return all_servers
+    def _fetch_newest_page(self, page: int) -> list | None:
+        """Server cards of one page of the newest-first listing."""
+        return self._fetch_listing_page(page, url=NEWEST_LISTING_URL.format(page=page))
+
+    def _fetch_listing_page(self, page: int, *, url: str | None = None) -> list | None:
+        """Server cards of one listing page; [] past the end (404), None on error."""
+        url = url or f"{MCP_SO_BASE}/servers?page={page}"
+        try:
+            self.rate_limiter.wait(url)
+            resp = self.http.get(url, timeout=30, headers={
+                "User-Agent": "AguaraObservatory/0.1"
+            })
+            if resp.status_code == 404:
+                return []
+            if resp.status_code != 200:
+                logger.error("mcp.so HTTP %d at page %d", resp.status_code, page)
+                return None
+        except requests.RequestException as e:
+            logger.error("mcp.so request error at page %d: %s", page, e)
+            return None
+
+        tree = extract.parse_html(resp.text)
+        return tree.xpath("//a[starts-with(@href, '/server/')]") if tree is not None else []
 
     def download(self, slug: str, **kwargs) -> CrawlResult:
         """Download server detail page from mcp.so and extract content.
@@ -103,7 +149,7 @@ class McpSoCrawler(BaseCrawler):
 
         self.rate_limiter.wait()
         try:
-            resp = requests.get(url, timeout=30, headers=headers)
+            resp = self.http.get(url, timeout=30, headers=headers)
             if resp.status_code == 304:
                 return CrawlResult(skill_id=skill_id, slug=slug, skipped=True)
             if resp.status_code != 200:
@@ -121,9 +167,9 @@ class McpSoCrawler(BaseCrawler):
         if not content:
             return CrawlResult(skill_id=skill_id, slug=slug, error="No content extracted")
 
-        new_hash = content_hash(content)
+        new_hash, canon = self.canonical_hash(content)
         if not self.is_content_changed(skill_id, new_hash):
-            return CrawlResult(skill_id=skill_id, slug=slug, skipped=True)
+            return CrawlResult(skill_id=skill_id, slug=slug, skipped=True, **canon)
 
         # Try to find GitHub URL for metadata
         github_url = self._extract_github_url(resp.text)
@@ -137,28 +183,40 @@ class McpSoCrawler(BaseCrawler):
             content_hash=new_hash,
             content_size=len(content),
             metadata={"github_url": github_url} if github_url else None,
+            upstream=upstream_key(github_url),
+            **canon,
         )
 
     @staticmethod
     def _extract_content(html: str, name: str) -> str | None:
-        """Extract server description/README from detail page."""
-        soup = BeautifulSoup(html, "lxml")
+        """Extract server description/README from detail page.
+
+        The README markdown embedded in the page's Next.js payload wins; the
+        rendered content area is the fallback.
+        """
+        readme = extract.embedded_string(html, ("content", "readme"), min_len=51)
+        if readme:
+            return readme
+
+        tree = extract.parse_html(html)
+        if tree is None:
+            return None
 
         # Look for main content area (README rendered)
-        content_area = (
-            soup.find("div", class_=re.compile(r"readme|content|description|prose", re.I))
-            or soup.find("article")
-            or soup.find("main")
+        content_area = extract.first(
+            tree,
+            "(//div[re:test(@class, 'readme|content|description|prose', 'i')])[1]",
+            "(//article)[1]",
+            "(//main)[1]",
         )
 
-        if content_area:
-            text = content_area.get_text(separator="\n", strip=True)
+        if content_area is not None:
+            text = extract.text_of(content_area)
             if len(text) > 50:
                 return text
 
         # Fallback: get meta description + any structured data
-        meta_desc = soup.find("meta", attrs={"name": "description"})
-        desc = meta_desc.get("content", "") if meta_desc else ""
+        desc = extract.meta_content(tree, "description")
         if desc:
             return f"# {name}\n\n{desc}\n"
 
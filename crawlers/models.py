@@ -150,3 +150,9 @@ class CrawlResult(BaseModel):
     metadata: dict[str, Any] | None = None
     error: str | None = None
     skipped: bool = False  # True if content unchanged (same hash)
+    blob_sha: str | None = None  # git blob SHA of the source file, when known
+    commit_sha: str | None = None  # repo HEAD commit the file was read at
+    source_lastmod: str | None = None  # upstream last-modified time (e.g. sitemap lastmod)
+    upstream: str | None = None  # canonical upstream repo key (crawlers.upstream)
+    raw_hash: str | None = None  # hash of the content before canonicalisation (crawlers.normalize)
+    normalizer: str | None = None  # versioned pipeline tag the content went through
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Canonical content for change detection, so presentation noise is not a change.
+
+Scraped pages (mcp.so, PulseMCP, the skills.sh scrape fallback) and
+synthesized markdown (Glama, Smithery) can change bytes without changing
+substance: CRLF vs LF, trailing whitespace, blank-line runs, reordered JSON
+keys, view counters and "updated 3 days ago" lines. Each such change used to
+mean a rewrite, a rescan and a re-export. Crawlers hash the canonical form
+(BaseCrawler.canonical_hash); the content they save, and Aguara scans, is
+still the raw content, so nothing an author controls is hidden from the
+scanner by a pipeline step.
+
+Pipelines are per profile (usually the registry id) and versioned. Skills
+record the tag of the pipeline their content_hash went through ("glama/1")
+and the hash of the stored raw content, which lets BaseCrawler tell apart:
+    - noise: raw content changed, canonical content did not (skipped)
+    - renormalised: pipeline changed, raw content did not (hash updated
+      without entering the change manifest, so delta scans ignore it)
+
+Bump a pipeline's version whenever its output changes for some input.
+Volatile lines are matched whole and hold only numbers, dates and fixed
+words, so no free text can ride along in one.
+
+Usage:
+    python -m crawlers.normalize [--days 7]   # noise vs real changes per registry
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from collections.abc import Callable
+
+logger = logging.getLogger("observatory.normalize")
+
+_BLANK_RUN_RE = re.compile(r"\n{3,}")
+_JSON_BLOCK_RE = re.compile(r"```json\n(.*?)\n```", re.DOTALL)
+
+_COUNT = r"[\d.,]+\s*[km]?"
+_METRIC = r"(?:views?|stars?|downloads?|installs?|uses?|visitors?|(?:weekly|monthly)\s+downloads)"
+_DATED = r"(?:updated|published|created|last\s+updated|released|added)"
+_RELATIVE = (
+    r"(?:(?:about|over|almost)\s+)?(?:an?|\d+)\s+(?:second|minute|hour|day|week|month|year)s?\s+ago"
+    r"|just\s+now|today|yesterday"
+)
+_DATE = r"\d{4}-\d{2}-\d{2}(?:[T\s]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?"
+_VOLATILE_LINE_RE = re.compile(
+    rf"""^(?:
+        {_COUNT}\s*{_METRIC}                       # 1.2k views
+      | {_METRIC}\s*:?\s*{_COUNT}                  # Stars: 340
+      | (?:{_DATED}\s*:?\s*)?(?:{_RELATIVE})      # Updated 3 days ago, just now
+      | {_DATED}\s*:?\s*{_DATE}                    # Published 2025-01-02
+    )$""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+
+def normalize_text(content: str) -> str:
+    """LF line endings, no trailing spaces/tabs, at most one blank line in a row."""
+    content = content.replace("\r\n", "\n").replace("\r", "\n")
+    content = "\n".join(line.rstrip(" \t") for line in content.split("\n"))
+    content = _BLANK_RUN_RE.sub("\n\n", content)
+    return content.strip("\n") + "\n"
+
+
+def sort_json_blocks(content: str) -> str:
+    """Re-serialize ```json fences with sorted keys (builders dump API order)."""
+    def canonical(m: re.Match) -> str:
+        try:
+            data = json.loads(m.group(1))
+        except ValueError:
+            return m.group(0)
+        return f"```json\n{json.dumps(data, indent=2, sort_keys=True)}\n```"
+
+    return _JSON_BLOCK_RE.sub(canonical, content)
+
+
+def drop_volatile_lines(content: str) -> str:
+    """Drop whole lines that are only a counter or a relative/absolute timestamp."""
+    return "\n".join(
+        line for line in content.split("\n") if not _VOLATILE_LINE_RE.match(line.strip())
+    )
+
+
+# profile -> (version, steps); profiles without a pipeline hash raw content
+PIPELINES: dict[str, tuple[int, tuple[Callable[[str], str], ...]]] = {
+    "mcp-so": (1, (drop_volatile_lines, normalize_text)),
+    "pulsemcp": (1, (drop_volatile_lines, normalize_text)),
+    "skills-sh/scrape": (1, (drop_volatile_lines, normalize_text)),
+    "glama": (1, (sort_json_blocks, normalize_text)),
+    "smithery": (1, (sort_json_blocks, normalize_text)),
+}
+
+
+def normalizer_tag(profile: str) -> str | None:
+    """Versioned pipeline tag for a profile ("glama/1"), None if it has none."""
+    pipeline = PIPELINES.get(profile)
+    return f"{profile}/{pipeline[0]}" if pipeline else None
+
+
+def canonicalize(profile: str, content: str) -> str:
+    """Run a profile's pipeline over content (identity without one)."""
+    pipeline = PIPELINES.get(profile)
+    if pipeline:
+        for step in pipeline[1]:
+            content = step(content)
+    return content
+
+
+def noise_report(conn, *, days: int = 7) -> dict:
+    """Changed vs noise vs renormalised skills per registry over recent crawl runs."""
+    rows = conn.execute(
+        """
+        SELECT registry_id, COUNT(*), SUM(downloaded), SUM(changed_files),
+               SUM(COALESCE(noise, 0)), SUM(COALESCE(renormalised, 0))
+        FROM crawl_runs
+        WHERE status = 'completed' AND started_at >= strftime('%Y-%m-%dT%H:%M:%SZ', 'now', ?)
+        GROUP BY registry_id ORDER BY registry_id
+        """,
+        (f"-{days} days",),
+    ).fetchall()
+    report = {}
+    for registry, runs, downloaded, changed, noise, renormalised in rows:
+        apparent = (changed or 0) + noise
+        report[registry] = {
+            "runs": runs,
+            "downloaded": downloaded or 0,
+            "changed": changed or 0,
+            "noise": noise,
+            "renormalised": renormalised,
+            # Share of would-be changes that were presentation noise
+            "noise_ratio": round(noise / apparent, 4) if apparent else 0.0,
+        }
+    return report
+
+
+def main():
+    import argparse
+
+    from crawlers.db import connect, init_schema
+    from crawlers.utils import setup_logging
+
+    parser = argparse.ArgumentParser(description="Content normalisation noise report")
+    parser.add_argument("--days", type=int, default=7, help="Crawl runs to include (days back)")
+    args = parser.parse_args()
+
+    setup_logging()
+    conn = connect()
+    init_schema(conn)
+    print(json.dumps(noise_report(conn, days=args.days), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""Packed, append-only content store for crawled skill files.
+
+Replaces the one-.md-file-per-skill layout of data/<registry>/, whose tens
+of thousands of small files made cache restore/save, artifact transfer and
+directory walks slow. Layout of data/<registry>/pack/:
+
+    <writer>.pack   segment: MAGIC, then records of
+                    [sha256 digest 32B][raw length u32][stored length u32][zlib data]
+    <writer>.idx    index log: one "name<TAB>content_hash" line per saved skill,
+                    name being the scan file stem (slug with / and : as _)
+
+Blobs are addressed by content hash (the same SHA-256 as skills.content_hash),
+so content shared by several skills or unchanged across runs is stored once.
+Every writer (one crawl run or shard) appends only its own segment/log
+pair, named by a sortable writer id. A run therefore adds two files holding
+just the blobs it changed, and shard artifacts merge without collisions.
+Index logs replay in name order, and the last entry for a slug wins.
+Reads mmap the segments.
+
+Scanners still want files: materialise() extracts (a subset of) skills as
+<slug>.md into a scan directory, e.g. on tmpfs, only when a scan needs them.
+
+Usage:
+    python -m crawlers.packstore stats data/clawhub
+    python -m crawlers.packstore materialise data/clawhub /dev/shm/scan/clawhub [--changed]
+    python -m crawlers.packstore import data/clawhub   # pack legacy .md files
+    python -m crawlers.packstore compact data/clawhub
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import secrets
+import struct
+import threading
+import zlib
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger("observatory.packstore")
+
+PACK_DIR = "pack"
+MAGIC = b"OBSPACK1"
+RECORD = struct.Struct("<32sII")  # digest, raw length, stored length
+COMPRESS_LEVEL = 6
+# Segments above which close() rewrites the store into one segment
+COMPACT_SEGMENTS = 32
+MANIFEST_NAME = ".changed_files.txt"
+
+
+def entry_name(slug: str) -> str:
+    """Index key of a skill: its scan file stem (ingest derives skill ids from it)."""
+    return slug.replace("/", "_").replace(":", "_")
+
+
+def file_name(slug: str) -> str:
+    """Scan file name of a skill slug."""
+    return entry_name(slug) + ".md"
+
+
+class PackStore:
+    """Content-addressed segments plus a name → content_hash index under data_dir/pack/.
+
+    Thread-safe. Writes go to this instance's own segment, created on the
+    first put(). close() seals it.
+    """
+
+    def __init__(self, data_dir: Path, *, writer: str | None = None):
+        self.root = Path(data_dir) / PACK_DIR
+        # Sortable by creation time, so index logs replay oldest first
+        self.writer = writer or (
+            f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{os.getpid()}-{secrets.token_hex(3)}"
+        )
+        self._lock = threading.Lock()
+        self._segments: list[Path] = []
+        self._maps: list[mmap.mmap | None] = []
+        # content_hash -> (segment index, offset, stored length, raw length)
+        self._blobs: dict[str, tuple[int, int, int, int]] = {}
+        self._index: dict[str, str] = {}
+        self._loaded = False
+        self._pack_file = None
+        self._idx_file = None
+        self.stats = {"put": 0, "stored": 0, "bytes_raw": 0, "bytes_stored": 0}
+
+    # --- Loading ---
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.root.is_dir():
+            return
+        for path in sorted(self.root.glob("*.pack")):
+            self._open_segment(path)
+        for path in sorted(self.root.glob("*.idx")):
+            for line in path.read_text(encoding="utf-8").splitlines():
+                name, sep, content = line.rpartition("\t")
+                if sep and content in self._blobs:
+                    self._index[name] = content
+
+    def _open_segment(self, path: Path) -> None:
+        """mmap a sealed segment and index its records (a torn tail is ignored)."""
+        size = path.stat().st_size
+        if size < len(MAGIC):
+            return
+        with path.open("rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:len(MAGIC)] != MAGIC:
+            logger.warning("Ignoring %s: not a pack segment", path)
+            mm.close()
+            return
+        seg = len(self._segments)
+        self._segments.append(path)
+        self._maps.append(mm)
+        pos = len(MAGIC)
+        while pos + RECORD.size <= size:
+            digest, raw_len, stored_len = RECORD.unpack_from(mm, pos)
+            start = pos + RECORD.size
+            if start + stored_len > size:
+                logger.warning("%s: truncated record at offset %d", path.name, pos)
+                break
+            self._blobs.setdefault(digest.hex(), (seg, start, stored_len, raw_len))
+            pos = start + stored_len
+
+    # --- Reads ---
+
+    def __contains__(self, slug: str) -> bool:
+        with self._lock:
+            self._load()
+            return entry_name(slug) in self._index
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return len(self._index)
+
+    def index(self) -> dict[str, str]:
+        """{name: content_hash} for every stored skill (see entry_name)."""
+        with self._lock:
+            self._load()
+            return dict(self._index)
+
+    def read_blob(self, content_hash: str) -> bytes | None:
+        """Raw bytes of a blob, or None if it is not stored."""
+        with self._lock:
+            self._load()
+            loc = self._blobs.get(content_hash)
+            if loc is None:
+                return None
+            seg, start, stored_len, _ = loc
+            mm = self._maps[seg]
+            if mm is not None:
+                data = mm[start:start + stored_len]
+            else:  # this writer's open segment
+                self._pack_file.flush()
+                data = os.pread(self._pack_file.fileno(), stored_len, start)
+        return zlib.decompress(data)
+
+    def get(self, slug: str) -> str | None:
+        """Stored content of a skill, or None."""
+        with self._lock:
+            self._load()
+            content = self._index.get(entry_name(slug))
+        if content is None:
+            return None
+        data = self.read_blob(content)
+        return data.decode("utf-8") if data is not None else None
+
+    # --- Writes ---
+
+    def put(self, slug: str, content: str) -> str:
+        """Store a skill's content; returns its content hash."""
+        name = entry_name(slug)
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).digest()
+        content = digest.hex()
+        with self._lock:
+            self._load()
+            self._ensure_writer()
+            self.stats["put"] += 1
+            if content not in self._blobs:
+                stored = zlib.compress(data, COMPRESS_LEVEL)
+                offset = self._pack_file.tell()
+                self._pack_file.write(RECORD.pack(digest, len(data), len(stored)))
+                self._pack_file.write(stored)
+                self._blobs[content] = (len(self._segments) - 1, offset + RECORD.size, len(stored), len(data))
+                self.stats["stored"] += 1
+                self.stats["bytes_raw"] += len(data)
+                self.stats["bytes_stored"] += len(stored)
+            if self._index.get(name) != content:
+                self._index[name] = content
+                self._idx_file.write(f"{name}\t{content}\n")
+        return content
+
+    def _ensure_writer(self) -> None:
+        """Open this writer's segment and index log (caller holds _lock)."""
+        if self._pack_file is not None:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"{self.writer}.pack"
+        self._pack_file = path.open("a+b")  # readable: read_blob preads from it
+        if self._pack_file.tell() == 0:
+            self._pack_file.write(MAGIC)
+        self._idx_file = (self.root / f"{self.writer}.idx").open("a", encoding="utf-8")
+        self._segments.append(path)
+        self._maps.append(None)
+
+    def close(self, *, compact_above: int = COMPACT_SEGMENTS) -> None:
+        """Seal this writer's files, compacting when segments pile up."""
+        with self._lock:
+            if self._pack_file is not None:
+                for f in (self._pack_file, self._idx_file):
+                    f.flush()
+                    os.fsync(f.fileno())
+                    f.close()
+                self._pack_file = self._idx_file = None
+                logger.info("Pack %s: %d skills saved, %d new blobs (%.1f MB → %.1f MB)",
+                            self.writer, self.stats["put"], self.stats["stored"],
+                            self.stats["bytes_raw"] / 1e6, self.stats["bytes_stored"] / 1e6)
+            segments = len(self._segments)
+        self._unmap()  # reloads with this writer's segment mmapped
+        if segments > compact_above:
+            self.compact()
+
+    def _unmap(self) -> None:
+        with self._lock:
+            for mm in self._maps:
+                if mm is not None:
+                    mm.close()
+            self._segments, self._maps, self._blobs, self._index = [], [], {}, {}
+            self._loaded = False
+
+    def compact(self, keep: Iterable[str] | None = None) -> dict:
+        """Rewrite the store as one segment and index holding only indexed blobs.
+
+        `keep` restricts the index to those slugs (e.g. live skills).
+        """
+        index = self.index()
+        if keep is not None:
+            keep = {entry_name(slug) for slug in keep}
+            index = {name: content for name, content in index.items() if name in keep}
+        old = sorted(self.root.glob("*.pack")) + sorted(self.root.glob("*.idx"))
+        # Sorts after every existing writer, so it replays last until the next run
+        target = PackStore(self.root.parent, writer=f"{self.writer}-compact")
+        target._ensure_writer()
+        for content in sorted(set(index.values())):
+            data = self.read_blob(content)
+            stored = zlib.compress(data, COMPRESS_LEVEL)
+            target._pack_file.write(RECORD.pack(bytes.fromhex(content), len(data), len(stored)))
+            target._pack_file.write(stored)
+        target._idx_file.writelines(f"{name}\t{content}\n" for name, content in sorted(index.items()))
+        target.close(compact_above=len(old) + 2)
+        self._unmap()
+        new = {f"{target.writer}.pack", f"{target.writer}.idx"}
+        for path in old:
+            if path.name not in new:
+                path.unlink()
+        counts = {"segments_removed": len(old) // 2, "skills": len(index), "blobs": len(set(index.values()))}
+        logger.info("Compacted %s: %d skills, %d blobs", self.root, counts["skills"], counts["blobs"])
+        return counts
+
+    # --- Files ---
+
+    def materialise(self, out_dir: Path, slugs: Iterable[str] | None = None) -> int:
+        """Write skills (all, or `slugs`) as <slug>.md files into out_dir. Returns files written.
+
+        Slugs not in the store are skipped.
+        """
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        index = self.index()
+        names = index if slugs is None else (entry_name(slug) for slug in slugs)
+        count = 0
+        for name in names:
+            content = index.get(name)
+            data = self.read_blob(content) if content else None
+            if data is None:
+                continue
+            (out_dir / f"{name}.md").write_bytes(data)
+            count += 1
+        return count
+
+    def summary(self) -> dict:
+        """Skills, distinct blobs, segments and bytes on disk."""
+        with self._lock:
+            self._load()
+            return {
+                "skills": len(self._index),
+                "blobs": len(set(self._index.values())),
+                "segments": len(self._segments),
+                "bytes_raw": sum(loc[3] for loc in self._blobs.values()),
+                "bytes_on_disk": sum(p.stat().st_size for p in self.root.glob("*")) if self.root.is_dir() else 0,
+            }
+
+
+def import_files(data_dir: Path, *, remove: bool = True) -> int:
+    """Pack loose <slug>.md files of the legacy layout. Returns files packed.
+
+    Written as the oldest writer, so anything a crawl stored since wins.
+    """
+    paths = sorted(Path(data_dir).glob("*.md"))
+    if not paths:
+        return 0
+    store = PackStore(data_dir, writer=f"00000000T000000000000-legacy-{secrets.token_hex(3)}")
+    for path in paths:
+        store.put(path.name.removesuffix(".md"), path.read_text(encoding="utf-8"))
+    store.close()
+    if remove:
+        for path in paths:
+            path.unlink()
+    logger.info("Packed %d legacy files from %s", len(paths), data_dir)
+    return len(paths)
+
+
+def changed_names(data_dir: Path) -> list[str]:
+    """Index names listed in the crawl's change manifest (<name>.md lines)."""
+    manifest = Path(data_dir) / MANIFEST_NAME
+    if not manifest.exists():
+        return []
+    names = (line.strip().removesuffix(".md") for line in manifest.read_text().splitlines())
+    return [name for name in names if name]
+
+
+def main():
+    import argparse
+    import json
+
+    from crawlers.utils import setup_logging
+
+    parser = argparse.ArgumentParser(description="Packed content store for crawled skills")
+    sub = parser.add_subparsers(dest="command", required=True)
+    stats_parser = sub.add_parser("stats", help="Skills, blobs and size of a store")
+    stats_parser.add_argument("data_dir", type=Path)
+    mat_parser = sub.add_parser("materialise", help="Extract skills as .md files")
+    mat_parser.add_argument("data_dir", type=Path)
+    mat_parser.add_argument("out_dir", type=Path, help="Scan directory (tmpfs works well)")
+    mat_parser.add_argument("--changed", action="store_true",
+                            help="Only skills in the crawl's change manifest")
+    import_parser = sub.add_parser("import", help="Pack legacy loose .md files")
+    import_parser.add_argument("data_dir", type=Path)
+    import_parser.add_argument("--keep-files", action="store_true", help="Do not delete the packed files")
+    compact_parser = sub.add_parser("compact", help="Rewrite the store as one segment")
+    compact_parser.add_argument("data_dir", type=Path)
+    args = parser.parse_args()
+
+    setup_logging()
+    store = PackStore(args.data_dir)
+    if args.command == "stats":
+        result = store.summary()
+    elif args.command == "materialise":
+        names = changed_names(args.data_dir) if args.changed else None
+        result = {"materialised": store.materialise(args.out_dir, names)}
+    elif args.command == "import":
+        result = {"imported": import_files(args.data_dir, remove=not args.keep_files)}
+    else:
+        result = store.compact()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
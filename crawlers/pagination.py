@@ -0,0 +1,232 @@
+"""Concurrent fetching of numbered listing pages for crawler discovery.
+
+Registries that paginate by page number (mcp.so, PulseMCP, Smithery) used to
+walk their listings one page at a time. fetch_pages()/afetch_pages() keep a
+window of pages in flight and hand them back in page order. Pacing is left
+to the fetch callable (it waits on the crawler's HostRateLimiter), so the
+window only overlaps latency and never exceeds the host's rate budget.
+
+Pagination ends at the first page that is empty or repeats the previous
+page (sites that clamp out-of-range page numbers to the last page). A page
+that fails (fetch returns None) also ends the walk, but short of the
+listing's end: `on_incomplete` is called so callers don't mistake a
+truncated listing for a complete one; the same goes for the safety limit.
+Pages fetched speculatively past the end are discarded.
+
+Incremental discovery for listings without an API watermark:
+    - new_items_only() walks a newest-first listing and stops at the first
+      page holding only known items
+    - changed_pages_only() stores a digest per page in crawl_state and drops
+      pages whose items are unchanged since the last walk
+    - listing_walk() picks between the two: a periodic full sweep (to catch
+      reorders and anything the newest-first walk missed) or newest-first
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("observatory.pagination")
+
+# Default safety limit on pages walked per listing
+MAX_PAGES = 500
+# Incremental listing discovery falls back to a full sweep this often
+FULL_SWEEP_INTERVAL_S = 7 * 24 * 3600
+
+
+class _EndOfPages:
+    """Detects the last page: an empty page, or a repeat of the previous one."""
+
+    def __init__(self, key: Callable[[object], Hashable] | None):
+        self.key = key
+        self._previous: frozenset | None = None
+
+    def reached(self, items: list | None) -> bool:
+        if not items:
+            return True
+        if self.key is None:
+            return False
+        keys = frozenset(self.key(item) for item in items)
+        if keys == self._previous:
+            return True
+        self._previous = keys
+        return False
+
+
+def _page_range(start: int, last: int | None, max_pages: int) -> range:
+    stop = start + max_pages
+    if last is not None:
+        stop = min(stop, last + 1)
+    return range(start, stop)
+
+
+def _stopped_short(page: int, reason: str, on_incomplete: Callable[[int], None] | None) -> None:
+    logger.warning("Listing stopped at page %d (%s)", page, reason)
+    if on_incomplete is not None:
+        on_incomplete(page)
+
+
+def fetch_pages(
+    fetch: Callable[[int], list | None],
+    *,
+    start: int = 1,
+    last: int | None = None,
+    max_pages: int = MAX_PAGES,
+    concurrency: int = 4,
+    key: Callable[[object], Hashable] | None = None,
+    on_incomplete: Callable[[int], None] | None = None,
+) -> Iterator[tuple[int, list]]:
+    """Yield (page, items) in page order, fetching up to `concurrency` pages at once.
+
+    `fetch(page)` returns the page's items, or None on error; it runs on
+    worker threads and must do its own rate limiting. `last` is the final
+    page when the listing reports it; otherwise the end is detected. `key`
+    identifies items for duplicate-page detection. `on_incomplete(page)` is
+    called when the walk stops before the end: at a failed page or at the
+    `max_pages` limit.
+    """
+    pages = iter(_page_range(start, last, max_pages))
+    end = _EndOfPages(key)
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="page")
+    in_flight: deque = deque()
+    try:
+        while True:
+            while len(in_flight) < max(1, concurrency):
+                page = next(pages, None)
+                if page is None:
+                    break
+                in_flight.append((page, pool.submit(fetch, page)))
+            if not in_flight:
+                if last is None or last >= start + max_pages:
+                    _stopped_short(start + max_pages - 1, "safety limit", on_incomplete)
+                return
+            page, future = in_flight.popleft()
+            items = future.result()
+            if items is None:
+                _stopped_short(page, "fetch failed", on_incomplete)
+                return
+            if end.reached(items):
+                return
+            yield page, items
+    finally:
+        for _, future in in_flight:
+            future.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def afetch_pages(
+    fetch: Callable[[int], Awaitable[list | None]],
+    *,
+    start: int = 1,
+    last: int | None = None,
+    max_pages: int = MAX_PAGES,
+    concurrency: int = 4,
+    key: Callable[[object], Hashable] | None = None,
+    on_incomplete: Callable[[int], None] | None = None,
+) -> AsyncIterator[tuple[int, list]]:
+    """Async counterpart of fetch_pages(); `fetch` is a coroutine function.
+
+    Close the generator (e.g. with contextlib.aclosing) when stopping early
+    so the speculative page fetches are cancelled.
+    """
+    pages = iter(_page_range(start, last, max_pages))
+    end = _EndOfPages(key)
+    in_flight: deque = deque()
+    try:
+        while True:
+            while len(in_flight) < max(1, concurrency):
+                page = next(pages, None)
+                if page is None:
+                    break
+                in_flight.append((page, asyncio.ensure_future(fetch(page))))
+            if not in_flight:
+                if last is None or last >= start + max_pages:
+                    _stopped_short(start + max_pages - 1, "safety limit", on_incomplete)
+                return
+            page, task = in_flight.popleft()
+            items = await task
+            if items is None:
+                _stopped_short(page, "fetch failed", on_incomplete)
+                return
+            if end.reached(items):
+                return
+            yield page, items
+    finally:
+        for _, task in in_flight:
+            task.cancel()
+
+
+# --- Incremental listing discovery ---
+
+def listing_walk(crawl_mode: str, last_sweep: str | None, *,
+                 interval_s: float = FULL_SWEEP_INTERVAL_S) -> str:
+    """Pick how to walk a listing: "full", "sweep" (full, changed pages only) or "newest".
+
+    `last_sweep` is the epoch-seconds string stored after the last completed
+    full walk.
+    """
+    if crawl_mode == "full":
+        return "full"
+    try:
+        due = time.time() - float(last_sweep or 0) >= interval_s
+    except ValueError:
+        due = True
+    return "sweep" if due else "newest"
+
+
+def page_digest(keys: Iterable[Hashable]) -> str:
+    """Order-sensitive digest of a listing page's item keys."""
+    return hashlib.sha256("\n".join(map(str, keys)).encode("utf-8")).hexdigest()
+
+
+def changed_pages_only(
+    pages: Iterable[tuple[int, list]],
+    *,
+    key: Callable[[object], Hashable],
+    get_state: Callable[[str], str | None],
+    set_state: Callable[[str, str], None],
+    skip_unchanged: bool = True,
+    prefix: str = "listing_hash",
+) -> Iterator[tuple[int, list]]:
+    """Record a digest per page under `{prefix}:{page}`; drop pages whose digest is unchanged.
+
+    With skip_unchanged=False every page passes through and digests are only
+    recorded (full crawls refresh them for the next sweep). A digest vouches
+    for its page's downloads, so `set_state` must only persist it once they
+    are done (BaseCrawler.set_state_after_crawl); otherwise a failed run
+    would leave the page's items skipped until the next full crawl.
+    """
+    skipped = 0
+    for page, items in pages:
+        digest = page_digest(key(item) for item in items)
+        state_key = f"{prefix}:{page}"
+        unchanged = get_state(state_key) == digest
+        set_state(state_key, digest)
+        if unchanged and skip_unchanged:
+            skipped += 1
+            continue
+        yield page, items
+    if skipped:
+        logger.info("Skipped %d unchanged listing pages", skipped)
+
+
+def new_items_only(
+    pages: Iterable[tuple[int, list]],
+    *,
+    key: Callable[[object], Hashable],
+    known: set,
+) -> Iterator[tuple[int, list]]:
+    """Yield each newest-first page's unknown items; stop at the first page with none."""
+    for page, items in pages:
+        new = [item for item in items if key(item) not in known]
+        if not new:
+            logger.info("Listing page %d holds only known items, stopping", page)
+            return
+        known.update(key(item) for item in new)
+        yield page, new
@@ -3,88 +3,129 @@
 
 Scrapes the public HTML pages since the API requires auth.
 206 pages, 42 servers per page, ~8,600 total.
+
+Incremental mode walks the newest-first listing until a page holds only
+known servers; a periodic full sweep skips listing pages whose hash is
+unchanged since the previous sweep.
 """
 
 from __future__ import annotations
 
 import logging
-import re
 import time
 
 import requests
-from bs4 import BeautifulSoup
 
+from crawlers import extract
 from crawlers.base import BaseCrawler
+from crawlers.db import get_live_slugs
 from crawlers.models import CrawlResult
-from crawlers.utils import content_hash
+from crawlers.pagination import changed_pages_only, fetch_pages, listing_walk, new_items_only
 
 logger = logging.getLogger("observatory.pulsemcp")
 
 PULSEMCP_URL = "https://www.pulsemcp.com"
+LISTING_RATE_LIMIT_MS = 300
+LISTING_CONCURRENCY = 6
+MAX_LISTING_PAGES = 250  # safety limit
+# Newest-first listing used by incremental discovery
+NEWEST_LISTING_URL = PULSEMCP_URL + "/servers?page={page}&sort=recently-released"
+MAX_NEWEST_PAGES = 20
 
 
 class PulseMCPScraper(BaseCrawler):
     registry_id = "mcp-registry"
+    content_profile = "pulsemcp"
+    # Listing pages are paced per host; detail pages keep the default bucket
+    rate_limits = {"www.pulsemcp.com": (LISTING_RATE_LIMIT_MS, 3)}
 
-    def __init__(self, conn, *, output_dir=None, rate_limit_ms=1500, shard=None, max_workers=1):
-        super().__init__(conn, output_dir=output_dir, rate_limit_ms=rate_limit_ms, shard=shard, max_workers=max_workers)
+    def __init__(self, conn, *, output_dir=None, rate_limit_ms=1500, shard=None, max_workers=1, crawl_mode="incremental"):
+        super().__init__(conn, output_dir=output_dir, rate_limit_ms=rate_limit_ms, shard=shard, max_workers=max_workers, crawl_mode=crawl_mode)
 
     def discover(self) -> list[dict]:
-        """Scrape all server listings from paginated HTML pages."""
-        all_servers = []
-        page = 1
-
-        while True:
-            self.rate_limiter.wait()
-            url = f"{PULSEMCP_URL}/servers?page={page}&sort=alphabetical-asc"
-            try:
-                resp = requests.get(url, timeout=30, headers={
-                    "User-Agent": "AguaraObservatory/0.1 (+https://github.com/garagon/aguara-observatory)",
-                })
-                resp.raise_for_status()
-            except Exception as e:
-                logger.error("PulseMCP page %d error: %s", page, e)
-                break
-
-            servers = self._parse_listing_page(resp.text)
-            if not servers:
-                break
+        """Scrape server listings from paginated HTML pages.
 
+        Full mode fetches every page, LISTING_CONCURRENCY at a time, merged in
+        page order. Incremental mode walks the newest-first listing until a
+        page holds only known servers, with a periodic full sweep that skips
+        pages whose per-page hash is unchanged.
+        """
+        all_servers = []
+        walk = listing_walk(self.crawl_mode, self.get_state("last_full_sweep"))
+        logger.info("Listing walk: %s", walk)
+
+        if walk == "newest":
+            known = get_live_slugs(self.conn, self.registry_id)
+            pages = new_items_only(
+                fetch_pages(self._fetch_newest_page, max_pages=MAX_NEWEST_PAGES, concurrency=1),
+                key=lambda server: server["slug"], known=known,
+            )
+        else:
+            pages = changed_pages_only(
+                fetch_pages(
+                    self._fetch_listing_page, max_pages=MAX_LISTING_PAGES,
+                    concurrency=LISTING_CONCURRENCY, key=lambda server: server["slug"],
+                    on_incomplete=lambda page: self.discovery_incomplete(f"listing page {page}"),
+                ),
+                key=lambda server: server["slug"],
+                get_state=self.get_state, set_state=self.set_state_after_crawl,
+                skip_unchanged=walk == "sweep",
+            )
+
+        for page, servers in pages:
             all_servers.extend(servers)
 
             if page % 10 == 0:
                 logger.info("Discovered %d servers (page %d)...", len(all_servers), page)
 
-            page += 1
+        if walk != "newest" and self.discovery_complete:
+            self.set_state_after_crawl("last_full_sweep", str(int(time.time())))
+        return all_servers
 
-            # Safety: max 250 pages
-            if page > 250:
-                break
+    def _fetch_newest_page(self, page: int) -> list[dict] | None:
+        """Servers on one page of the newest-first listing."""
+        return self._fetch_listing_page(page, url=NEWEST_LISTING_URL.format(page=page))
 
-        return all_servers
+    def _fetch_listing_page(self, page: int, *, url: str | None = None) -> list[dict] | None:
+        """Servers on one listing page; [] past the end (404), None on error."""
+        url = url or f"{PULSEMCP_URL}/servers?page={page}&sort=alphabetical-asc"
+        self.rate_limiter.wait(url)
+        try:
+            resp = self.http.get(url, timeout=30, headers={
+                "User-Agent": "AguaraObservatory/0.1 (+https://github.com/garagon/aguara-observatory)",
+            })
+            if resp.status_code == 404:
+                return []
+            resp.raise_for_status()
+        except Exception as e:
+            logger.error("PulseMCP page %d error: %s", page, e)
+            return None
+        return self._parse_listing_page(resp.text)
 
     def _parse_listing_page(self, html: str) -> list[dict]:
         """Parse a single listing page and extract server info."""
-        soup = BeautifulSoup(html, "html.parser")
-        cards = soup.find_all("div", attrs={"data-test-id": re.compile(r"^mcp-server-grid-card")})
+        tree = extract.parse_html(html)
+        if tree is None:
+            return []
+        cards = tree.xpath("//div[starts-with(@data-test-id, 'mcp-server-grid-card')]")
         servers = []
 
         for card in cards:
-            link = card.find("a", href=re.compile(r"^/servers/"))
-            if not link:
+            link = extract.first(card, ".//a[starts-with(@href, '/servers/')]")
+            if link is None:
                 continue
 
-            slug = link["href"].replace("/servers/", "").strip("/")
+            slug = link.get("href").replace("/servers/", "").strip("/")
             if not slug:
                 continue
 
-            title_el = card.find("h3")
-            author_el = card.find("p", class_=re.compile(r"text-14.*text-gray"))
-            desc_el = card.find("p", class_=re.compile(r"text-15.*text-pulse"))
+            title_el = extract.first(card, ".//h3")
+            author_el = extract.first(card, ".//p[re:test(@class, 'text-14.*text-gray')]")
+            desc_el = extract.first(card, ".//p[re:test(@class, 'text-15.*text-pulse')]")
 
-            name = title_el.text.strip() if title_el else slug
-            author = author_el.text.strip() if author_el else None
-            description = desc_el.text.strip() if desc_el else None
+            name = title_el.text_content().strip() if title_el is not None else slug
+            author = author_el.text_content().strip() if author_el is not None else None
+            description = desc_el.text_content().strip() if desc_el is not None else None
 
             metadata = {}
             if author:
@@ -108,7 +149,7 @@ class PulseMCPScraper(BaseCrawler):
 
         self.rate_limiter.wait()
         try:
-            resp = requests.get(url, timeout=30, headers={
+            resp = self.http.get(url, timeout=30, headers={
                 "User-Agent": "AguaraObservatory/0.1 (+https://github.com/garagon/aguara-observatory)",
             })
             if resp.status_code == 404:
@@ -128,9 +169,9 @@ class PulseMCPScraper(BaseCrawler):
             else:
                 return CrawlResult(skill_id=skill_id, slug=slug, error="No content")
 
-        new_hash = content_hash(content)
+        new_hash, canon = self.canonical_hash(content)
         if not self.is_content_changed(skill_id, new_hash):
-            return CrawlResult(skill_id=skill_id, slug=slug, skipped=True)
+            return CrawlResult(skill_id=skill_id, slug=slug, skipped=True, **canon)
 
         return CrawlResult(
             skill_id=skill_id,
@@ -140,35 +181,39 @@ class PulseMCPScraper(BaseCrawler):
             content=content,
             content_hash=new_hash,
             content_size=len(content),
+            **canon,
         )
 
     def _parse_detail_page(self, html: str, fallback_name: str = "") -> str | None:
         """Extract meaningful content from a server detail page."""
-        soup = BeautifulSoup(html, "html.parser")
+        tree = extract.parse_html(html)
+        if tree is None:
+            return None
 
         parts = []
 
         # Title
-        title = soup.find("h1")
-        if title:
-            parts.append(f"# {title.text.strip()}")
+        title = extract.first(tree, "//h1")
+        if title is not None:
+            parts.append(f"# {title.text_content().strip()}")
         elif fallback_name:
             parts.append(f"# {fallback_name}")
 
         # Description sections
-        for section in soup.find_all("div", class_=re.compile(r"prose|description|readme|content")):
-            text = section.get_text(separator="\n", strip=True)
+        for section in tree.xpath("//div[re:test(@class, 'prose|description|readme|content')]",
+                                  namespaces=extract.XPATH_NS):
+            text = extract.text_of(section)
             if text and len(text) > 20:
                 parts.append(text)
 
         # Tool/capability listings
-        for heading in soup.find_all(["h2", "h3"]):
-            heading_text = heading.text.strip()
+        for heading in tree.xpath("//h2 | //h3"):
+            heading_text = heading.text_content().strip()
             if any(kw in heading_text.lower() for kw in ("tool", "capabilit", "feature", "what")):
                 # Get sibling content
-                sibling = heading.find_next_sibling()
-                if sibling:
-                    text = sibling.get_text(separator="\n", strip=True)
+                sibling = extract.first(heading, "following-sibling::*[1]")
+                if sibling is not None:
+                    text = extract.text_of(sibling)
                     if text:
                         parts.append(f"## {heading_text}\n{text}")
 
@@ -189,13 +234,14 @@ def main():
     parser = argparse.ArgumentParser(description="Scrape PulseMCP registry")
     parser.add_argument("--output-dir", type=Path, help="Output directory")
     parser.add_argument("--max-workers", type=int, default=3, help="Concurrent workers")
+    parser.add_argument("--mode", choices=["full", "incremental"], default="incremental", help="Crawl mode")
     args = parser.parse_args()
 
     setup_logging()
     conn = connect()
     init_schema(conn)
 
-    crawler = PulseMCPScraper(conn, output_dir=args.output_dir, max_workers=args.max_workers)
+    crawler = PulseMCPScraper(conn, output_dir=args.output_dir, max_workers=args.max_workers, crawl_mode=args.mode)
     stats = crawler.crawl()
     conn.commit()
     print(json.dumps(stats, indent=2))
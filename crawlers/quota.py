@@ -0,0 +1,210 @@
+"""Cross-process API quota coordination for sharded crawls.
+
+Parallel skills.sh shards share one GitHub token (5000 REST requests/hour).
+Each shard holds a QuotaCoordinator that leases request budgets from a pool
+shared through the database (api_quota / api_quota_leases) or, for runs on a
+single host, a JSON file guarded by an exclusive lock. Observed
+X-RateLimit-* headers keep the pool honest; when it runs dry a shard either
+waits for the window to reset or is told to fall back to non-API paths.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from pathlib import Path
+
+from crawlers.db import lease_api_quota, observe_api_quota, release_api_quota
+
+logger = logging.getLogger("observatory.quota")
+
+GITHUB_CORE = "github:core"
+
+
+class QuotaExhausted(Exception):
+    """The shared quota is dry and won't reset within the caller's timeout."""
+
+
+class DBQuotaStore:
+    """Quota pool in the crawl database; works across hosts (CI shards).
+
+    Uses a dedicated connection: leases commit immediately so other shards see
+    them, which must not commit a crawler's half-written batch.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def observe(self, resource: str, remaining: int, reset_at: int) -> None:
+        observe_api_quota(self.conn, resource, remaining, reset_at)
+
+    def lease(self, resource: str, holder: str, want: int, *, used: int, reserve: int,
+              ttl_s: int) -> tuple[int, int | None]:
+        return lease_api_quota(self.conn, resource, holder, want,
+                               used=used, reserve=reserve, ttl_s=ttl_s)
+
+    def release(self, resource: str, holder: str, *, used: int) -> int:
+        return release_api_quota(self.conn, resource, holder, used=used)
+
+
+class FileQuotaStore:
+    """Quota pool in a local JSON file under flock; for single-host runs."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        with open(self.path.with_suffix(self.path.suffix + ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                state = json.loads(self.path.read_text()) if self.path.exists() else {}
+            except json.JSONDecodeError:
+                state = {}
+            yield state
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state))
+            os.replace(tmp, self.path)
+
+    def observe(self, resource: str, remaining: int, reset_at: int) -> None:
+        now = int(time.time())
+        with self._locked() as state:
+            pool = state.setdefault(resource, {"remaining": remaining, "reset_at": reset_at, "leases": {}})
+            if reset_at > pool["reset_at"]:
+                unspent = sum(
+                    max(0, lease["granted"] - lease["used"])
+                    for lease in pool["leases"].values() if lease["expires_at"] > now
+                )
+                pool["remaining"] = remaining - unspent
+                pool["reset_at"] = reset_at
+            else:
+                pool["remaining"] = min(pool["remaining"], remaining)
+
+    def lease(self, resource: str, holder: str, want: int, *, used: int, reserve: int,
+              ttl_s: int) -> tuple[int, int | None]:
+        now = int(time.time())
+        with self._locked() as state:
+            pool = state.get(resource)
+            if pool is None or pool["reset_at"] <= now:
+                granted, reset_at = want, None
+                pool = state.setdefault(resource, {"remaining": 0, "reset_at": 0, "leases": {}})
+            else:
+                granted = max(0, min(want, pool["remaining"] - reserve))
+                pool["remaining"] -= granted
+                reset_at = pool["reset_at"]
+            lease = pool["leases"].setdefault(holder, {"granted": 0, "used": 0, "expires_at": 0})
+            lease["granted"] += granted
+            lease["used"] = used
+            lease["expires_at"] = now + ttl_s
+        return granted, reset_at
+
+    def release(self, resource: str, holder: str, *, used: int) -> int:
+        with self._locked() as state:
+            pool = state.get(resource)
+            if pool is None:
+                return 0
+            lease = pool["leases"].pop(holder, None)
+            unspent = max(0, lease["granted"] - used) if lease else 0
+            pool["remaining"] += unspent
+        return unspent
+
+
+class QuotaCoordinator:
+    """Per-process view of a shared API quota.
+
+    Requests are drawn from a locally held lease of `lease_size`; the shared
+    store is only touched when the lease runs out and on observe(). The pool
+    never hands out its last `reserve` requests, leaving headroom for retries
+    and for other users of the token. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        store: DBQuotaStore | FileQuotaStore,
+        *,
+        resource: str = GITHUB_CORE,
+        holder: str | None = None,
+        lease_size: int = 50,
+        reserve: int = 100,
+        lease_ttl_s: int = 900,
+        sync_interval_s: float = 30,
+    ):
+        self.store = store
+        self.resource = resource
+        self.holder = holder or f"pid-{os.getpid()}"
+        self.lease_size = lease_size
+        self.reserve = reserve
+        self.lease_ttl_s = lease_ttl_s
+        self.sync_interval_s = sync_interval_s  # min gap between observe() writes
+        self.used = 0
+        self._last_sync = 0.0
+        self._last_reset_seen = 0
+        self._budget = 0
+        self._reset_at: int | None = None
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Take one request from the budget, waiting up to `timeout` seconds for a reset.
+
+        Returns False when the pool is dry and the window resets later than
+        `timeout` (None = wait as long as it takes) so the caller can switch to
+        a path that doesn't spend quota.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while self._budget <= 0:
+                granted, self._reset_at = self.store.lease(
+                    self.resource, self.holder, self.lease_size,
+                    used=self.used, reserve=self.reserve, ttl_s=self.lease_ttl_s,
+                )
+                if granted:
+                    self._budget += granted
+                    break
+                wait_s = max(1.0, (self._reset_at or 0) - time.time())
+                if deadline is not None and time.monotonic() + wait_s > deadline:
+                    return False
+                logger.warning("[%s] %s quota exhausted, sleeping %.0fs until reset",
+                               self.holder, self.resource, wait_s)
+                time.sleep(min(wait_s, 60))
+            self._budget -= 1
+            self.used += 1
+            return True
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Update the shared pool from a response's X-RateLimit-* headers.
+
+        Writes to the store at most every `sync_interval_s`, except on a new
+        window or when the quota is close to the reserve.
+        """
+        headers = {k.lower(): v for k, v in headers.items()}
+        if headers.get("x-ratelimit-resource", "core") != self.resource.split(":", 1)[-1]:
+            return
+        try:
+            remaining = int(headers["x-ratelimit-remaining"])
+            reset_at = int(headers["x-ratelimit-reset"])
+        except (KeyError, ValueError):
+            return
+        with self._lock:
+            now = time.monotonic()
+            urgent = reset_at > self._last_reset_seen or remaining <= self.reserve * 2
+            if not urgent and now - self._last_sync < self.sync_interval_s:
+                return
+            self.store.observe(self.resource, remaining, reset_at)
+            self._last_sync = now
+            self._last_reset_seen = max(self._last_reset_seen, reset_at)
+            if remaining <= self.reserve:
+                self._budget = 0  # stop spending our lease; the pool is nearly dry
+
+    def close(self) -> None:
+        """Hand unspent budget back to the pool."""
+        with self._lock:
+            returned = self.store.release(self.resource, self.holder, used=self.used)
+            self._budget = 0
+        logger.info("[%s] %s quota: used %d, returned %d", self.holder, self.resource, self.used, returned)
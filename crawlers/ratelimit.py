@@ -0,0 +1,213 @@
+"""Per-host token-bucket rate limiting for crawlers.
+
+One HostRateLimiter is shared by every worker thread and coroutine of a
+crawler. Each host (or configured host/path prefix) gets its own token bucket,
+so GitHub README fetches never eat into a registry API's budget. Buckets slow
+down on their own when a response carries 429/503 + Retry-After or an
+exhausted X-RateLimit-* quota.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable, Mapping
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("observatory.ratelimit")
+
+# Backoff after a 429/503 without Retry-After: BASE * 2**strikes, capped
+BASE_BACKOFF_S = 5.0
+MAX_BACKOFF_S = 300.0
+# Start pacing to the reset window once X-RateLimit-Remaining drops below this
+LOW_REMAINING = 10
+
+
+class TokenBucket:
+    """Thread-safe token bucket: one token per `interval_s`, up to `burst` saved.
+
+    Callers reserve a token under the lock and sleep outside it, so the same
+    bucket can be shared by threads and by coroutines on an event loop.
+    """
+
+    def __init__(self, interval_s: float, burst: int = 1):
+        self.interval_s = interval_s
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0  # Retry-After / quota reset
+        self._paced_interval = 0.0  # interval imposed by X-RateLimit-*
+        self._paced_until = 0.0
+        self.strikes = 0  # consecutive throttled responses
+        self._lock = threading.Lock()
+
+    def _interval(self, now: float) -> float:
+        if now < self._paced_until:
+            return max(self.interval_s, self._paced_interval)
+        return self.interval_s
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            interval = self._interval(now)
+            if interval > 0:
+                refill = (now - self._updated) / interval
+                self._tokens = min(float(self.burst), self._tokens + refill)
+            else:
+                self._tokens = float(self.burst)
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens * interval if self._tokens < 0 else 0.0
+            return max(delay, self._blocked_until - now)
+
+    def block_until(self, deadline: float) -> None:
+        """Hold every caller until `deadline` (monotonic clock)."""
+        with self._lock:
+            if deadline > self._blocked_until:
+                self._blocked_until = deadline
+                self._tokens = min(self._tokens, 0.0)
+
+    def pace(self, interval_s: float, until: float) -> None:
+        """Space calls at least `interval_s` apart until `until` (monotonic)."""
+        with self._lock:
+            self._paced_interval = interval_s
+            self._paced_until = until
+
+
+class HostRateLimiter:
+    """Token buckets keyed by host, with optional host/path-prefix overrides.
+
+    `limits` maps a key such as "api.github.com" or "clawhub.ai/api/v1/download"
+    to (interval_ms, burst); the longest matching prefix of host + path wins.
+    Hosts with no entry get their own bucket at `default_interval_ms`. Calling
+    wait() without a URL uses a bucket shared by all such calls, which is how
+    crawlers that have not been ported to per-host keys keep their old pacing.
+    """
+
+    def __init__(
+        self,
+        default_interval_ms: int = 500,
+        *,
+        burst: int = 1,
+        limits: Mapping[str, tuple[int, int]] | None = None,
+    ):
+        self.default_interval_s = default_interval_ms / 1000.0
+        self.default_burst = burst
+        self._limits = {k: (ms / 1000.0, b) for k, (ms, b) in (limits or {}).items()}
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        # Called with every observed status code (adaptive concurrency hooks in here)
+        self.on_status: Callable[[int], None] | None = None
+
+    @property
+    def delay_s(self) -> float:
+        """Default interval, for code written against the old RateLimiter."""
+        return self.default_interval_s
+
+    def set_limit(self, key: str, interval_ms: int, burst: int = 1) -> None:
+        """Configure (or reconfigure) the bucket for a host or host/path prefix."""
+        with self._lock:
+            self._limits[key] = (interval_ms / 1000.0, burst)
+            self._buckets.pop(key, None)
+
+    def _key(self, url: str | None) -> str:
+        if not url:
+            return ""
+        parts = urlsplit(url if "//" in url else f"//{url}")
+        target = f"{parts.hostname or ''}{parts.path}"
+        match = ""
+        for key in self._limits:
+            if target.startswith(key) and len(key) > len(match):
+                match = key
+        return match or (parts.hostname or "")
+
+    def bucket(self, url: str | None = None) -> TokenBucket:
+        """Return the bucket that governs `url` (created on first use)."""
+        key = self._key(url)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                interval_s, burst = self._limits.get(
+                    key, (self.default_interval_s, self.default_burst),
+                )
+                bucket = TokenBucket(interval_s, burst)
+                self._buckets[key] = bucket
+            return bucket
+
+    def wait(self, url: str | None = None) -> None:
+        """Block the calling thread until a request to `url` is allowed."""
+        delay = self.bucket(url).reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def async_wait(self, url: str | None = None) -> None:
+        """Await until a request to `url` is allowed, without blocking the loop."""
+        delay = self.bucket(url).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def observe(self, url: str | None, status: int, headers: Mapping[str, str]) -> None:
+        """Adjust the bucket for `url` from a response's status and rate-limit headers.
+
+        - 429/503: block until Retry-After, or back off exponentially without it
+        - X-RateLimit-Remaining of 0: block until X-RateLimit-Reset
+        - X-RateLimit-Remaining low: spread the remaining calls over the window
+        """
+        if self.on_status is not None:
+            self.on_status(status)
+        bucket = self.bucket(url)
+        now = time.monotonic()
+        headers = {k.lower(): v for k, v in headers.items()}
+
+        if status in (429, 503):
+            bucket.strikes += 1
+            wait_s = _retry_after(headers.get("retry-after"))
+            if wait_s is None:
+                wait_s = min(MAX_BACKOFF_S, BASE_BACKOFF_S * 2 ** (bucket.strikes - 1))
+            logger.warning("%s %s: throttled, holding host for %.1fs", status, url, wait_s)
+            bucket.block_until(now + wait_s)
+            return
+        bucket.strikes = 0
+
+        remaining = _int_header(headers, "x-ratelimit-remaining", "ratelimit-remaining")
+        reset = _int_header(headers, "x-ratelimit-reset", "ratelimit-reset")
+        if remaining is None or reset is None or remaining >= LOW_REMAINING:
+            return
+        # Reset is epoch seconds (GitHub) or seconds from now (IETF draft)
+        window_s = reset - time.time() if reset > 1_000_000_000 else float(reset)
+        window_s = max(window_s, 0.0)
+        if remaining <= 0:
+            logger.warning("%s: rate-limit quota exhausted, holding host for %.0fs", url, window_s)
+            bucket.block_until(now + window_s)
+        else:
+            bucket.pace(window_s / remaining, now + window_s)
+
+
+def _int_header(headers: Mapping[str, str], *names: str) -> int | None:
+    """First of `names` present in (lower-cased) headers, as an int."""
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return int(float(value))
+            except ValueError:
+                return None
+    return None
+
+
+def _retry_after(value: str | None) -> float | None:
+    """Parse Retry-After (delta-seconds or HTTP-date) into seconds from now."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
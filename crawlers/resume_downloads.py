@@ -70,7 +70,7 @@ def resume_registry(conn, registry_id: str, rate_limit_ms: int = 3000, max_worke
     else:
         crawler._crawl_sequential(skills)
 
-    conn.commit()
+    crawler._commit()
 
     stats = {
         "pending": len(skills),
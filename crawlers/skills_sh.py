@@ -7,40 +7,91 @@ Changes from original:
   - Shard support (A-F, G-L, M-R, S-Z) for parallel GH Actions
   - Writes to Turso DB instead of local JSON manifest
   - Incremental via content SHA-256 hash
-  - Incremental mode: conditional sitemap + new-only discovery
+  - Incremental mode: conditional sitemap + new and lastmod-advanced skills
+  - Git change detection: unchanged repo HEAD or blob SHA skips the download
 """
 
 from __future__ import annotations
 
+import gzip
 import json
 import logging
+import os
 import re
-import subprocess
-import time
+import threading
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
 from pathlib import Path
 from xml.etree import ElementTree
 
 import requests
-from bs4 import BeautifulSoup
 
+from crawlers import extract
 from crawlers.base import BaseCrawler
+from crawlers.db import get_git_shas, get_source_lastmods
+from crawlers.github import GitHubClient, git_blob_sha
 from crawlers.models import CrawlResult
-from crawlers.utils import content_hash, shard_matches
+from crawlers.quota import QuotaCoordinator, QuotaExhausted
+from crawlers.utils import shard_matches
 
 logger = logging.getLogger("observatory.skills_sh")
 
 SITEMAP_URL = "https://skills.sh/sitemap.xml"
-RAW_BASE = "https://raw.githubusercontent.com"
 GH_API_RATE_LIMIT_MS = 200
 RAW_RATE_LIMIT_MS = 100
+# Longest wait for a shared GitHub quota reset before skipping the tree lookup
+QUOTA_MAX_WAIT_S = 120
+# Skills whose SKILL.md candidates are resolved per GraphQL query (0 disables)
+GRAPHQL_BATCH_SIZE = 40
+# Repos with at least this many skills are fetched as one tarball (0 disables)
+ARCHIVE_MIN_SKILLS = 10
+# Nesting limit for sitemap indexes
+MAX_SITEMAP_DEPTH = 2
+
+
+def _normalize_lastmod(value: str | None) -> str | None:
+    """W3C datetime (date-only or with offset) as a sortable UTC timestamp."""
+    if not value or not value.strip():
+        return None
+    try:
+        dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
 class SkillsShCrawler(BaseCrawler):
     registry_id = "skills-sh"
-
-    def __init__(self, conn, *, output_dir=None, rate_limit_ms=500, shard=None, max_workers=1, crawl_mode="incremental"):
+    rate_limits = {
+        "api.github.com": (GH_API_RATE_LIMIT_MS, 1),
+        "raw.githubusercontent.com": (RAW_RATE_LIMIT_MS, 5),
+    }
+
+    def __init__(self, conn, *, output_dir=None, rate_limit_ms=500, shard=None, max_workers=1, crawl_mode="incremental",
+                 quota: QuotaCoordinator | None = None, graphql_batch: int = GRAPHQL_BATCH_SIZE,
+                 archive_min_skills: int = ARCHIVE_MIN_SKILLS):
         super().__init__(conn, output_dir=output_dir, rate_limit_ms=rate_limit_ms, shard=shard, max_workers=max_workers, crawl_mode=crawl_mode)
         self._repo_trees: dict[str, dict | None] = {}  # cache
+        self.quota = quota  # GitHub REST budget shared with the other shards
+        self.github = GitHubClient(
+            rate_limiter=self.rate_limiter, quota=quota, quota_timeout_s=QUOTA_MAX_WAIT_S,
+            cache=self.http_cache,
+            pool_size=max(8, max_workers * 2),
+        )
+        self.graphql_batch = graphql_batch
+        # {slug: (path, content, blob sha)} resolved ahead of download()
+        self._prefetched: dict[str, tuple[str, str, str]] = {}
+        self._prefetch_lock = threading.Lock()
+        self.archive_min_skills = archive_min_skills
+        self._repo_skill_counts: dict[str, int] = {}
+        # {"org/repo": {path: content} of SKILL.md members, or None if the archive failed}
+        self._archives: dict[str, dict[str, str] | None] = {}
+        # {skill_id: (blob sha, commit sha)} stored by earlier crawls
+        self._git_shas: dict[str, tuple[str, str | None]] = {}
+        # {"org/repo": default-branch HEAD commit, None if unresolvable} this run
+        self._repo_heads: dict[str, str | None] = {}
 
     # --- Discovery ---
 
@@ -48,7 +99,8 @@ class SkillsShCrawler(BaseCrawler):
         """Fetch sitemap and parse all skill URLs.
 
         In incremental mode, uses If-None-Match/If-Modified-Since on the sitemap.
-        If 304, returns empty list. If changed, returns only new skills not in DB.
+        If 304, returns empty list. If changed, returns new skills plus known
+        skills whose <lastmod> advanced since their last download.
         """
         headers = {"User-Agent": "AguaraObservatory/0.1"}
 
@@ -61,69 +113,107 @@ class SkillsShCrawler(BaseCrawler):
                 headers["If-Modified-Since"] = stored_last_modified
 
         logger.info("Fetching sitemap from %s (mode=%s)", SITEMAP_URL, self.crawl_mode)
-        resp = requests.get(SITEMAP_URL, timeout=30, headers=headers)
+        resp = requests.get(SITEMAP_URL, timeout=30, headers=headers, stream=True)
 
         if resp.status_code == 304:
+            resp.close()
             logger.info("Sitemap unchanged (304) — nothing new to crawl")
             return []
 
         resp.raise_for_status()
-        logger.info("Sitemap size: %d bytes", len(resp.text))
 
-        # Store sitemap ETags for future incremental runs
         etag = resp.headers.get("ETag", "")
         last_modified = resp.headers.get("Last-Modified", "")
-        if etag:
-            self.set_state("sitemap_etag", etag)
-        if last_modified:
-            self.set_state("sitemap_last_modified", last_modified)
-
-        skills = self._parse_sitemap(resp.text)
+        with resp:
+            skills = self._parse_sitemap(resp)
         logger.info("Parsed %d skill URLs from sitemap", len(skills))
 
+        # Store sitemap validators for future incremental runs. A 304 skips every
+        # skill in the sitemap, so they wait until those skills are all downloaded.
+        if self.discovery_complete:
+            if etag:
+                self.set_state_after_crawl("sitemap_etag", etag)
+            if last_modified:
+                self.set_state_after_crawl("sitemap_last_modified", last_modified)
+
         # Apply shard filter
         if self.shard:
             skills = [s for s in skills if shard_matches(s["slug"], self.shard)]
             logger.info("After shard filter (%s): %d skills", self.shard, len(skills))
 
-        # In incremental mode, filter to only new skills not in DB
+        # In incremental mode, keep new skills and skills edited since their last download
         if self.crawl_mode == "incremental":
-            from crawlers.db import get_skills_by_registry
-            known_slugs = {row[1] for row in get_skills_by_registry(self.conn, self.registry_id)}
-            new_skills = [s for s in skills if s["slug"] not in known_slugs]
-            logger.info("Incremental: %d known, %d new skills to process", len(known_slugs), len(new_skills))
-            return new_skills
-
+            known = get_source_lastmods(self.conn, self.registry_id, shard=self.shard)
+            new_skills = [s for s in skills if s["slug"] not in known]
+            updated = [
+                s for s in skills
+                if s["slug"] in known and s["lastmod"] and s["lastmod"] > (known[s["slug"]] or "")
+            ]
+            logger.info("Incremental: %d known, %d new, %d updated (lastmod) skills to process",
+                        len(known), len(new_skills), len(updated))
+            skills = new_skills + updated
+
+        # Counted here: the download phase only sees the registration stream
+        self._count_repo_skills(skills)
         return skills
 
-    def _parse_sitemap(self, xml_text: str) -> list[dict]:
-        """Parse sitemap XML, extract skill entries."""
-        root = ElementTree.fromstring(xml_text)
-        ns = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+    def _parse_sitemap(self, resp: requests.Response, *, depth: int = 0,
+                       seen: set | None = None) -> list[dict]:
+        """Stream-parse a sitemap (or sitemap index) response into skill entries.
+
+        Elements are cleared as they are consumed, so the document is never held
+        as a whole tree. Child sitemaps of an index are fetched and parsed the
+        same way.
+        """
         skills = []
-        seen = set()
+        seen = set() if seen is None else seen  # shared across an index's children
+        resp.raw.decode_content = True
+        source = gzip.GzipFile(fileobj=resp.raw) if resp.url.endswith(".gz") else resp.raw
+
+        loc = lastmod = None
+        for _, elem in ElementTree.iterparse(source, events=("end",)):
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if tag == "loc":
+                loc = (elem.text or "").strip()
+            elif tag == "lastmod":
+                lastmod = _normalize_lastmod(elem.text)
+            elif tag == "sitemap":
+                if loc and depth < MAX_SITEMAP_DEPTH:
+                    skills.extend(self._fetch_child_sitemap(loc, depth + 1, seen))
+                elif loc:
+                    self.discovery_incomplete(f"sitemap {loc} nested too deep")
+                loc = lastmod = None
+                elem.clear()
+            elif tag == "url":
+                m = re.match(r"https://skills\.sh/([^/]+)/([^/]+)/([^/]+)/?$", loc or "")
+                if m and m.group(3) != "security" and m.groups() not in seen:
+                    org, repo, skill = m.groups()
+                    seen.add(m.groups())
+                    skills.append({
+                        "slug": f"{org}_{repo}__{skill}",
+                        "name": skill,
+                        "url": loc,
+                        "lastmod": lastmod,
+                        "metadata": {"org": org, "repo": repo, "skill": skill},
+                    })
+                loc = lastmod = None
+                elem.clear()
 
-        for loc in root.findall(".//sm:loc", ns):
-            url = loc.text.strip() if loc.text else ""
-            m = re.match(r"https://skills\.sh/([^/]+)/([^/]+)/([^/]+)/?$", url)
-            if not m:
-                continue
-            org, repo, skill = m.group(1), m.group(2), m.group(3)
-            if skill == "security":
-                continue
-            key = (org, repo, skill)
-            if key in seen:
-                continue
-            seen.add(key)
-
-            slug = f"{org}_{repo}__{skill}"
-            skills.append({
-                "slug": slug,
-                "name": skill,
-                "url": url,
-                "metadata": {"org": org, "repo": repo, "skill": skill},
-            })
+        return skills
 
+    def _fetch_child_sitemap(self, url: str, depth: int, seen: set) -> list[dict]:
+        """Fetch and parse one sitemap listed in a sitemap index."""
+        try:
+            resp = requests.get(url, timeout=30, headers={"User-Agent": "AguaraObservatory/0.1"},
+                                stream=True)
+            resp.raise_for_status()
+            with resp:
+                skills = self._parse_sitemap(resp, depth=depth, seen=seen)
+        except (requests.RequestException, ElementTree.ParseError, OSError) as e:
+            logger.warning("Failed to read child sitemap %s: %s", url, e)
+            self.discovery_incomplete(f"child sitemap {url}")
+            return []
+        logger.info("Child sitemap %s: %d skill URLs", url, len(skills))
         return skills
 
     # --- Download ---
@@ -135,6 +225,7 @@ class SkillsShCrawler(BaseCrawler):
         repo = metadata.get("repo", "")
         skill = metadata.get("skill", "")
         url = kwargs.get("url", "")
+        lastmod = kwargs.get("lastmod")
 
         if not org or not repo:
             return CrawlResult(
@@ -145,18 +236,35 @@ class SkillsShCrawler(BaseCrawler):
 
         skill_id = f"{self.registry_id}:{slug}"
 
+        # Repo HEAD unchanged since the stored download: no tree, no fetch
+        head = self._repo_heads.get(f"{org}/{repo}")
+        stored_blob, stored_commit = self._git_shas.get(skill_id, (None, None))
+        if head and head == stored_commit:
+            return CrawlResult(skill_id=skill_id, slug=slug, skipped=True, source_lastmod=lastmod)
+
         content = None
         method = None
+        blob_sha = None
 
-        # Method 1: GitHub tree + raw download
-        tree = self._get_repo_tree(org, repo)
+        # Method 0: SKILL.md already fetched by a repo archive or GraphQL batch
+        with self._prefetch_lock:
+            prefetched = self._prefetched.pop(slug, None)
+        if prefetched:
+            path, content, blob_sha = prefetched
+            method = f"graphql:{path}"
+
+        # Method 1: GitHub tree + raw download, unless the blob SHA is unchanged
+        tree = self._get_repo_tree(org, repo) if not content else None
         if tree:
             path = self._find_skill_path(tree, skill)
             if path:
+                blob_sha = tree[path]
+                if blob_sha == stored_blob:
+                    return CrawlResult(skill_id=skill_id, slug=slug, skipped=True,
+                                       blob_sha=blob_sha, commit_sha=head, source_lastmod=lastmod)
                 content = self._download_raw(org, repo, path)
                 if content:
                     method = f"raw:{path}"
-                time.sleep(RAW_RATE_LIMIT_MS / 1000)
 
         # Method 2: Try common paths directly
         if not content:
@@ -168,23 +276,24 @@ class SkillsShCrawler(BaseCrawler):
                 content = self._download_raw(org, repo, try_path)
                 if content:
                     method = f"raw-guess:{try_path}"
+                    blob_sha = git_blob_sha(content)
                     break
-                time.sleep(RAW_RATE_LIMIT_MS / 1000)
 
         # Method 3: Scrape skills.sh page
         if not content and url:
             content = self._scrape_skills_sh(url)
             if content:
                 method = "scrape"
-            time.sleep(RAW_RATE_LIMIT_MS / 1000)
+                blob_sha = head = None  # not the repo file
 
         if not content:
             return CrawlResult(skill_id=skill_id, slug=slug, error="All download methods failed")
 
-        # Check if content changed
-        new_hash = content_hash(content)
+        # Check if content changed; repo files are hashed as-is, the scraped page canonically
+        new_hash, canon = self.canonical_hash(content, "skills-sh/scrape" if method == "scrape" else None)
         if not self.is_content_changed(skill_id, new_hash):
-            return CrawlResult(skill_id=skill_id, slug=slug, skipped=True)
+            return CrawlResult(skill_id=skill_id, slug=slug, skipped=True,
+                               blob_sha=blob_sha, commit_sha=head, source_lastmod=lastmod, **canon)
 
         return CrawlResult(
             skill_id=skill_id,
@@ -195,8 +304,149 @@ class SkillsShCrawler(BaseCrawler):
             content_hash=new_hash,
             content_size=len(content),
             metadata={"method": method, "org": org, "repo": repo},
+            blob_sha=blob_sha,
+            commit_sha=head,
+            source_lastmod=lastmod,
+            **canon,
         )
 
+    # --- Batched prefetch (GraphQL) ---
+
+    def _load_content_hashes(self) -> None:
+        first = self._content_hashes is None
+        super()._load_content_hashes()
+        if first:
+            self._git_shas = get_git_shas(self.conn, self.registry_id, shard=self.shard)
+            logger.info("Preloaded %d git blob SHAs", len(self._git_shas))
+
+    def _crawl_sequential(self, skills: Iterable[dict], *, total: int | None = None) -> None:
+        if total is None and isinstance(skills, list):
+            total = len(skills)
+        super()._crawl_sequential(self._prefetch_stream(skills), total=total)
+
+    def _crawl_concurrent(self, skills: Iterable[dict], *, total: int | None = None) -> None:
+        if total is None and isinstance(skills, list):
+            total = len(skills)
+        super()._crawl_concurrent(self._prefetch_stream(skills), total=total)
+
+    def _count_repo_skills(self, skills: list[dict]) -> None:
+        """Skills per repo, to pick the repos worth fetching as one archive."""
+        counts: dict[str, int] = {}
+        for skill_info in skills:
+            metadata = skill_info.get("metadata") or {}
+            if metadata.get("org") and metadata.get("repo"):
+                key = f"{metadata['org']}/{metadata['repo']}"
+                counts[key] = counts.get(key, 0) + 1
+        self._repo_skill_counts = counts
+
+    def _prefetch_stream(self, skills: Iterable[dict]) -> Iterator[dict]:
+        """Pass skills through, resolving each batch's SKILL.md ahead of download().
+
+        Repo HEAD commits are resolved per batch first; skills whose repo hasn't
+        moved since their stored download are not fetched at all. Skills from repos with at least `archive_min_skills` skills are served
+        from one streamed tarball per repo; the rest of each batch is resolved
+        in one GraphQL query. A batch is prefetched before any of its skills
+        is handed to the download engine; misses fall back to the tree + raw
+        path in download().
+        """
+        use_archives = self.archive_min_skills and any(
+            n >= self.archive_min_skills for n in self._repo_skill_counts.values()
+        )
+        if not self.github.token and not use_archives:
+            yield from skills
+            return
+        batch_size = self.graphql_batch or GRAPHQL_BATCH_SIZE
+        batch: list[dict] = []
+        for skill_info in skills:
+            batch.append(skill_info)
+            if len(batch) >= batch_size:
+                self._prefetch(batch)
+                yield from batch
+                batch = []
+        if batch:
+            self._prefetch(batch)
+            yield from batch
+
+    def _prefetch(self, batch: list[dict]) -> None:
+        self._resolve_heads(batch)
+        hits: dict[str, tuple[str, str, str]] = {}
+        wanted: dict[str, list[tuple[str, str, str]]] = {}
+        for skill_info in batch:
+            metadata = skill_info.get("metadata") or {}
+            org, repo, skill = metadata.get("org"), metadata.get("repo"), metadata.get("skill", "")
+            if not (org and repo):
+                continue
+            stored = self._git_shas.get(f"{self.registry_id}:{skill_info['slug']}")
+            if stored and stored[1] and stored[1] == self._repo_heads.get(f"{org}/{repo}"):
+                continue  # download() skips it without fetching
+            files = self._repo_archive(org, repo)
+            path = self._find_skill_path(files, skill) if files else None
+            if path:
+                hits[skill_info["slug"]] = (path, files[path], git_blob_sha(files[path]))
+            else:
+                wanted[skill_info["slug"]] = [(org, repo, p) for p in self._candidate_paths(skill)]
+        if hits:
+            with self._prefetch_lock:
+                self._prefetched.update(hits)
+        if not wanted or not (self.graphql_batch and self.github.token):
+            return
+        try:
+            blobs = self.github.fetch_blobs(
+                [key for keys in wanted.values() for key in keys],
+                batch_size=len(wanted) * 5,
+            )
+        except Exception as e:
+            logger.warning("GraphQL prefetch failed for %d skills: %s", len(wanted), e)
+            return
+        hits = {}
+        for slug, keys in wanted.items():
+            for key in keys:
+                if key in blobs:
+                    oid, text = blobs[key]
+                    hits[slug] = (key[2], text, oid)
+                    break
+        with self._prefetch_lock:
+            self._prefetched.update(hits)
+        logger.debug("GraphQL prefetch: %d/%d skills resolved", len(hits), len(wanted))
+
+    def _resolve_heads(self, batch: list[dict]) -> None:
+        """Look up HEAD commits (one GraphQL query) for the batch's new repos."""
+        if not self.github.token:
+            return
+        repos = set()
+        for skill_info in batch:
+            metadata = skill_info.get("metadata") or {}
+            org, repo = metadata.get("org"), metadata.get("repo")
+            if org and repo and f"{org}/{repo}" not in self._repo_heads:
+                repos.add((org, repo))
+        if not repos:
+            return
+        try:
+            heads = self.github.head_commits(sorted(repos))
+        except Exception as e:
+            logger.warning("HEAD lookup failed for %d repos: %s", len(repos), e)
+            return
+        for org, repo in repos:
+            self._repo_heads[f"{org}/{repo}"] = heads.get((org, repo))
+
+    def _repo_archive(self, org: str, repo: str) -> dict[str, str] | None:
+        """SKILL.md files of a large repo from one streamed tarball (cached per run)."""
+        key = f"{org}/{repo}"
+        if not self.archive_min_skills or self._repo_skill_counts.get(key, 0) < self.archive_min_skills:
+            return None
+        if key not in self._archives:
+            try:
+                files = self.github.archive_files(
+                    org, repo, lambda path: path.rsplit("/", 1)[-1].lower() == "skill.md",
+                )
+            except QuotaExhausted:
+                files = None
+            self._archives[key] = files
+            if files is not None:
+                logger.info("Archive %s: %d SKILL.md files for %d skills",
+                            key, len(files), self._repo_skill_counts[key])
+        return self._archives[key]
+
     # --- GitHub helpers ---
 
     def _get_repo_tree(self, org: str, repo: str) -> dict | None:
@@ -205,48 +455,41 @@ class SkillsShCrawler(BaseCrawler):
         if key in self._repo_trees:
             return self._repo_trees[key]
 
-        tree = self._gh_api_tree(org, repo)
+        try:
+            tree = self._gh_api_tree(org, repo)
+        except QuotaExhausted:
+            # Fall back to raw-path guesses; don't cache so a later call can retry
+            logger.debug("GitHub quota exhausted, skipping tree for %s", key)
+            return None
         self._repo_trees[key] = tree
-        time.sleep(GH_API_RATE_LIMIT_MS / 1000)
         return tree
 
     def _gh_api_tree(self, org: str, repo: str) -> dict | None:
-        """Call GitHub API via gh CLI for repo tree."""
-        for branch in ("main", "master"):
-            data = self._gh_api(f"repos/{org}/{repo}/git/trees/{branch}?recursive=1")
-            if data and "tree" in data:
-                return {
-                    item["path"]: item["sha"]
-                    for item in data["tree"]
-                    if item["type"] == "blob" and item["path"].lower().endswith(".md")
-                }
-        return None
-
-    @staticmethod
-    def _gh_api(endpoint: str) -> dict | None:
-        """Call GitHub API via gh CLI."""
-        try:
-            result = subprocess.run(
-                ["gh", "api", endpoint],
-                capture_output=True, text=True, timeout=30,
-            )
-            if result.returncode == 0:
-                return json.loads(result.stdout)
-        except (subprocess.TimeoutExpired, json.JSONDecodeError, FileNotFoundError):
-            pass
-        return None
+        """Fetch the repo's default-branch tree as {path: blob sha} for .md files."""
+        tree = self.github.tree(org, repo)
+        if tree is None:
+            return None
+        return {
+            item["path"]: item["sha"]
+            for item in tree
+            if item["type"] == "blob" and item["path"].lower().endswith(".md")
+        }
 
     @staticmethod
-    def _find_skill_path(tree: dict, skill: str) -> str | None:
-        """Find SKILL.md path in repo tree."""
-        candidates = [
+    def _candidate_paths(skill: str) -> list[str]:
+        """Conventional SKILL.md locations, most specific first."""
+        return [
             f"skills/{skill}/SKILL.md",
             f"skills/{skill}/skill.md",
             f"{skill}/SKILL.md",
             f"{skill}/skill.md",
             "SKILL.md",
         ]
-        for c in candidates:
+
+    @classmethod
+    def _find_skill_path(cls, tree: dict, skill: str) -> str | None:
+        """Find SKILL.md path in repo tree."""
+        for c in cls._candidate_paths(skill):
             if c in tree:
                 return c
 
@@ -257,34 +500,31 @@ class SkillsShCrawler(BaseCrawler):
 
         return None
 
-    @staticmethod
-    def _download_raw(org: str, repo: str, path: str) -> str | None:
-        """Download raw file from GitHub."""
-        for branch in ("main", "master"):
-            url = f"{RAW_BASE}/{org}/{repo}/{branch}/{path}"
-            try:
-                resp = requests.get(url, timeout=15)
-                if resp.status_code == 200:
-                    return resp.text
-            except requests.RequestException:
-                pass
-        return None
+    def _download_raw(self, org: str, repo: str, path: str) -> str | None:
+        """Download raw file from the repo's default branch."""
+        return self.github.raw(org, repo, path)
 
-    @staticmethod
-    def _scrape_skills_sh(url: str) -> str | None:
+    def _scrape_skills_sh(self, url: str) -> str | None:
         """Fallback: scrape skill content from skills.sh page."""
         if not url:
             return None
         try:
-            resp = requests.get(url, timeout=15, headers={
+            self.rate_limiter.wait(url)
+            resp = self.http.get(url, timeout=15, headers={
                 "User-Agent": "AguaraObservatory/0.1"
             })
+            self.rate_limiter.observe(url, resp.status_code, resp.headers)
             if resp.status_code != 200:
                 return None
-            soup = BeautifulSoup(resp.text, "lxml")
-            main = soup.find("main") or soup.find("article") or soup.find("div", class_="prose")
-            if main:
-                return main.get_text(separator="\n", strip=True)
+            tree = extract.parse_html(resp.text)
+            if tree is None:
+                return None
+            main = extract.first(
+                tree, "(//main)[1]", "(//article)[1]",
+                "(//div[contains(concat(' ', normalize-space(@class), ' '), ' prose ')])[1]",
+            )
+            if main is not None:
+                return extract.text_of(main)
         except Exception:
             pass
         return None
@@ -301,20 +541,43 @@ def main():
     parser.add_argument("--output-dir", type=Path, help="Output directory for skill files")
     parser.add_argument("--rate-limit", type=int, default=500, help="Rate limit in ms")
     parser.add_argument("--mode", choices=["full", "incremental"], default="incremental", help="Crawl mode")
+    parser.add_argument("--github-quota", choices=["off", "db", "file"], default="off",
+                        help="Share the GitHub API quota with other shards via the DB or a local file")
+    parser.add_argument("--graphql-batch", type=int, default=GRAPHQL_BATCH_SIZE,
+                        help="Skills per batched GraphQL SKILL.md lookup (0 = per-skill raw only)")
+    parser.add_argument("--archive-min-skills", type=int, default=ARCHIVE_MIN_SKILLS,
+                        help="Fetch repos with at least this many skills as one tarball (0 = off)")
+    parser.add_argument("--quota-file", type=Path, default=Path("data/.github_quota.json"),
+                        help="Quota file for --github-quota file")
     args = parser.parse_args()
 
     setup_logging()
     conn = connect()
     init_schema(conn)
 
+    quota = None
+    if args.github_quota != "off":
+        from crawlers.quota import DBQuotaStore, FileQuotaStore
+
+        store = DBQuotaStore(connect()) if args.github_quota == "db" else FileQuotaStore(args.quota_file)
+        quota = QuotaCoordinator(store, holder=f"skills-sh:{args.shard or 'all'}:{os.getpid()}")
+
     crawler = SkillsShCrawler(
         conn,
         output_dir=args.output_dir,
         rate_limit_ms=args.rate_limit,
         shard=args.shard,
         crawl_mode=args.mode,
+        quota=quota,
+        graphql_batch=args.graphql_batch,
+        archive_min_skills=args.archive_min_skills,
     )
-    stats = crawler.crawl()
+    try:
+        stats = crawler.crawl()
+    finally:
+        crawler.github.close()
+        if quota:
+            quota.close()
     conn.commit()
     print(json.dumps(stats, indent=2))
 
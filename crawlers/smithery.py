@@ -6,40 +6,46 @@ Discovery uses paginated listing, download fetches server detail (tools, descrip
 
 Incremental mode: stores the most recent createdAt timestamp as a watermark
 and stops pagination when reaching previously-seen servers.
+Runs on the asyncio engine (AsyncBaseCrawler).
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import re
-import time
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 
-import requests
+import aiohttp
 
-from crawlers.base import BaseCrawler
+from crawlers.async_base import AsyncBaseCrawler
 from crawlers.models import CrawlResult
-from crawlers.utils import content_hash
+from crawlers.pagination import afetch_pages
 
 logger = logging.getLogger("observatory.smithery")
 
 SMITHERY_API = "https://registry.smithery.ai"
 PAGE_SIZE = 50  # API returns empty pages above 50
+LISTING_CONCURRENCY = 8
 
 
-class SmitheryCrawler(BaseCrawler):
+class SmitheryCrawler(AsyncBaseCrawler):
     registry_id = "smithery"
 
-    def __init__(self, conn, *, output_dir=None, rate_limit_ms=500, shard=None, max_workers=4, crawl_mode="incremental"):
-        super().__init__(conn, output_dir=output_dir, rate_limit_ms=rate_limit_ms, shard=shard, max_workers=max_workers, crawl_mode=crawl_mode)
+    def __init__(self, conn, *, output_dir=None, rate_limit_ms=500, shard=None, max_workers=4, crawl_mode="incremental", max_concurrency=32):
+        super().__init__(conn, output_dir=output_dir, rate_limit_ms=rate_limit_ms, shard=shard, max_workers=max_workers, crawl_mode=crawl_mode, max_concurrency=max_concurrency)
 
-    def discover(self) -> list[dict]:
+    async def adiscover(self) -> AsyncIterator[dict]:
         """Fetch all servers from Smithery API with page-based pagination.
 
-        In incremental mode, stores the newest createdAt as a watermark and
-        stops when reaching servers older than the watermark.
+        Page 1 reports totalPages; the remaining pages are fetched
+        LISTING_CONCURRENCY at a time and yielded in page order. In incremental
+        mode, stores the newest createdAt as a watermark and stops when
+        reaching servers older than the watermark.
         """
-        all_servers = []
+        discovered = 0
         watermark = None
 
         if self.crawl_mode == "incremental":
@@ -48,88 +54,95 @@ class SmitheryCrawler(BaseCrawler):
                 watermark = raw
                 logger.info("Incremental mode: watermark last_created_at=%s", watermark)
 
-        page = 1
-        total_pages = None
         newest_created_at = None
 
-        while True:
-            url = f"{SMITHERY_API}/servers?page={page}&pageSize={PAGE_SIZE}"
-
-            try:
-                self.rate_limiter.wait()
-                resp = requests.get(url, timeout=30, headers={
-                    "User-Agent": "AguaraObservatory/0.1 (https://github.com/garagon/aguara-observatory)",
-                })
-                resp.raise_for_status()
-                data = resp.json()
-            except Exception as e:
-                logger.error("Smithery API error on page %d: %s", page, e)
-                break
-
-            servers = data.get("servers", [])
-            pagination = data.get("pagination", {})
-
-            if total_pages is None:
-                total_pages = pagination.get("totalPages", 1)
-                total_count = pagination.get("totalCount", 0)
-                logger.info("Smithery: %d total servers, %d pages", total_count, total_pages)
-
-            if not servers:
-                break
-
-            stop_paginating = False
-            for server in servers:
-                qualified_name = server.get("qualifiedName", "")
-                if not qualified_name:
-                    continue
-
-                created_at = server.get("createdAt", "")
-
-                # Track the newest createdAt for watermark update
-                if newest_created_at is None and created_at:
-                    newest_created_at = created_at
-
-                # In incremental mode, stop at watermark
-                if watermark and created_at and created_at <= watermark:
-                    logger.info(
-                        "Reached watermark at %s, stopping pagination (%d servers so far)",
-                        created_at, len(all_servers),
-                    )
-                    stop_paginating = True
+        data = await self._fetch_listing(1)
+        if data is None:
+            self.discovery_incomplete("listing page 1")
+            return
+        pagination = data.get("pagination", {})
+        total_pages = pagination.get("totalPages", 1)
+        logger.info("Smithery: %d total servers, %d pages", pagination.get("totalCount", 0), total_pages)
+
+        async def fetch(page: int) -> list[dict] | None:
+            data = await self._fetch_listing(page)
+            return None if data is None else data.get("servers", [])
+
+        async def pages() -> AsyncIterator[tuple[int, list[dict]]]:
+            yield 1, data.get("servers", [])
+            async with aclosing(afetch_pages(
+                fetch, start=2, last=total_pages, concurrency=LISTING_CONCURRENCY,
+                key=lambda server: server.get("qualifiedName"),
+                on_incomplete=lambda page: self.discovery_incomplete(f"listing page {page}"),
+            )) as rest:
+                async for item in rest:
+                    yield item
+
+        async with aclosing(pages()) as listing:
+            async for page, servers in listing:
+                if not servers:
                     break
 
-                # Use qualifiedName as slug (e.g. "upstash/context7-mcp" or "exa")
-                slug = qualified_name.replace("/", "_")
-
-                all_servers.append({
-                    "slug": slug,
-                    "name": server.get("displayName", qualified_name),
-                    "url": server.get("homepage", f"https://smithery.ai/server/{qualified_name}"),
-                    "metadata": {
-                        k: server.get(k)
-                        for k in ("description", "namespace", "verified", "useCount", "remote", "createdAt")
-                        if server.get(k) is not None
-                    },
-                    "qualified_name": qualified_name,
-                })
-
-            if stop_paginating:
-                break
-
-            page += 1
-            if total_pages and page > total_pages:
-                break
+                stop_paginating = False
+                for server in servers:
+                    qualified_name = server.get("qualifiedName", "")
+                    if not qualified_name:
+                        continue
+
+                    created_at = server.get("createdAt", "")
+
+                    # Track the newest createdAt for watermark update
+                    if newest_created_at is None and created_at:
+                        newest_created_at = created_at
+
+                    # In incremental mode, stop at watermark
+                    if watermark and created_at and created_at <= watermark:
+                        logger.info(
+                            "Reached watermark at %s, stopping pagination (%d servers so far)",
+                            created_at, discovered,
+                        )
+                        stop_paginating = True
+                        break
+
+                    # Use qualifiedName as slug (e.g. "upstash/context7-mcp" or "exa")
+                    slug = qualified_name.replace("/", "_")
+
+                    discovered += 1
+                    yield {
+                        "slug": slug,
+                        "name": server.get("displayName", qualified_name),
+                        "url": server.get("homepage", f"https://smithery.ai/server/{qualified_name}"),
+                        "metadata": {
+                            k: server.get(k)
+                            for k in ("description", "namespace", "verified", "useCount", "remote", "createdAt")
+                            if server.get(k) is not None
+                        },
+                        "qualified_name": qualified_name,
+                    }
+
+                if stop_paginating:
+                    break
 
-            logger.info("Discovered %d servers so far (page %d/%s)...", len(all_servers), page - 1, total_pages)
+                logger.info("Discovered %d servers so far (page %d/%s)...", discovered, page, total_pages)
 
         # Update watermark
         if newest_created_at:
             self.set_state("last_created_at", newest_created_at)
             logger.info("Updated watermark last_created_at=%s", newest_created_at)
 
-        return all_servers
+    async def _fetch_listing(self, page: int) -> dict | None:
+        """One page of the server listing; None on error."""
+        url = f"{SMITHERY_API}/servers?page={page}&pageSize={PAGE_SIZE}"
+        try:
+            await self.rate_limiter.async_wait(url)
+            async with self.request("GET", url) as resp:
+                resp.raise_for_status()
+                return await resp.json()
+        except Exception as e:
+            logger.error("Smithery API error on page %d: %s", page, e)
+            return None
 
-    def download(self, slug: str, **kwargs) -> CrawlResult:
+    async def adownload(self, slug: str, **kwargs) -> CrawlResult:
         """Download server detail from Smithery API.
 
         Fetches the detail endpoint which includes tools, connections, and description.
@@ -140,20 +153,22 @@ class SmitheryCrawler(BaseCrawler):
 
         detail_url = f"{SMITHERY_API}/servers/{qualified_name}"
 
-        try:
-            self.rate_limiter.wait()
-            resp = requests.get(detail_url, timeout=20, headers={
-                "User-Agent": "AguaraObservatory/0.1 (https://github.com/garagon/aguara-observatory)",
-            })
-            if resp.status_code == 404:
-                return CrawlResult(skill_id=skill_id, slug=slug, error="not found (404)")
-            if resp.status_code == 429:
-                time.sleep(5)
-                return CrawlResult(skill_id=skill_id, slug=slug, error="rate limited (429)")
-            resp.raise_for_status()
-            detail = resp.json()
-        except requests.RequestException as e:
-            return CrawlResult(skill_id=skill_id, slug=slug, error=str(e))
+        for _attempt in range(3):
+            try:
+                await self.rate_limiter.async_wait(detail_url)
+                resp = await self.get_cached(detail_url, timeout=aiohttp.ClientTimeout(total=20))
+                if resp.status == 404:
+                    return CrawlResult(skill_id=skill_id, slug=slug, error="not found (404)")
+                if resp.status == 429:
+                    continue  # request() held the host per Retry-After
+                if resp.status != 200:
+                    return CrawlResult(skill_id=skill_id, slug=slug, error=f"HTTP {resp.status}")
+                detail = resp.json()
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                return CrawlResult(skill_id=skill_id, slug=slug, error=str(e) or type(e).__name__)
+        else:
+            return CrawlResult(skill_id=skill_id, slug=slug, error="rate limited (429)")
 
         # Synthesize scannable content from API detail
         content = self._build_content(detail, kwargs)
@@ -161,9 +176,9 @@ class SmitheryCrawler(BaseCrawler):
         if not content:
             return CrawlResult(skill_id=skill_id, slug=slug, error="No content available")
 
-        new_hash = content_hash(content)
+        new_hash, canon = self.canonical_hash(content)
         if not self.is_content_changed(skill_id, new_hash):
-            return CrawlResult(skill_id=skill_id, slug=slug, skipped=True)
+            return CrawlResult(skill_id=skill_id, slug=slug, skipped=True, **canon)
 
         return CrawlResult(
             skill_id=skill_id,
@@ -173,6 +188,7 @@ class SmitheryCrawler(BaseCrawler):
             content=content,
             content_hash=new_hash,
             content_size=len(content),
+            **canon,
         )
 
     @staticmethod
@@ -233,6 +249,8 @@ def main():
     parser = argparse.ArgumentParser(description="Crawl Smithery.ai registry")
     parser.add_argument("--output-dir", type=Path, help="Output directory")
     parser.add_argument("--mode", choices=["full", "incremental"], default="incremental", help="Crawl mode")
+    parser.add_argument("--max-concurrency", type=int, default=32,
+                        help="Ceiling for adaptive download concurrency")
     parser.add_argument("--limit", type=int, default=0, help="Max servers to crawl (0=unlimited)")
     args = parser.parse_args()
 
@@ -240,7 +258,9 @@ def main():
     conn = connect()
     init_schema(conn)
 
-    crawler = SmitheryCrawler(conn, output_dir=args.output_dir, crawl_mode=args.mode)
+    crawler = SmitheryCrawler(
+        conn, output_dir=args.output_dir, crawl_mode=args.mode, max_concurrency=args.max_concurrency,
+    )
     stats = crawler.crawl()
     conn.commit()
     print(json.dumps(stats, indent=2))
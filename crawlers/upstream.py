@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Cross-registry entity resolution by upstream repository.
+
+The same MCP server is listed by mcp.so, PulseMCP, Glama, Smithery and
+LobeHub under different slugs, and their metadata spells the source repo
+differently (github_url, repository_url, homepage; http vs https, www.,
+.git, trailing slashes, /tree/<ref>/<dir> links, mixed case). upstream_key()
+folds these into one canonical key, e.g. "github.com/owner/repo", or
+"github.com/owner/repo/src/server" for a monorepo subdirectory. Crawlers
+store it in skills.upstream at registration, so listings of one server can
+be found together:
+    - README fetches use the canonical repo, so every registry asks for the
+      same URL and the shared HTTP cache fetches it once
+    - `python -m crawlers.upstream` reports which servers several registries
+      list, and how many of those listings are byte-identical (those are
+      scanned once, see scanner.fanout)
+
+Usage:
+    python -m crawlers.upstream              # report upstreams shared across registries
+    python -m crawlers.upstream --backfill   # resolve skills.upstream for existing rows
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("observatory.upstream")
+
+# Code hosts whose /owner/repo paths identify a repository
+CODE_HOSTS = frozenset({"github.com", "gitlab.com", "bitbucket.org", "codeberg.org"})
+# Metadata fields that may point at the upstream repo, most specific first
+UPSTREAM_FIELDS = ("github_url", "repository_url", "repository", "source_url", "homepage")
+
+_SCP_RE = re.compile(r"^git@([^:/]+):(.+)$")  # git@github.com:owner/repo.git
+
+
+def upstream_key(url: str | None) -> str | None:
+    """Canonical "host/owner/repo[/subdir]" for a code-host URL, else None."""
+    if not url or not isinstance(url, str):
+        return None
+    url = url.strip().removeprefix("git+")
+    m = _SCP_RE.match(url)
+    if m:
+        url = f"https://{m.group(1)}/{m.group(2)}"
+    elif "://" not in url:
+        url = f"https://{url}"
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if host not in CODE_HOSTS:
+        return None
+    segments = [s for s in parts.path.split("/") if s]
+    if len(segments) < 2:
+        return None
+    owner, repo = segments[0].lower(), segments[1].lower().removesuffix(".git")
+    if not repo:
+        return None
+    key = f"{host}/{owner}/{repo}"
+
+    # Subdirectory links: /tree/<ref>/<dir> (GitHub, Codeberg /src), /-/tree/<ref>/<dir>
+    # (GitLab), /src/<ref>/<dir> (Bitbucket); a /blob/ file link means its directory
+    rest = segments[2:]
+    if rest[:1] == ["-"]:
+        rest = rest[1:]
+    if len(rest) >= 3 and rest[0] in ("tree", "blob", "src"):
+        subdir = rest[2:-1] if rest[0] == "blob" else rest[2:]
+        subdir = [s for s in subdir if s not in (".", "..")]
+        if subdir:
+            key += "/" + "/".join(subdir)
+    return key
+
+
+def repo_of(key: str | None) -> tuple[str, str, str] | None:
+    """(host, owner, repo) of an upstream key or URL."""
+    key = upstream_key(key)
+    if not key:
+        return None
+    host, owner, repo = key.split("/")[:3]
+    return host, owner, repo
+
+
+def upstream_of(skill_info: dict) -> str | None:
+    """Upstream key for a discovered skill: its metadata links, then its own URL."""
+    metadata = skill_info.get("metadata") or {}
+    for field in UPSTREAM_FIELDS:
+        value = metadata.get(field)
+        if isinstance(value, dict):
+            value = value.get("url")
+        key = upstream_key(value)
+        if key:
+            return key
+    if metadata.get("org") and metadata.get("repo"):  # skills.sh
+        return upstream_key(f"github.com/{metadata['org']}/{metadata['repo']}")
+    return upstream_key(skill_info.get("url"))
+
+
+def backfill_upstreams(conn, *, batch_size: int | None = None) -> int:
+    """Resolve skills.upstream for rows registered before it existed. Returns rows set."""
+    from crawlers.db import DEFAULT_BATCH_SIZE, set_skill_upstreams
+
+    rows = conn.execute(
+        "SELECT id, url, metadata FROM skills WHERE upstream IS NULL"
+    ).fetchall()
+    resolved = []
+    for skill_id, url, metadata in rows:
+        try:
+            metadata = json.loads(metadata) if metadata else None
+        except ValueError:
+            metadata = None
+        key = upstream_of({"url": url, "metadata": metadata if isinstance(metadata, dict) else None})
+        if key:
+            resolved.append((skill_id, key))
+    set_skill_upstreams(conn, resolved, batch_size=batch_size or DEFAULT_BATCH_SIZE)
+    logger.info("Resolved upstream for %d of %d skills", len(resolved), len(rows))
+    return len(resolved)
+
+
+def upstream_report(conn, *, top: int = 20) -> dict:
+    """Listings per upstream, and how many upstreams several registries share."""
+    from crawlers.db import get_upstream_listings
+
+    listings = get_upstream_listings(conn)
+    total = conn.execute("SELECT COUNT(*) FROM skills WHERE deleted = 0").fetchone()[0]
+    shared = {
+        key: rows for key, rows in listings.items()
+        if len({registry for _, registry, _ in rows}) > 1
+    }
+    identical = sum(
+        len(rows) - len({content for _, _, content in rows})
+        for rows in listings.values()
+    )
+    return {
+        "listings": total,
+        "listings_with_upstream": sum(len(rows) for rows in listings.values()),
+        "upstreams": len(listings),
+        "shared_upstreams": len(shared),
+        "listings_on_shared_upstreams": sum(len(rows) for rows in shared.values()),
+        # Listings whose content equals another listing of the same upstream
+        "redundant_listings": identical,
+        "top_shared": [
+            {"upstream": key, "registries": sorted({r for _, r, _ in rows}), "listings": len(rows)}
+            for key, rows in sorted(shared.items(), key=lambda kv: -len(kv[1]))[:top]
+        ],
+    }
+
+
+def main():
+    import argparse
+
+    from crawlers.db import connect, init_schema
+    from crawlers.utils import setup_logging
+
+    parser = argparse.ArgumentParser(description="Cross-registry upstream index")
+    parser.add_argument("--backfill", action="store_true",
+                        help="Resolve upstream for skills registered without one")
+    parser.add_argument("--top", type=int, default=20, help="Shared upstreams to list")
+    args = parser.parse_args()
+
+    setup_logging()
+    conn = connect()
+    init_schema(conn)
+
+    if args.backfill:
+        backfill_upstreams(conn)
+        conn.commit()
+    print(json.dumps(upstream_report(conn, top=args.top), indent=2))
+
+
+if __name__ == "__main__":
+    main()
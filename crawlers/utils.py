@@ -5,6 +5,7 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import threading
 import time
 from pathlib import Path
 
@@ -17,18 +18,24 @@ DEFAULT_RATE_LIMIT_MS = 500
 
 
 class RateLimiter:
-    """Simple rate limiter based on minimum delay between calls."""
+    """Simple rate limiter based on minimum delay between calls.
+
+    Thread-safe: each caller reserves its slot under a lock and sleeps outside
+    it. Crawlers use crawlers.ratelimit.HostRateLimiter instead.
+    """
 
     def __init__(self, delay_ms: int = DEFAULT_RATE_LIMIT_MS):
         self.delay_s = delay_ms / 1000.0
-        self._last_call = 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
 
     def wait(self):
-        now = time.monotonic()
-        elapsed = now - self._last_call
-        if elapsed < self.delay_s:
-            time.sleep(self.delay_s - elapsed)
-        self._last_call = time.monotonic()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.delay_s
+        if slot > now:
+            time.sleep(slot - now)
 
 
 def content_hash(content: str | bytes) -> str:
@@ -80,13 +87,21 @@ def setup_logging(level: int = logging.INFO) -> None:
     )
 
 
-def shard_matches(slug: str, shard: str) -> bool:
-    """Check if a slug belongs to a letter-range shard (e.g. 'A-F')."""
-    if not shard or not slug:
-        return True
+def shard_bounds(shard: str | None) -> tuple[str, str] | None:
+    """Parse a letter-range shard (e.g. 'A-F') into (start, end), or None if unsharded."""
+    if not shard:
+        return None
     parts = shard.upper().split("-")
     if len(parts) != 2:
+        return None
+    return parts[0], parts[1]
+
+
+def shard_matches(slug: str, shard: str) -> bool:
+    """Check if a slug belongs to a letter-range shard (e.g. 'A-F')."""
+    bounds = shard_bounds(shard)
+    if not bounds or not slug:
         return True
-    start, end = parts
+    start, end = bounds
     first_char = slug[0].upper()
     return start <= first_char <= end
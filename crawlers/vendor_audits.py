@@ -13,9 +13,8 @@ import logging
 import re
 
 import requests
-from bs4 import BeautifulSoup
 
-from crawlers.db import upsert_vendor_audit
+from crawlers.db import DEFAULT_BATCH_SIZE, upsert_vendor_audits
 from crawlers.models import VendorAudit
 from crawlers.utils import RateLimiter
 
@@ -205,16 +204,14 @@ def scrape_skill_audits(
     return results
 
 
-def scrape_and_store(conn, skill_id: str, org: str, repo: str, skill: str) -> dict:
-    """Scrape vendor audits for a skill and store in DB."""
-    rate_limiter = RateLimiter(RATE_LIMIT_MS)
-    results = scrape_skill_audits(org, repo, skill, rate_limiter)
-
+def build_audits(skill_id: str, results: dict[str, dict]) -> list[VendorAudit]:
+    """Convert scraped vendor results into VendorAudit rows (skips not-found pages)."""
+    audits = []
     for vendor, data in results.items():
         if data.get("status") == "not_found":
             continue
 
-        audit = VendorAudit(
+        audits.append(VendorAudit(
             skill_id=skill_id,
             vendor=vendor,
             verdict=data.get("verdict"),
@@ -223,9 +220,15 @@ def scrape_and_store(conn, skill_id: str, org: str, repo: str, skill: str) -> di
             alert_count=data.get("alert_count", 0),
             findings=data.get("findings", data.get("alerts", [])),
             raw_data=data,
-        )
-        upsert_vendor_audit(conn, audit)
+        ))
+    return audits
+
 
+def scrape_and_store(conn, skill_id: str, org: str, repo: str, skill: str) -> dict:
+    """Scrape vendor audits for a skill and store in DB."""
+    rate_limiter = RateLimiter(RATE_LIMIT_MS)
+    results = scrape_skill_audits(org, repo, skill, rate_limiter)
+    upsert_vendor_audits(conn, build_audits(skill_id, results))
     return results
 
 
@@ -239,6 +242,8 @@ def main():
     parser = argparse.ArgumentParser(description="Scrape vendor audits")
     parser.add_argument("--registry", default="skills-sh", help="Registry to scrape audits for")
     parser.add_argument("--limit", type=int, default=0, help="Max skills to scrape (0=all)")
+    parser.add_argument("--write-batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Audit rows per multi-row upsert")
     args = parser.parse_args()
 
     setup_logging()
@@ -253,6 +258,8 @@ def main():
 
     scraped = 0
     failed = 0
+    rate_limiter = RateLimiter(RATE_LIMIT_MS)
+    pending: list[VendorAudit] = []
 
     for i, (skill_id, slug, _) in enumerate(skills, 1):
         # Parse org/repo/skill from slug (format: org_repo__skill)
@@ -263,16 +270,21 @@ def main():
         org, repo, skill = parts.group(1), parts.group(2), parts.group(3)
 
         try:
-            scrape_and_store(conn, skill_id, org, repo, skill)
+            results = scrape_skill_audits(org, repo, skill, rate_limiter)
+            pending.extend(build_audits(skill_id, results))
             scraped += 1
         except Exception as e:
             logger.warning("Failed to scrape audits for %s: %s", skill_id, e)
             failed += 1
 
+        # Buffer audits and flush them in chunked upserts alongside each commit
         if i % 50 == 0:
+            upsert_vendor_audits(conn, pending, batch_size=args.write_batch_size)
+            pending.clear()
             conn.commit()
             logger.info("Progress: %d/%d (scraped=%d, failed=%d)", i, len(skills), scraped, failed)
 
+    upsert_vendor_audits(conn, pending, batch_size=args.write_batch_size)
     conn.commit()
     logger.info("Done: scraped=%d, failed=%d", scraped, failed)
 
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Content-addressed scanning: scan each distinct blob once, fan findings out.
+
+Many listings share byte-identical content: the same server listed by
+several registries, forks and mirrors, placeholder READMEs. Before the scan
+loop, `plan` groups the listings about to be scanned by the hash of their
+stored content (skills.raw_hash where content is normalised, else
+content_hash) and materialises, from each registry's pack store
+(crawlers.packstore), a scan directory holding one file per blob: its
+representative's. A blob that a live, already-scored listing outside this
+scan holds is not scanned at all, e.g. a new fork in a delta scan. After
+every registry is ingested, `apply` copies each representative's findings
+and score to its duplicates. `report` prints the duplication ratio per
+registry (schemas/016_content_blobs.sql).
+
+`--out` may point at tmpfs (e.g. /dev/shm/scan): nothing else reads it.
+
+Usage:
+    python -m scanner.fanout plan data/ --out data/scan [--delta]
+    ./bin/aguara scan data/scan/<registry> ...
+    python -m scanner.ingest results.json --registry <registry> --fan-out-plan data/scan/fanout.json
+    python -m scanner.fanout apply data/scan/fanout.json
+    python -m scanner.fanout report
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import shutil
+from pathlib import Path
+
+from crawlers.db import copy_findings, get_blob_stats, get_scored_blobs, get_skill_hashes, get_top_blobs
+from crawlers.packstore import PackStore, changed_names
+
+logger = logging.getLogger("observatory.fanout")
+
+REGISTRIES = ("skills-sh", "clawhub", "mcp-registry", "mcp-so", "lobehub", "smithery", "glama")
+PLAN_NAME = "fanout.json"
+
+
+def scan_names(data_dir: Path, store: PackStore, *, delta: bool) -> list[str]:
+    """Stored skills to scan: the change manifest in delta mode (when present), else all."""
+    index = store.index()
+    names = [name for name in changed_names(data_dir) if name in index] if delta else []
+    return names or sorted(index)
+
+
+def plan_scan(
+    conn,
+    data_root: Path,
+    scan_root: Path,
+    *,
+    registries: tuple[str, ...] = REGISTRIES,
+    delta: bool = False,
+) -> dict:
+    """Materialise scan directories under `scan_root` with one file per distinct blob.
+
+    Returns the plan: {"duplicates": {skill_id: representative}, "registries":
+    {registry: {"files": n, "scanned": n}}}, also written to scan_root/fanout.json.
+    """
+    stores: dict[str, PackStore] = {}
+    files: dict[str, tuple[str, str]] = {}  # skill_id -> (registry, store entry name)
+    for registry in registries:
+        data_dir = data_root / registry
+        if not data_dir.is_dir():
+            continue
+        stores[registry] = PackStore(data_dir)
+        for name in scan_names(data_dir, stores[registry], delta=delta):
+            files[f"{registry}:{name}"] = (registry, name)
+
+    blobs: dict[str, list[str]] = {}
+    for skill_id, content in get_skill_hashes(conn, files).items():
+        blobs.setdefault(content, []).append(skill_id)
+
+    # Listings outside this scan whose findings already describe the blob
+    scored = {
+        content: [s for s in holders if s not in files]
+        for content, holders in get_scored_blobs(conn, blobs).items()
+    }
+    duplicates = {}
+    for content, members in blobs.items():
+        outside = scored.get(content)
+        representative = min(outside) if outside else min(members)
+        duplicates.update((m, representative) for m in members if m != representative)
+
+    if scan_root.exists():
+        shutil.rmtree(scan_root)
+    stats: dict[str, dict] = {}
+    to_scan: dict[str, list[str]] = {}
+    for skill_id, (registry, name) in files.items():
+        entry = stats.setdefault(registry, {"files": 0, "scanned": 0})
+        entry["files"] += 1
+        if skill_id not in duplicates:
+            to_scan.setdefault(registry, []).append(name)
+    for registry, names in to_scan.items():
+        stats[registry]["scanned"] = stores[registry].materialise(scan_root / registry, names)
+
+    plan = {"duplicates": duplicates, "registries": stats}
+    scan_root.mkdir(parents=True, exist_ok=True)
+    (scan_root / PLAN_NAME).write_text(json.dumps(plan, indent=2) + "\n")
+    logger.info("Fan-out plan: %d files, %d blobs, %d duplicates left out of the scan",
+                len(files), len(blobs), len(duplicates))
+    return plan
+
+
+def load_plan(path: Path) -> dict[str, str]:
+    """{duplicate skill_id: representative skill_id} from a plan file."""
+    return json.loads(path.read_text()).get("duplicates", {})
+
+
+def apply_plan(conn, duplicates: dict[str, str]) -> dict:
+    """Copy each representative's findings and score to its duplicates."""
+    counts = copy_findings(conn, duplicates.items())
+    conn.commit()
+    logger.info("Fanned out findings to %d duplicates (%d inserted, %d removed)",
+                counts["skills"], counts["inserted"], counts["removed"])
+    return counts
+
+
+def duplication_report(conn, *, top: int = 20) -> dict:
+    """Duplication ratio per registry: listings that need no scan of their own.
+
+    Blobs shared across registries count once overall, towards the registry
+    of their representative.
+    """
+    def ratio(part: int, whole: int) -> float:
+        return round(1 - part / whole, 4) if whole else 0.0
+
+    registries = {}
+    totals = dict.fromkeys(("listings", "blobs_scanned", "bytes", "bytes_scanned",
+                            "findings", "findings_scanned"), 0)
+    for registry, listings, distinct, reps, size, rep_size, findings, rep_findings in get_blob_stats(conn):
+        registries[registry] = {
+            "listings": listings,
+            "distinct_blobs": distinct,
+            "blobs_scanned": reps,
+            "duplication_ratio": ratio(reps, listings),
+            "bytes_ratio": ratio(rep_size, size),
+            "findings_rows": findings,
+            "findings_fanned_out": findings - rep_findings,
+        }
+        for key, value in zip(totals, (listings, reps, size, rep_size, findings, rep_findings)):
+            totals[key] += value
+    return {
+        "registries": registries,
+        "total": {
+            "listings": totals["listings"],
+            "blobs_scanned": totals["blobs_scanned"],
+            "duplication_ratio": ratio(totals["blobs_scanned"], totals["listings"]),
+            "bytes_ratio": ratio(totals["bytes_scanned"], totals["bytes"]),
+            "findings_rows": totals["findings"],
+            "findings_fanned_out": totals["findings"] - totals["findings_scanned"],
+        },
+        "top_blobs": [
+            {"content_hash": content, "listings": skills, "registries": regs,
+             "content_size": size, "representative": rep}
+            for content, skills, regs, size, rep in get_top_blobs(conn, top)
+        ],
+    }
+
+
+def main():
+    import argparse
+
+    from crawlers.db import connect, init_schema
+    from crawlers.utils import setup_logging
+
+    parser = argparse.ArgumentParser(description="Scan each distinct content blob once")
+    sub = parser.add_subparsers(dest="command", required=True)
+    plan_parser = sub.add_parser("plan", help="Build deduplicated scan directories")
+    plan_parser.add_argument("data_root", type=Path, help="Crawl output root (data/)")
+    plan_parser.add_argument("--out", type=Path, required=True, help="Scan directory root")
+    plan_parser.add_argument("--delta", action="store_true",
+                             help="Only files in each registry's change manifest, when present")
+    apply_parser = sub.add_parser("apply", help="Copy findings to duplicates")
+    apply_parser.add_argument("plan", type=Path, help="Plan file written by `plan`")
+    report_parser = sub.add_parser("report", help="Duplication ratio per registry")
+    report_parser.add_argument("--top", type=int, default=20, help="Most shared blobs to list")
+    args = parser.parse_args()
+
+    setup_logging()
+    conn = connect()
+    init_schema(conn)
+
+    if args.command == "plan":
+        plan = plan_scan(conn, args.data_root, args.out, delta=args.delta)
+        print(json.dumps(plan["registries"], indent=2))
+    elif args.command == "apply":
+        print(json.dumps(apply_plan(conn, load_plan(args.plan)), indent=2))
+    else:
+        print(json.dumps(duplication_report(conn, top=args.top), indent=2))
+
+
+if __name__ == "__main__":
+    main()
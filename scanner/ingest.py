@@ -9,15 +9,18 @@ from __future__ import annotations
 import json
 import logging
 import re
+from collections.abc import Collection
 from pathlib import Path
 
 from crawlers.db import (
     connect,
     create_scan,
+    diff_findings_latest,
     finish_scan,
     get_skills_by_registry,
     init_schema,
-    insert_findings,
+    reconcile_staged_findings,
+    stage_findings,
     upsert_skill_score,
 )
 from crawlers.models import Finding, Severity, SkillScore, score_to_grade, SEVERITY_SCORE_IMPACT
@@ -120,6 +123,7 @@ def ingest_scan_results(
     registry_id: str,
     aguara_version: str = "unknown",
     delta: bool = False,
+    skip: Collection[str] = (),
 ) -> int:
     """Ingest a full scan result into the database.
 
@@ -129,6 +133,8 @@ def ingest_scan_results(
         registry_id: Which registry these skills belong to
         aguara_version: Version of Aguara used
         delta: If True, only score skills present in this scan (incremental mode)
+        skip: Skill ids left out of the scan on purpose (see scanner.fanout);
+            never scored clean
 
     Returns:
         Scan ID
@@ -142,16 +148,11 @@ def ingest_scan_results(
         for row in get_skills_by_registry(conn, registry_id)
     }
 
-    # Group findings by file
-    by_file: dict[str, list[dict]] = {}
-    raw_findings = scan_result.get("findings") or scan_result.get("raw_findings") or []
-    for finding in raw_findings:
-        filepath = finding.get("file_path", "")
-        fname = Path(filepath).name
-        by_file.setdefault(fname, []).append(finding)
+    by_file = _group_by_file(scan_result)
 
     total_findings = 0
     skills_scanned = 0
+    inserted = removed = 0
 
     for fname, raw_findings in by_file.items():
         skill_id = filename_to_skill_id(fname, registry_id)
@@ -169,9 +170,11 @@ def ingest_scan_results(
         # Parse findings
         findings = [parse_finding(raw) for raw in raw_findings]
 
-        # Write findings directly to findings_latest (skip historical table)
-        count = insert_findings(conn, scan_id, skill_id, findings)
-        total_findings += count
+        # Write only added/removed findings to findings_latest (skip historical table)
+        added, dropped = diff_findings_latest(conn, skill_id, scan_id, findings)
+        inserted += added
+        removed += dropped
+        total_findings += len(findings)
 
         # Compute and store score (skips write if unchanged)
         skill_score = compute_score(findings)
@@ -190,8 +193,8 @@ def ingest_scan_results(
             scanned_slugs.add(slug)
 
         for slug, skill_id in known_skills.items():
-            if slug in scanned_slugs:
-                continue  # Already scored above
+            if slug in scanned_slugs or skill_id in skip:
+                continue  # Already scored above, or scored via fan-out
             clean_score = SkillScore(
                 skill_id=skill_id,
                 score=100,
@@ -211,33 +214,98 @@ def ingest_scan_results(
     conn.commit()
 
     logger.info(
-        "Scan #%d complete: %d skills, %d findings ingested",
-        scan_id, skills_scanned, total_findings,
+        "Scan #%d complete: %d skills, %d findings ingested (%d inserted, %d removed)",
+        scan_id, skills_scanned, total_findings, inserted, removed,
+    )
+    return scan_id
+
+
+def bulk_ingest_scan_results(
+    conn,
+    scan_result: dict,
+    registry_id: str,
+    aguara_version: str = "unknown",
+    delta: bool = False,
+    skip: Collection[str] = (),
+) -> int:
+    """Set-based variant of ingest_scan_results for large scans.
+
+    Bulk-loads every parsed finding into findings_staging in large chunks, then
+    reconciles findings_latest and skill_scores with a handful of set-based
+    statements committed as one transaction. Round trips scale with
+    findings / STAGING_BATCH_SIZE instead of with the number of skills.
+
+    Same arguments and return value as ingest_scan_results.
+    """
+    scan_id = create_scan(conn, registry_id, aguara_version)
+    logger.info("Created scan #%d for registry=%s (bulk)", scan_id, registry_id)
+
+    known_skills = {
+        row[1]: row[0]  # slug -> skill_id
+        for row in get_skills_by_registry(conn, registry_id)
+    }
+
+    def staged_rows():
+        for fname, raw_findings in _group_by_file(scan_result).items():
+            slug = fname.removesuffix(".md")
+            skill_id = known_skills.get(slug)
+            if not skill_id:
+                logger.debug("Skipping unknown skill: %s:%s", registry_id, slug)
+                continue
+            for raw in raw_findings:
+                yield skill_id, parse_finding(raw)
+
+    try:
+        staged = stage_findings(conn, scan_id, staged_rows())
+        logger.info("Scan #%d: staged %d findings", scan_id, staged)
+        counts = reconcile_staged_findings(conn, scan_id, registry_id, full=not delta, skip=skip)
+    except Exception as e:
+        # Undo a half-applied reconcile before recording the failure
+        conn.rollback()
+        conn.execute("DELETE FROM findings_staging WHERE scan_id = ?", (scan_id,))
+        finish_scan(conn, scan_id, status="failed", error=str(e))
+        raise
+
+    finish_scan(
+        conn,
+        scan_id,
+        skills_scanned=counts["skills_scanned"],
+        findings_count=counts["findings"],
+        status="completed",
+    )
+
+    logger.info(
+        "Scan #%d complete: %d skills, %d findings ingested (%d inserted, %d removed)",
+        scan_id, counts["skills_scanned"], counts["findings"],
+        counts["inserted"], counts["removed"],
     )
     return scan_id
 
 
+def _group_by_file(scan_result: dict) -> dict[str, list[dict]]:
+    """Group raw Aguara findings by scanned filename."""
+    by_file: dict[str, list[dict]] = {}
+    raw_findings = scan_result.get("findings") or scan_result.get("raw_findings") or []
+    for finding in raw_findings:
+        filepath = finding.get("file_path", "")
+        fname = Path(filepath).name
+        by_file.setdefault(fname, []).append(finding)
+    return by_file
+
+
 def build_delta_dir(data_dir: Path, manifest_path: Path, delta_dir: Path) -> int:
-    """Create a delta directory with symlinks to only changed files.
+    """Create a delta directory holding only changed files.
 
-    Reads .changed_files.txt manifest and symlinks those files from data_dir
-    into delta_dir. Returns count of files linked.
+    Reads the .changed_files.txt manifest and materialises those skills from
+    data_dir's pack store into delta_dir. Returns count of files written.
     """
+    from crawlers.packstore import PackStore
+
     if not manifest_path.exists():
         return 0
 
-    delta_dir.mkdir(parents=True, exist_ok=True)
-    count = 0
-    for line in manifest_path.read_text().splitlines():
-        fname = line.strip()
-        if not fname:
-            continue
-        src = data_dir / fname
-        dst = delta_dir / fname
-        if src.exists():
-            dst.symlink_to(src.resolve())
-            count += 1
-    return count
+    names = [line.strip().removesuffix(".md") for line in manifest_path.read_text().splitlines()]
+    return PackStore(data_dir).materialise(delta_dir, [name for name in names if name])
 
 
 def main():
@@ -252,17 +320,27 @@ def main():
     parser.add_argument("--aguara-version", default="unknown", help="Aguara version")
     parser.add_argument("--delta", action="store_true",
                         help="Delta mode: only ingest results, preserve existing scores for unchanged skills")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Set-based ingest via the findings_staging table (for large scans)")
+    parser.add_argument("--fan-out-plan", type=Path,
+                        help="scanner.fanout plan: duplicates left out of the scan are not scored clean")
     args = parser.parse_args()
 
     setup_logging()
     conn = connect()
     init_schema(conn)
 
+    skip: set[str] = set()
+    if args.fan_out_plan:
+        from scanner.fanout import load_plan
+        skip = set(load_plan(args.fan_out_plan))
+
     scan_result = json.loads(args.results_file.read_text())
-    scan_id = ingest_scan_results(
-        conn, scan_result, args.registry, args.aguara_version, delta=args.delta,
+    ingest = bulk_ingest_scan_results if args.bulk else ingest_scan_results
+    scan_id = ingest(
+        conn, scan_result, args.registry, args.aguara_version, delta=args.delta, skip=skip,
     )
-    print(f"Ingested scan #{scan_id} (delta={args.delta})")
+    print(f"Ingested scan #{scan_id} (delta={args.delta}, bulk={args.bulk})")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,24 @@
+-- Staging area for set-based scan ingestion (scanner.ingest --bulk)
+-- Rows are bulk-loaded per scan, reconciled into findings_latest/skill_scores
+-- with a few set-based statements, then deleted. A regular table (not TEMP)
+-- so staged rows survive a Turso stream reconnect mid-ingest.
+
+CREATE TABLE IF NOT EXISTS findings_staging (
+    scan_id       INTEGER NOT NULL,
+    skill_id      TEXT NOT NULL,
+    rule_id       TEXT NOT NULL,
+    severity      TEXT NOT NULL,
+    category      TEXT NOT NULL,
+    subcategory   TEXT,
+    line          INTEGER,
+    matched_text  TEXT,
+    message       TEXT,
+    score_impact  INTEGER DEFAULT 0,
+    rule_name     TEXT,
+    description   TEXT,
+    analyzer      TEXT,
+    confidence    INTEGER,
+    context       TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_findings_staging_scan_skill ON findings_staging(scan_id, skill_id);
@@ -0,0 +1,4 @@
+-- Adaptive concurrency: JSON summary of the AIMD controller per crawl run
+-- {"initial", "final", "peak", "ceiling", "decisions": [{t, from, to, reason, latency_ms, error_rate}]}
+
+ALTER TABLE crawl_runs ADD COLUMN concurrency TEXT;
@@ -0,0 +1,19 @@
+-- Shared API quota for parallel crawl shards (GitHub REST 5000/h per token)
+-- api_quota.remaining is the last observed X-RateLimit-Remaining minus the
+-- budget leased to shards since. Leases record what each shard holds.
+
+CREATE TABLE IF NOT EXISTS api_quota (
+    resource    TEXT PRIMARY KEY,               -- e.g. 'github:core'
+    remaining   INTEGER NOT NULL,
+    reset_at    INTEGER NOT NULL,               -- epoch seconds
+    updated_at  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS api_quota_leases (
+    resource    TEXT NOT NULL,
+    holder      TEXT NOT NULL,                  -- shard/process holding the budget
+    granted     INTEGER NOT NULL DEFAULT 0,
+    used        INTEGER NOT NULL DEFAULT 0,
+    expires_at  INTEGER NOT NULL,               -- epoch seconds
+    PRIMARY KEY (resource, holder)
+);
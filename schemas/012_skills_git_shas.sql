@@ -0,0 +1,6 @@
+-- Git change detection: blob SHA of the downloaded file and the repo HEAD
+-- commit it was read at. Lets GitHub-backed crawlers skip unchanged skills
+-- without downloading them.
+
+ALTER TABLE skills ADD COLUMN blob_sha TEXT;
+ALTER TABLE skills ADD COLUMN commit_sha TEXT;
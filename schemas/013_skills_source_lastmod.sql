@@ -0,0 +1,5 @@
+-- Upstream last-modified time (e.g. sitemap <lastmod>) as of the last
+-- successful download. Incremental crawls recrawl skills whose upstream
+-- value has advanced past it.
+
+ALTER TABLE skills ADD COLUMN source_lastmod TEXT;
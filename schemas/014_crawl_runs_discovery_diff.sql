@@ -0,0 +1,6 @@
+-- Discovery diff of full crawls: live skills added, tombstoned (removed) and
+-- retained compared to the DB before the run. NULL for incremental runs.
+
+ALTER TABLE crawl_runs ADD COLUMN added INTEGER;
+ALTER TABLE crawl_runs ADD COLUMN removed INTEGER;
+ALTER TABLE crawl_runs ADD COLUMN retained INTEGER;
@@ -0,0 +1,7 @@
+-- Canonical upstream repository of a listing (crawlers.upstream), e.g.
+-- github.com/owner/repo. The same server listed by several registries
+-- shares one key.
+
+ALTER TABLE skills ADD COLUMN upstream TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_skills_upstream ON skills(upstream, content_hash);
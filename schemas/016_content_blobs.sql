@@ -0,0 +1,25 @@
+-- Content-addressed view of live listings: one row per distinct stored
+-- content with the listings sharing it. The representative (smallest skill
+-- id) is the listing a blob is scanned through. The others receive its
+-- findings (scanner.fanout).
+--
+-- Registries whose content is normalised before hashing (crawlers.normalize)
+-- record the hash of the raw content and the pipeline tag it went through,
+-- e.g. glama/1. Both are NULL for registries hashed as-is. Listings share a
+-- blob when their stored raw content is identical, not just its canonical
+-- form, so blobs are keyed on the raw hash where there is one.
+
+ALTER TABLE skills ADD COLUMN raw_hash TEXT;
+ALTER TABLE skills ADD COLUMN normalizer TEXT;
+
+CREATE VIEW IF NOT EXISTS content_blobs AS
+SELECT COALESCE(raw_hash, content_hash) AS content_hash,
+       MIN(id) AS representative,
+       COUNT(*) AS skills,
+       COUNT(DISTINCT registry_id) AS registries,
+       MAX(content_size) AS content_size
+FROM skills
+WHERE deleted = 0 AND content_hash IS NOT NULL
+GROUP BY COALESCE(raw_hash, content_hash);
+
+CREATE INDEX IF NOT EXISTS idx_skills_blob ON skills(COALESCE(raw_hash, content_hash));
@@ -0,0 +1,7 @@
+-- Content normalisation (crawlers.normalize), per crawl run: skills whose
+-- raw content changed but canonical content did not (noise), and skills
+-- rewritten only because their pipeline changed. The raw_hash and
+-- normalizer columns are added with the content_blobs view (016).
+
+ALTER TABLE crawl_runs ADD COLUMN noise INTEGER;
+ALTER TABLE crawl_runs ADD COLUMN renormalised INTEGER;
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Benchmark the asyncio crawler engine against a local high-latency server.
+
+Starts an aiohttp server on localhost that answers every request after a fixed
+delay, then crawls N synthetic skills through AsyncBaseCrawler with an
+in-memory database. Reports the peak number of requests in flight on the
+server side, wall time and throughput. Everything runs on one core: the
+server and the crawler share the same process.
+
+Usage:
+    python scripts/bench_async_crawler.py --skills 8000 --latency-ms 2000 --concurrency 3000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+# Add project root to path for crawler imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crawlers.async_base import AsyncBaseCrawler  # noqa: E402
+from crawlers.db import connect, init_schema  # noqa: E402
+from crawlers.models import CrawlResult  # noqa: E402
+from crawlers.utils import content_hash  # noqa: E402
+
+
+class SlowServer:
+    """Local HTTP server that sleeps before each response and counts concurrency."""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.in_flight = 0
+        self.peak = 0
+        self.served = 0
+        self.port = 0
+        self._ready = threading.Event()
+        self._stop: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency_s)
+            slug = request.match_info["slug"]
+            return web.Response(text=f"# {slug}\n\nSynthetic skill body for {slug}.\n")
+        finally:
+            self.in_flight -= 1
+            self.served += 1
+
+    async def _serve(self):
+        app = web.Application()
+        app.router.add_get("/skills/{slug}", self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0, backlog=8192)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._stop = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._ready.set()
+        await self._stop.wait()
+        await runner.cleanup()
+
+    def start(self):
+        threading.Thread(target=asyncio.run, args=(self._serve(),), daemon=True).start()
+        self._ready.wait()
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._stop.set)
+
+
+class BenchCrawler(AsyncBaseCrawler):
+    registry_id = "clawhub"  # any registered registry works for the FK
+
+    def __init__(self, conn, *, base_url: str, skills: int, **kwargs):
+        super().__init__(conn, **kwargs)
+        self.base_url = base_url
+        self.skills = skills
+
+    async def adiscover(self):
+        for i in range(self.skills):
+            yield {"slug": f"bench-{i:06d}", "name": f"bench {i}"}
+
+    async def adownload(self, slug: str, **kwargs) -> CrawlResult:
+        skill_id = f"{self.registry_id}:{slug}"
+        async with self.request("GET", f"{self.base_url}/skills/{slug}") as resp:
+            resp.raise_for_status()
+            content = await resp.text()
+        new_hash = content_hash(content)
+        if not self.is_content_changed(skill_id, new_hash):
+            return CrawlResult(skill_id=skill_id, slug=slug, skipped=True)
+        return CrawlResult(
+            skill_id=skill_id,
+            slug=slug,
+            content=content,
+            content_hash=new_hash,
+            content_size=len(content),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the asyncio crawler engine")
+    parser.add_argument("--skills", type=int, default=5000, help="Synthetic skills to crawl")
+    parser.add_argument("--latency-ms", type=int, default=500, help="Server delay per request")
+    parser.add_argument("--concurrency", type=int, default=2000, help="Downloads in flight")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Let the AIMD controller ramp up to --concurrency instead of starting there")
+    args = parser.parse_args()
+
+    server = SlowServer(args.latency_ms / 1000.0)
+    server.start()
+
+    conn = connect(":memory:")
+    init_schema(conn)
+    crawler = BenchCrawler(
+        conn,
+        base_url=f"http://127.0.0.1:{server.port}",
+        skills=args.skills,
+        output_dir=Path(tempfile.mkdtemp(prefix="bench-async-")),
+        rate_limit_ms=0,
+        max_concurrency=args.concurrency,
+        per_host_limit=args.concurrency,
+        adaptive=args.adaptive,
+    )
+
+    start = time.monotonic()
+    stats = crawler.crawl()
+    elapsed = time.monotonic() - start
+    server.stop()
+
+    print(json.dumps({
+        "skills": args.skills,
+        "latency_ms": args.latency_ms,
+        "concurrency": args.concurrency,
+        "peak_in_flight": server.peak,
+        "requests_served": server.served,
+        "elapsed_s": round(elapsed, 2),
+        "requests_per_s": round(server.served / elapsed, 1),
+        "serial_estimate_s": round(args.skills * args.latency_ms / 1000.0, 1),
+        "crawl": stats,
+        "adaptive": crawler.concurrency.summary() if crawler.concurrency else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Micro-benchmark HTML extraction: BeautifulSoup vs crawlers.extract.
+
+Runs the old BeautifulSoup extraction of each scraping crawler side by side
+with the current one (embedded JSON payload first, then lxml + XPath) over
+recorded pages, and reports per-page parse time and peak allocations
+(tracemalloc: Python heap only, libxml2's own memory is not traced).
+Recorded pages are *.html files in --pages; the file name picks the
+extractor: mcp-so-*.html, pulsemcp-*.html or skills-sh-*.html.
+Without --pages, synthetic Next.js-style pages are generated.
+
+Usage:
+    python scripts/bench_html_extract.py --pages data/recorded-pages --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+# Add project root to path for crawler imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crawlers.mcp_so import McpSoCrawler  # noqa: E402
+from crawlers.pulsemcp_scraper import PulseMCPScraper  # noqa: E402
+from crawlers import extract  # noqa: E402
+
+
+# --- Previous BeautifulSoup extraction (reference) ---
+
+def bs4_mcp_so(html: str) -> str | None:
+    soup = BeautifulSoup(html, "lxml")
+    content_area = (
+        soup.find("div", class_=re.compile(r"readme|content|description|prose", re.I))
+        or soup.find("article")
+        or soup.find("main")
+    )
+    if content_area:
+        text = content_area.get_text(separator="\n", strip=True)
+        if len(text) > 50:
+            return text
+    meta_desc = soup.find("meta", attrs={"name": "description"})
+    desc = meta_desc.get("content", "") if meta_desc else ""
+    return f"# bench\n\n{desc}\n" if desc else None
+
+
+def bs4_pulsemcp(html: str) -> str | None:
+    soup = BeautifulSoup(html, "html.parser")
+    parts = []
+    title = soup.find("h1")
+    if title:
+        parts.append(f"# {title.text.strip()}")
+    else:
+        parts.append("# bench")
+    for section in soup.find_all("div", class_=re.compile(r"prose|description|readme|content")):
+        text = section.get_text(separator="\n", strip=True)
+        if text and len(text) > 20:
+            parts.append(text)
+    for heading in soup.find_all(["h2", "h3"]):
+        heading_text = heading.text.strip()
+        if any(kw in heading_text.lower() for kw in ("tool", "capabilit", "feature", "what")):
+            sibling = heading.find_next_sibling()
+            if sibling:
+                text = sibling.get_text(separator="\n", strip=True)
+                if text:
+                    parts.append(f"## {heading_text}\n{text}")
+    return "\n\n".join(parts) + "\n" if parts else None
+
+
+def bs4_skills_sh(html: str) -> str | None:
+    soup = BeautifulSoup(html, "lxml")
+    main = soup.find("main") or soup.find("article") or soup.find("div", class_="prose")
+    return main.get_text(separator="\n", strip=True) if main else None
+
+
+# --- Current extraction ---
+
+def lxml_skills_sh(html: str) -> str | None:
+    tree = extract.parse_html(html)
+    if tree is None:
+        return None
+    main = extract.first(
+        tree, "(//main)[1]", "(//article)[1]",
+        "(//div[contains(concat(' ', normalize-space(@class), ' '), ' prose ')])[1]",
+    )
+    return extract.text_of(main) if main is not None else None
+
+
+EXTRACTORS = {
+    "mcp-so": (bs4_mcp_so, lambda html: McpSoCrawler._extract_content(html, "bench")),
+    "pulsemcp": (bs4_pulsemcp, lambda html: PulseMCPScraper._parse_detail_page(None, html, "bench")),
+    "skills-sh": (bs4_skills_sh, lxml_skills_sh),
+}
+
+
+# --- Synthetic pages ---
+
+def synthetic_page(kind: str, i: int, *, payload: bool) -> str:
+    """A detail page with navigation chrome, a README region and optional RSC payload."""
+    readme = "\n".join(f"<p>Paragraph {n} of server {i}: <code>tool_{n}</code> does things.</p>"
+                       for n in range(60))
+    nav = "".join(f'<li><a href="/server/other-{n}">Other {n}</a></li>' for n in range(300))
+    rsc = ""
+    if payload:
+        markdown = "\n".join(f"Paragraph {n} of server {i}: `tool_{n}` does things." for n in range(60))
+        flight = f'1:T{len(markdown.encode()):x},{markdown}2:["$","div",null,{{"content":"$1"}}]\n'
+        rsc = f"<script>self.__next_f.push({json.dumps([1, flight])})</script>"
+    return (
+        f'<html><head><meta name="description" content="Server {i}"><style>body{{}}</style></head>'
+        f'<body><nav><ul>{nav}</ul></nav><main><h1>Server {i}</h1>'
+        f'<div class="prose readme">{readme}</div><h2>Tools</h2><ul><li>tool_a</li><li>tool_b</li></ul>'
+        f'</main><footer>footer</footer>{rsc}</body></html>'
+    )
+
+
+def load_pages(pages_dir: Path | None, count: int) -> list[tuple[str, str, str]]:
+    """[(kind, name, html)] from recorded files, or synthetic pages."""
+    if pages_dir:
+        pages = []
+        for path in sorted(pages_dir.glob("*.html")):
+            kind = next((k for k in EXTRACTORS if path.name.startswith(k)), None)
+            if kind:
+                pages.append((kind, path.name, path.read_text(encoding="utf-8", errors="replace")))
+        return pages
+    pages = []
+    for kind in EXTRACTORS:
+        for i in range(count):
+            payload = kind == "mcp-so" and i % 2 == 0
+            pages.append((kind, f"synthetic-{kind}-{i}{'-rsc' if payload else ''}",
+                          synthetic_page(kind, i, payload=payload)))
+    return pages
+
+
+def measure(fn, html: str, repeat: int) -> tuple[list[float], int, str | None]:
+    """Per-call times (ms), peak traced allocation (bytes) and the output."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(html)
+        times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return times, peak, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML extraction backends")
+    parser.add_argument("--pages", type=Path, help="Directory of recorded *.html pages")
+    parser.add_argument("--synthetic", type=int, default=10, help="Synthetic pages per extractor")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per page")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.synthetic)
+    if not pages:
+        parser.error("no recognised *.html pages found")
+
+    report: dict[str, dict] = {}
+    for kind, name, html in pages:
+        old_fn, new_fn = EXTRACTORS[kind]
+        old_times, old_peak, old_out = measure(old_fn, html, args.repeat)
+        new_times, new_peak, new_out = measure(new_fn, html, args.repeat)
+        entry = report.setdefault(kind, {
+            "pages": 0, "bs4_ms": [], "new_ms": [], "bs4_peak_kb": [], "new_peak_kb": [],
+            "same_output": 0,
+        })
+        entry["pages"] += 1
+        entry["bs4_ms"].append(statistics.median(old_times))
+        entry["new_ms"].append(statistics.median(new_times))
+        entry["bs4_peak_kb"].append(old_peak / 1024)
+        entry["new_peak_kb"].append(new_peak / 1024)
+        entry["same_output"] += old_out == new_out
+
+    summary = {}
+    for kind, entry in report.items():
+        bs4_ms = statistics.mean(entry["bs4_ms"])
+        new_ms = statistics.mean(entry["new_ms"])
+        summary[kind] = {
+            "pages": entry["pages"],
+            "bs4_ms_per_page": round(bs4_ms, 3),
+            "new_ms_per_page": round(new_ms, 3),
+            "speedup": round(bs4_ms / new_ms, 1) if new_ms else None,
+            "bs4_peak_kb": round(statistics.mean(entry["bs4_peak_kb"]), 1),
+            "new_peak_kb": round(statistics.mean(entry["new_peak_kb"]), 1),
+            # Pages whose embedded payload is used differ from the rendered text by design
+            "same_output": entry["same_output"],
+        }
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""Shared fixtures: an in-memory database with every schema migration applied."""
+
+from __future__ import annotations
+
+import pytest
+
+from crawlers.db import connect, init_schema, upsert_skills
+
+
+@pytest.fixture
+def conn():
+    conn = connect(":memory:")
+    init_schema(conn)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def add_skills(conn):
+    """Register skills ({slug: content_hash or None}) for a registry and commit."""
+    def add(registry_id: str, skills: dict[str, str | None]) -> list[str]:
+        upsert_skills(conn, registry_id, [{"slug": s, "content_hash": h} for s, h in skills.items()])
+        conn.commit()
+        return [f"{registry_id}:{slug}" for slug in skills]
+
+    return add
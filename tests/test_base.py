@@ -0,0 +1,74 @@
+"""BaseCrawler: full-crawl tombstoning and crawl state."""
+
+from __future__ import annotations
+
+import pytest
+
+from crawlers.base import BaseCrawler
+from crawlers.db import get_live_slugs
+from crawlers.models import CrawlResult
+
+
+class ListCrawler(BaseCrawler):
+    """Discovers a fixed list of slugs; `fail_after` cuts discovery short like a failed page."""
+
+    registry_id = "glama"
+
+    def __init__(self, conn, slugs, *, fail_after=None, **kwargs):
+        super().__init__(conn, **kwargs)
+        self.slugs = slugs
+        self.fail_after = fail_after
+
+    def discover(self):
+        for i, slug in enumerate(self.slugs):
+            if i == self.fail_after:
+                self.discovery_incomplete(f"page failed after {i} skills")
+                return
+            yield {"slug": slug}
+
+    def download(self, slug, **kwargs):
+        return CrawlResult(skill_id=f"{self.registry_id}:{slug}", slug=slug, skipped=True)
+
+
+@pytest.fixture
+def crawl(conn, tmp_path):
+    def run(slugs, **kwargs):
+        crawler = ListCrawler(conn, slugs, output_dir=tmp_path / "glama", crawl_mode="full", **kwargs)
+        crawler.crawl()
+        return crawler
+
+    return run
+
+
+SLUGS = [f"s{i:02d}" for i in range(20)]
+
+
+def test_full_crawl_tombstones_vanished_skills(crawl, conn):
+    crawl(SLUGS)
+    crawler = crawl(SLUGS[1:])
+
+    assert crawler.discovery_diff == {"added": 0, "removed": 1, "retained": 19}
+    assert get_live_slugs(conn, "glama") == set(SLUGS[1:])
+
+
+def test_incomplete_discovery_tombstones_nothing(crawl, conn):
+    crawl(SLUGS)
+    crawler = crawl(SLUGS, fail_after=18)
+
+    assert not crawler.discovery_complete
+    assert crawler.discovery_diff["removed"] == 0
+    assert get_live_slugs(conn, "glama") == set(SLUGS)
+
+
+def test_large_drop_is_not_tombstoned(crawl, conn):
+    crawl(SLUGS)
+    crawl(SLUGS[:10])
+
+    assert get_live_slugs(conn, "glama") == set(SLUGS)
+
+
+def test_incremental_crawl_never_tombstones(conn, tmp_path, crawl):
+    crawl(SLUGS)
+    ListCrawler(conn, SLUGS[:1], output_dir=tmp_path / "glama").crawl()
+
+    assert get_live_slugs(conn, "glama") == set(SLUGS)
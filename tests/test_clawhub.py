@@ -0,0 +1,90 @@
+"""ClawHub watermarks: updatedAt and per-skill ETags only vouch for completed crawls."""
+
+from __future__ import annotations
+
+import io
+import zipfile
+from contextlib import asynccontextmanager
+
+import pytest
+
+from crawlers.clawhub import ClawHubCrawler
+from crawlers.db import get_crawl_states
+
+ITEMS = [{"slug": f"skill-{i}", "updatedAt": 1_700_000_000_000 - i} for i in range(3)]
+
+
+def _zip(text: str) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("SKILL.md", text)
+    return buf.getvalue()
+
+
+class FakeResponse:
+    def __init__(self, *, data=None, body=b"", headers=None):
+        self.status = 200
+        self.headers = headers or {}
+        self._data = data
+        self._body = body
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self):
+        return self._data
+
+    async def read(self):
+        return self._body
+
+
+class FakeClawHub(ClawHubCrawler):
+    """ClawHub crawler over a fixed listing; `crash_on` fails the crawl while saving that slug."""
+
+    def __init__(self, conn, *, crash_on=None, **kwargs):
+        super().__init__(conn, **kwargs)
+        self.crash_on = crash_on
+
+    @asynccontextmanager
+    async def request(self, method, url, **kwargs):
+        if "/skills?" in url:
+            yield FakeResponse(data={"items": [] if "cursor=" in url else ITEMS, "nextCursor": "2"})
+        else:
+            slug = url.split("slug=")[1].split("&")[0]
+            yield FakeResponse(body=_zip(f"# {slug}\n"), headers={"ETag": f'"{slug}"'})
+
+    def _save_content(self, slug, content):
+        if slug == self.crash_on:
+            raise OSError("disk full")
+        super()._save_content(slug, content)
+
+
+@pytest.fixture
+def crawl(conn, tmp_path, monkeypatch):
+    async def no_wait(url=None):
+        pass
+
+    def run(**kwargs):
+        crawler = FakeClawHub(conn, output_dir=tmp_path / "clawhub", **kwargs)
+        monkeypatch.setattr(crawler.rate_limiter, "async_wait", no_wait)
+        crawler.crawl()
+        return crawler
+
+    return run
+
+
+def test_failed_crawl_keeps_previous_watermarks(crawl, conn):
+    with pytest.raises(OSError):
+        crawl(crash_on="skill-2")
+
+    states = get_crawl_states(conn, "clawhub")
+    assert "last_updated_at" not in states
+    assert not [key for key in states if key.startswith("etag:")]
+
+
+def test_completed_crawl_stores_watermarks(crawl, conn):
+    crawl()
+
+    states = get_crawl_states(conn, "clawhub")
+    assert states["last_updated_at"] == str(ITEMS[0]["updatedAt"])
+    assert states["etag:skill-1"] == '"skill-1"'
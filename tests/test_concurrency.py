@@ -0,0 +1,121 @@
+"""AIMD download concurrency: window decisions and slot accounting."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from crawlers.concurrency import AIMDController
+
+
+def window(ctl: AIMDController, latency_s: float = 0.1, *, failed: int = 0) -> None:
+    """Finish one evaluation window of `ctl.limit` downloads."""
+    n = ctl.limit
+    for i in range(n):
+        ctl.record(latency_s, failed=i < failed)
+
+
+def test_initial_limit_is_clamped():
+    assert AIMDController(16).limit == 4
+    assert AIMDController(2).limit == 2
+    assert AIMDController(8, initial=20).limit == 8
+    assert AIMDController(8, initial=1, floor=3).limit == 3
+
+
+def test_healthy_windows_add_one_slot_up_to_ceiling():
+    ctl = AIMDController(6, initial=2)
+    for _ in range(6):
+        window(ctl)
+
+    assert ctl.limit == 6
+    assert [d["to"] for d in ctl.decisions] == [3, 4, 5, 6]
+    assert all(d["reason"] == "healthy" for d in ctl.decisions)
+
+
+def test_throttling_halves_the_limit_down_to_floor():
+    ctl = AIMDController(16, initial=8, floor=3)
+    ctl.note_status(429)
+    window(ctl)
+    assert ctl.limit == 4
+    assert ctl.decisions[-1]["reason"] == "throttled"
+
+    ctl.note_status(503)
+    window(ctl)
+    assert ctl.limit == 3
+
+
+def test_errors_above_threshold_halve_the_limit():
+    ctl = AIMDController(16, initial=8)
+    window(ctl, failed=1)  # 12.5% > 10%
+    assert (ctl.limit, ctl.decisions[-1]["reason"]) == (4, "errors")
+
+    ctl.note_status(500)
+    ctl.note_failure()
+    window(ctl)  # 2 of 4
+    assert ctl.limit == 2
+
+
+def test_non_error_statuses_are_ignored():
+    ctl = AIMDController(16, initial=4)
+    ctl.note_status(404)
+    window(ctl)
+    assert ctl.limit == 5
+
+
+def test_latency_climb_holds_the_limit():
+    ctl = AIMDController(16, initial=4)
+    window(ctl, 0.1)
+    window(ctl, 0.5)  # 5x the best window: extra slots only queue
+    assert ctl.limit == 5
+
+    window(ctl, 0.15)
+    assert ctl.limit == 6
+    assert [d["reason"] for d in ctl.decisions] == ["healthy", "healthy"]
+
+
+def test_summary_reports_convergence():
+    ctl = AIMDController(8, initial=4, name="glama")
+    window(ctl)
+    ctl.note_status(429)
+    window(ctl)
+
+    summary = ctl.summary()
+    assert {k: summary[k] for k in ("initial", "final", "peak", "ceiling")} == {
+        "initial": 4, "final": 2, "peak": 5, "ceiling": 8}
+    assert [(d["from"], d["to"]) for d in summary["decisions"]] == [(4, 5), (5, 2)]
+
+
+def test_slots_are_bounded_by_the_limit():
+    ctl = AIMDController(2, initial=2)
+    assert ctl.try_acquire() and ctl.try_acquire()
+    assert not ctl.try_acquire()
+
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: (ctl.acquire(), acquired.set()))
+    waiter.start()
+    assert not acquired.wait(0.05)
+    ctl.release()
+    assert acquired.wait(1)
+    waiter.join()
+
+
+def test_async_acquire_waits_for_release():
+    ctl = AIMDController(1, initial=1)
+
+    async def run():
+        await ctl.async_acquire()
+        order = []
+
+        async def second():
+            await ctl.async_acquire()
+            order.append("second")
+            ctl.release()
+
+        task = asyncio.create_task(second())
+        await asyncio.sleep(0)
+        order.append("first")
+        ctl.release()
+        await task
+        return order
+
+    assert asyncio.run(run()) == ["first", "second"]
@@ -0,0 +1,275 @@
+"""Set-based DB helpers in crawlers.db, against an in-memory database."""
+
+from __future__ import annotations
+
+import time
+
+from crawlers.db import (
+    copy_findings,
+    create_scan,
+    diff_findings_latest,
+    get_live_slugs,
+    get_skill_hashes,
+    init_schema,
+    lease_api_quota,
+    mark_skills_deleted,
+    observe_api_quota,
+    reconcile_staged_findings,
+    release_api_quota,
+    stage_findings,
+    upsert_skills,
+)
+from crawlers.models import Finding, Severity
+
+
+def finding(rule_id: str, severity: Severity = Severity.HIGH, matched_text: str | None = "x",
+            category: str = "exfiltration") -> Finding:
+    return Finding(rule_id=rule_id, severity=severity, category=category, matched_text=matched_text)
+
+
+def latest(conn, skill_id: str) -> dict[str, int]:
+    """{rule_id: scan_id} of a skill's findings_latest rows."""
+    return dict(conn.execute(
+        "SELECT rule_id, scan_id FROM findings_latest WHERE skill_id = ?", (skill_id,),
+    ).fetchall())
+
+
+# --- Content hashes ---
+
+
+def test_saved_content_replaces_raw_hash(conn):
+    scraped = {"slug": "a", "content_hash": "canon", "raw_hash": "raw", "normalizer": "skills-sh/1"}
+    upsert_skills(conn, "skills-sh", [scraped, {**scraped, "slug": "b"}])
+    # Refetched from the repo: a profile hashed as-is carries no markers
+    upsert_skills(conn, "skills-sh", [{"slug": "a", "content_hash": "repo"}])
+    # Discovery rows without content keep the markers of the stored content
+    upsert_skills(conn, "skills-sh", [{"slug": "b", "name": "B"}])
+
+    assert conn.execute("SELECT slug, raw_hash, normalizer FROM skills ORDER BY slug").fetchall() == [
+        ("a", None, None), ("b", "raw", "skills-sh/1")]
+    assert get_skill_hashes(conn, ["skills-sh:a", "skills-sh:b"]) == {
+        "skills-sh:a": "repo", "skills-sh:b": "raw"}
+
+
+def test_content_blobs_group_by_stored_content(conn):
+    upsert_skills(conn, "glama", [
+        {"slug": "a", "content_hash": "canon", "raw_hash": "raw1", "normalizer": "glama/1"},
+        {"slug": "b", "content_hash": "canon", "raw_hash": "raw2", "normalizer": "glama/1"},
+    ])
+    upsert_skills(conn, "clawhub", [{"slug": "c", "content_hash": "raw1"}])
+    schema = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'content_blobs'").fetchone()
+    init_schema(conn)  # re-run: the view is left as is
+
+    assert conn.execute("SELECT sql FROM sqlite_master WHERE name = 'content_blobs'").fetchone() == schema
+    assert conn.execute(
+        "SELECT content_hash, representative, skills FROM content_blobs ORDER BY content_hash"
+    ).fetchall() == [("raw1", "clawhub:c", 2), ("raw2", "glama:b", 1)]
+
+
+# --- findings_latest diff ---
+
+
+def test_diff_findings_latest_writes_only_churn(conn, add_skills):
+    (skill,) = add_skills("glama", {"alpha": "h"})
+    first, second = create_scan(conn, "glama", "1"), create_scan(conn, "glama", "1")
+
+    assert diff_findings_latest(conn, skill, first, [finding("R1"), finding("R2")]) == (2, 0)
+    rescan = [finding("R1"), finding("R3")]
+    assert diff_findings_latest(conn, skill, second, rescan, batch_size=1) == (1, 1)
+    # The unchanged row keeps the scan that first reported it
+    assert latest(conn, skill) == {"R1": first, "R3": second}
+
+
+def test_diff_findings_latest_unchanged_is_a_no_op(conn, add_skills):
+    (skill,) = add_skills("glama", {"alpha": "h"})
+    first, second = create_scan(conn, "glama", "1"), create_scan(conn, "glama", "1")
+    diff_findings_latest(conn, skill, first, [finding("R1", matched_text=None)])
+
+    # NULL and empty matched_text are the same finding
+    assert diff_findings_latest(conn, skill, second, [finding("R1", matched_text="")]) == (0, 0)
+    assert latest(conn, skill) == {"R1": first}
+
+
+def test_diff_findings_latest_severity_is_part_of_identity(conn, add_skills):
+    (skill,) = add_skills("glama", {"alpha": "h"})
+    scan = create_scan(conn, "glama", "1")
+    diff_findings_latest(conn, skill, scan, [finding("R1", Severity.HIGH)])
+
+    assert diff_findings_latest(conn, skill, scan, [finding("R1", Severity.CRITICAL)]) == (1, 1)
+
+
+def test_diff_findings_latest_clean_scan_removes_all(conn, add_skills):
+    (skill,) = add_skills("glama", {"alpha": "h"})
+    scan = create_scan(conn, "glama", "1")
+    diff_findings_latest(conn, skill, scan, [finding("R1"), finding("R2")])
+
+    assert diff_findings_latest(conn, skill, scan, None) == (0, 2)
+    assert latest(conn, skill) == {}
+
+
+# --- Staged (set-based) ingest ---
+
+
+def score(conn, skill_id: str) -> tuple | None:
+    return conn.execute(
+        "SELECT score, grade, finding_count, last_scan_id FROM skill_scores WHERE skill_id = ?",
+        (skill_id,),
+    ).fetchone()
+
+
+def stage_scan(conn, staged: dict[str, list[Finding]]) -> int:
+    scan = create_scan(conn, "glama", "1")
+    stage_findings(conn, scan, [(skill, f) for skill, fs in staged.items() for f in fs], batch_size=2)
+    return scan
+
+
+def test_reconcile_full_scan(conn, add_skills):
+    alpha, beta, dup = add_skills("glama", {"alpha": "h1", "beta": "h2", "dup": "h1"})
+    first = stage_scan(conn, {alpha: [finding("R1")], beta: [finding("R2")], dup: [finding("R1")]})
+    reconcile_staged_findings(conn, first, "glama")
+
+    second = stage_scan(conn, {alpha: [finding("R1"), finding("R3", Severity.CRITICAL)]})
+    counts = reconcile_staged_findings(conn, second, "glama", skip=[dup])
+
+    assert counts == {"inserted": 1, "removed": 1, "skills_scanned": 2, "findings": 2}
+    assert latest(conn, alpha) == {"R1": first, "R3": second}
+    assert score(conn, alpha) == (60, "C", 2, second)
+    # Absent from the scan: scanned clean
+    assert latest(conn, beta) == {}
+    assert score(conn, beta) == (100, "A", 0, second)
+    # Left out on purpose: untouched
+    assert latest(conn, dup) == {"R1": first}
+    assert score(conn, dup) == (85, "B", 1, first)
+    assert conn.execute("SELECT COUNT(*) FROM findings_staging").fetchone()[0] == 0
+
+
+def test_reconcile_delta_scan_only_touches_staged_skills(conn, add_skills):
+    alpha, beta = add_skills("glama", {"alpha": "h1", "beta": "h2"})
+    first = stage_scan(conn, {alpha: [finding("R1")], beta: [finding("R2")]})
+    reconcile_staged_findings(conn, first, "glama")
+
+    second = stage_scan(conn, {alpha: [finding("R4")]})
+    counts = reconcile_staged_findings(conn, second, "glama", full=False)
+
+    assert counts == {"inserted": 1, "removed": 1, "skills_scanned": 1, "findings": 1}
+    assert latest(conn, alpha) == {"R4": second}
+    assert latest(conn, beta) == {"R2": first}
+    assert score(conn, beta) == (85, "B", 1, first)
+
+
+def test_reconcile_unchanged_score_is_not_rewritten(conn, add_skills):
+    (alpha,) = add_skills("glama", {"alpha": "h1"})
+    first = stage_scan(conn, {alpha: [finding("R1")]})
+    reconcile_staged_findings(conn, first, "glama")
+
+    second = stage_scan(conn, {alpha: [finding("R1")]})
+    counts = reconcile_staged_findings(conn, second, "glama")
+
+    assert counts["inserted"] == counts["removed"] == 0
+    assert score(conn, alpha) == (85, "B", 1, first)
+
+
+def test_copy_findings_mirrors_the_scanned_listing(conn, add_skills):
+    source, target, unscored, fresh = add_skills(
+        "glama", {"src": "h1", "copy": "h1", "unscored": "h1", "fresh": "h9"})
+    first = stage_scan(conn, {target: [finding("R3")]})
+    reconcile_staged_findings(conn, first, "glama", skip=[source, unscored, fresh])
+    second = stage_scan(conn, {source: [finding("R1"), finding("R2", Severity.CRITICAL)]})
+    reconcile_staged_findings(conn, second, "glama", full=False)
+
+    counts = copy_findings(conn, [(target, source), (fresh, unscored), (source, source)], batch_size=1)
+
+    assert (counts["inserted"], counts["removed"]) == (2, 1)
+    # Copied rows keep the scan that found them on the source
+    assert latest(conn, target) == {"R1": second, "R2": second}
+    assert score(conn, target) == score(conn, source)
+    # A source without a score leaves its target alone
+    assert latest(conn, fresh) == {}
+    assert score(conn, fresh) is None
+
+    again = copy_findings(conn, [(target, source)])
+    assert (again["inserted"], again["removed"]) == (0, 0)
+
+
+# --- Tombstones ---
+
+
+def test_mark_skills_deleted_hides_from_live_slugs(conn, add_skills):
+    add_skills("glama", {"alpha": None, "beta": None, "gamma": None})
+    add_skills("smithery", {"alpha": None})
+
+    assert mark_skills_deleted(conn, "glama", ["alpha", "gamma", "missing"], batch_size=1) == 2
+    assert get_live_slugs(conn, "glama") == {"beta"}
+    assert get_live_slugs(conn, "smithery") == {"alpha"}
+    # Already deleted rows are not counted again
+    assert mark_skills_deleted(conn, "glama", ["alpha"]) == 0
+
+
+def test_get_live_slugs_shard(conn, add_skills):
+    add_skills("skills-sh", {"acme_a__x": None, "zeta_b__y": None, "Mono_c__z": None})
+    assert get_live_slugs(conn, "skills-sh", shard="A-F") == {"acme_a__x"}
+    assert get_live_slugs(conn, "skills-sh", shard="M-R") == {"Mono_c__z"}
+
+
+def test_rediscovered_skill_is_revived(conn, add_skills):
+    add_skills("glama", {"alpha": None})
+    mark_skills_deleted(conn, "glama", ["alpha"])
+    upsert_skills(conn, "glama", [{"slug": "alpha"}])
+    assert get_live_slugs(conn, "glama") == {"alpha"}
+
+
+# --- Shared API quota ---
+
+GITHUB = "github:core"
+
+
+def pool(conn) -> int:
+    return conn.execute("SELECT remaining FROM api_quota WHERE resource = ?", (GITHUB,)).fetchone()[0]
+
+
+def test_lease_without_observation_grants_request(conn):
+    assert lease_api_quota(conn, GITHUB, "a", 50) == (50, None)
+
+
+def test_leases_share_the_pool_and_keep_the_reserve(conn):
+    reset_at = int(time.time()) + 3600
+    observe_api_quota(conn, GITHUB, 1000, reset_at)
+
+    assert lease_api_quota(conn, GITHUB, "a", 300, reserve=100) == (300, reset_at)
+    assert lease_api_quota(conn, GITHUB, "b", 700, reserve=100) == (600, reset_at)
+    assert lease_api_quota(conn, GITHUB, "a", 50, reserve=100) == (0, reset_at)
+    assert pool(conn) == 100
+    # Leases accumulate per holder
+    assert conn.execute(
+        "SELECT granted FROM api_quota_leases WHERE holder = 'a'").fetchone()[0] == 300
+
+
+def test_release_returns_unspent_budget(conn):
+    observe_api_quota(conn, GITHUB, 1000, int(time.time()) + 3600)
+    lease_api_quota(conn, GITHUB, "a", 300)
+
+    assert release_api_quota(conn, GITHUB, "a", used=50) == 250
+    assert pool(conn) == 950
+    assert conn.execute("SELECT COUNT(*) FROM api_quota_leases").fetchone()[0] == 0
+    assert release_api_quota(conn, GITHUB, "a", used=0) == 0
+
+
+def test_observe_only_shrinks_within_a_window(conn):
+    reset_at = int(time.time()) + 3600
+    observe_api_quota(conn, GITHUB, 1000, reset_at)
+    lease_api_quota(conn, GITHUB, "a", 200, used=20)
+
+    # Observations are net of the budget leased out but not yet spent (200 - 20)
+    observe_api_quota(conn, GITHUB, 990, reset_at)  # stale header from another shard
+    assert pool(conn) == 800
+    observe_api_quota(conn, GITHUB, 500, reset_at)
+    assert pool(conn) == 500 - 180
+
+    # A new window restarts from the observation minus budget unspent in live leases
+    observe_api_quota(conn, GITHUB, 5000, reset_at + 3600)
+    assert pool(conn) == 5000 - 180
+
+
+def test_lease_after_reset_grants_request(conn):
+    observe_api_quota(conn, GITHUB, 0, int(time.time()) - 1)
+    assert lease_api_quota(conn, GITHUB, "a", 50)[0] == 50
@@ -0,0 +1,33 @@
+"""Set-based scan ingest: a failed reconcile leaves the previous results intact."""
+
+from __future__ import annotations
+
+import pytest
+
+from scanner import ingest
+from scanner.ingest import bulk_ingest_scan_results
+
+
+def scan_result(*rule_ids: str) -> dict:
+    return {"findings": [{"file_path": "/scan/glama/alpha.md", "rule_id": rule_id,
+                          "severity": "HIGH", "category": "exfiltration", "matched_text": "x"}
+                         for rule_id in rule_ids]}
+
+
+def test_failed_reconcile_is_rolled_back(conn, add_skills, monkeypatch):
+    (alpha,) = add_skills("glama", {"alpha": "h"})
+    first = bulk_ingest_scan_results(conn, scan_result("R1"), "glama")
+
+    def reconcile(conn, scan_id, registry_id, **kwargs):
+        conn.execute("DELETE FROM findings_latest")
+        raise RuntimeError("stream closed")
+
+    monkeypatch.setattr(ingest, "reconcile_staged_findings", reconcile)
+    with pytest.raises(RuntimeError):
+        bulk_ingest_scan_results(conn, scan_result("R2"), "glama")
+
+    assert conn.execute("SELECT rule_id, scan_id FROM findings_latest WHERE skill_id = ?",
+                        (alpha,)).fetchall() == [("R1", first)]
+    assert conn.execute("SELECT COUNT(*) FROM findings_staging").fetchone()[0] == 0
+    assert conn.execute("SELECT status, error FROM scans ORDER BY id").fetchall() == [
+        ("completed", None), ("failed", "stream closed")]
@@ -0,0 +1,81 @@
+"""mcp.so incremental sweeps: page digests only vouch for pages whose items were processed."""
+
+from __future__ import annotations
+
+import lxml.html
+import pytest
+
+from crawlers.db import get_crawl_states
+from crawlers.mcp_so import McpSoCrawler
+from crawlers.models import CrawlResult
+
+LISTING = {
+    1: ["alpha", "beta"],
+    2: ["gamma", "delta"],
+}
+
+
+def cards(slugs: list[str]) -> list:
+    return [lxml.html.fromstring(f'<a href="/server/{slug}">{slug}</a>') for slug in slugs]
+
+
+class ListingCrawler(McpSoCrawler):
+    """mcp.so crawler over a fixed listing; `crash_on` fails the crawl while saving that slug."""
+
+    def __init__(self, conn, *, listing=LISTING, crash_on=None, **kwargs):
+        super().__init__(conn, **kwargs)
+        self.listing = listing
+        self.crash_on = crash_on
+        self.downloaded: list[str] = []
+
+    def _fetch_listing_page(self, page, *, url=None):
+        return cards(self.listing[page]) if page in self.listing else []
+
+    def download(self, slug, **kwargs):
+        self.downloaded.append(slug)
+        content = f"# {slug}\n"
+        new_hash, canon = self.canonical_hash(content)
+        return CrawlResult(skill_id=f"mcp-so:{slug}", slug=slug, content=content,
+                           content_hash=new_hash, content_size=len(content), **canon)
+
+    def _save_content(self, slug, content):
+        if slug == self.crash_on:
+            raise OSError("disk full")
+        super()._save_content(slug, content)
+
+
+@pytest.fixture
+def sweep(conn, tmp_path):
+    def run(**kwargs):
+        crawler = ListingCrawler(conn, output_dir=tmp_path / "mcp-so", crawl_mode="incremental",
+                                 **kwargs)
+        crawler.crawl()
+        return crawler
+
+    return run
+
+
+def listing_state(conn) -> dict[str, str]:
+    return {k: v for k, v in get_crawl_states(conn, "mcp-so").items()
+            if k.startswith("listing_hash:") or k == "last_full_sweep"}
+
+
+def test_failed_sweep_records_no_digests(sweep, conn):
+    with pytest.raises(OSError):
+        sweep(crash_on="gamma")
+
+    assert listing_state(conn) == {}
+
+
+def test_completed_sweep_records_digests(sweep, conn):
+    sweep()
+
+    assert set(listing_state(conn)) == {"listing_hash:1", "listing_hash:2", "last_full_sweep"}
+
+
+def test_unchanged_pages_skipped_on_next_sweep(sweep, conn):
+    sweep()
+    conn.execute("DELETE FROM crawl_state WHERE key = 'last_full_sweep'")
+    crawler = sweep(listing={**LISTING, 2: ["gamma", "epsilon"]})
+
+    assert sorted(crawler.downloaded) == ["epsilon", "gamma"]
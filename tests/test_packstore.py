@@ -0,0 +1,123 @@
+"""Packed content store: writes, replay order across writers, compaction."""
+
+from __future__ import annotations
+
+import hashlib
+
+from crawlers.packstore import MAGIC, PACK_DIR, PackStore, import_files
+
+
+def sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def test_put_get_dedupes_blobs(tmp_path):
+    store = PackStore(tmp_path, writer="a")
+    assert store.put("owner/repo:skill", "# one\n") == sha("# one\n")
+    store.put("other", "# one\n")
+    store.put("two", "# two\n")
+
+    # Readable before the segment is sealed
+    assert store.get("owner/repo:skill") == "# one\n"
+    store.close()
+
+    reopened = PackStore(tmp_path)
+    assert reopened.get("owner/repo:skill") == "# one\n"
+    assert "owner_repo_skill" in reopened and "missing" not in reopened
+    assert reopened.summary()["skills"] == 3
+    assert reopened.summary()["blobs"] == 2
+    assert store.stats["put"] == 3 and store.stats["stored"] == 2
+
+
+def test_rewriting_same_content_appends_no_index_entry(tmp_path):
+    store = PackStore(tmp_path, writer="a")
+    store.put("s", "x")
+    store.put("s", "x")
+    store.close()
+    assert (tmp_path / PACK_DIR / "a.idx").read_text().splitlines() == [f"s\t{sha('x')}"]
+
+
+def test_later_writer_wins_on_replay(tmp_path):
+    for writer, content in (("20250102", "new"), ("20250101", "old")):
+        store = PackStore(tmp_path, writer=writer)
+        store.put("s", content)
+        store.close()
+
+    assert PackStore(tmp_path).get("s") == "new"
+
+
+def test_legacy_import_replays_first(tmp_path):
+    store = PackStore(tmp_path, writer="20250101")
+    store.put("s", "crawled")
+    store.close()
+    (tmp_path / "s.md").write_text("legacy")
+    (tmp_path / "t.md").write_text("only legacy")
+
+    assert import_files(tmp_path) == 2
+    assert not list(tmp_path.glob("*.md"))
+    assert PackStore(tmp_path).get("s") == "crawled"
+    assert PackStore(tmp_path).get("t") == "only legacy"
+
+
+def test_torn_tail_keeps_earlier_records(tmp_path):
+    store = PackStore(tmp_path, writer="a")
+    store.put("s", "kept")
+    store.put("t", "torn " * 100)
+    store.close()
+    pack = tmp_path / PACK_DIR / "a.pack"
+    pack.write_bytes(pack.read_bytes()[:-10])
+
+    reopened = PackStore(tmp_path)
+    assert reopened.get("s") == "kept"
+    # The index line points at a blob that never fully landed
+    assert reopened.get("t") is None
+    assert "t" not in reopened
+
+
+def test_foreign_segment_is_ignored(tmp_path):
+    (tmp_path / PACK_DIR).mkdir()
+    (tmp_path / PACK_DIR / "junk.pack").write_bytes(b"NOTAPACK" + b"\0" * 64)
+    store = PackStore(tmp_path, writer="a")
+    store.put("s", "x")
+    store.close()
+    assert PackStore(tmp_path).get("s") == "x"
+
+
+def test_compact_keeps_latest_entries_and_drops_the_rest(tmp_path):
+    for writer, items in (("1", {"a": "a1", "b": "b1"}), ("2", {"a": "a2", "c": "c1"})):
+        store = PackStore(tmp_path, writer=writer)
+        for slug, content in items.items():
+            store.put(slug, content)
+        store.close()
+
+    store = PackStore(tmp_path, writer="3")
+    assert store.compact(keep=["a", "b"]) == {"segments_removed": 2, "skills": 2, "blobs": 2}
+
+    files = sorted(p.name for p in (tmp_path / PACK_DIR).iterdir())
+    assert files == ["3-compact.idx", "3-compact.pack"]
+    assert (tmp_path / PACK_DIR / "3-compact.pack").read_bytes().startswith(MAGIC)
+    compacted = PackStore(tmp_path)
+    assert compacted.index() == {"a": sha("a2"), "b": sha("b1")}
+    assert compacted.get("a") == "a2"
+
+
+def test_close_compacts_when_segments_pile_up(tmp_path):
+    for writer in "123":
+        store = PackStore(tmp_path, writer=writer)
+        store.put(f"s{writer}", writer)
+        store.close(compact_above=2)
+
+    assert len(list((tmp_path / PACK_DIR).glob("*.pack"))) == 1
+    assert PackStore(tmp_path).index() == {f"s{w}": sha(w) for w in "123"}
+
+
+def test_materialise_subset(tmp_path):
+    store = PackStore(tmp_path / "data", writer="a")
+    store.put("owner/repo", "# repo\n")
+    store.put("other", "# other\n")
+    store.close()
+
+    out = tmp_path / "scan"
+    assert store.materialise(out, ["owner/repo", "missing"]) == 1
+    assert (out / "owner_repo.md").read_text() == "# repo\n"
+    assert store.materialise(out) == 2
@@ -0,0 +1,115 @@
+"""Listing pagination: end detection, truncated walks and incremental page filters."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from crawlers.pagination import afetch_pages, changed_pages_only, fetch_pages, listing_walk, new_items_only
+
+
+def listing(pages: dict[int, list | None]):
+    """fetch() over a fixed listing; pages not in it are past the end (empty)."""
+    def fetch(page):
+        return pages.get(page, [])
+
+    return fetch
+
+
+def walk(fetch, **kwargs):
+    stopped = []
+    got = list(fetch_pages(fetch, on_incomplete=stopped.append, **kwargs))
+    return got, stopped
+
+
+def test_empty_page_is_the_end():
+    # Pages 5+ are fetched speculatively alongside page 4 and must be discarded
+    got, stopped = walk(lambda page: [page] if page != 4 else [], concurrency=4)
+    assert got == [(1, [1]), (2, [2]), (3, [3])]
+    assert stopped == []
+
+
+def test_repeated_page_is_the_end():
+    # Out-of-range page numbers are clamped to the last page
+    got, stopped = walk(lambda page: [f"x{min(page, 3)}", f"y{min(page, 3)}"], key=str)
+    assert [page for page, _ in got] == [1, 2, 3]
+    assert stopped == []
+
+
+def test_repeated_page_without_key_is_not_detected():
+    got, _ = walk(lambda page: ["same"], max_pages=3)
+    assert len(got) == 3
+
+
+def test_pages_yield_in_order_whatever_finishes_first():
+    def fetch(page):
+        time.sleep(0.01 * (6 - page))  # later pages answer sooner
+        return [page] if page <= 5 else []
+
+    got, _ = walk(fetch, concurrency=5)
+    assert [page for page, _ in got] == [1, 2, 3, 4, 5]
+
+
+def test_failed_page_is_reported_not_taken_for_the_end():
+    got, stopped = walk(listing({1: ["a"], 2: None, 3: ["c"]}), concurrency=3)
+    assert got == [(1, ["a"])]
+    assert stopped == [2]
+
+
+def test_safety_limit_is_reported():
+    got, stopped = walk(lambda page: [page], max_pages=5)
+    assert [page for page, _ in got] == [1, 2, 3, 4, 5]
+    assert stopped == [5]
+
+
+def test_known_last_page_is_complete():
+    got, stopped = walk(lambda page: [page], start=2, last=4)
+    assert [page for page, _ in got] == [2, 3, 4]
+    assert stopped == []
+
+
+def test_afetch_pages_reports_failed_page():
+    async def fetch(page):
+        return None if page == 3 else [page]
+
+    async def run():
+        stopped = []
+        got = [item async for item in afetch_pages(fetch, last=5, on_incomplete=stopped.append)]
+        return got, stopped
+
+    got, stopped = asyncio.run(run())
+    assert [page for page, _ in got] == [1, 2]
+    assert stopped == [3]
+
+
+def test_new_items_only_stops_at_first_known_page():
+    known = {"c", "d"}
+    pages = [(1, ["a", "b"]), (2, ["b2", "c"]), (3, ["d"]), (4, ["e"])]
+
+    got = list(new_items_only(iter(pages), key=str, known=known))
+    assert got == [(1, ["a", "b"]), (2, ["b2"])]
+    assert known == {"a", "b", "b2", "c", "d"}
+
+
+def test_changed_pages_only_skips_unchanged_digests():
+    state: dict[str, str] = {}
+
+    def run(pages, **kwargs):
+        return [page for page, _ in changed_pages_only(
+            iter(pages), key=str, get_state=state.get, set_state=state.__setitem__, **kwargs)]
+
+    assert run([(1, ["a", "b"]), (2, ["c"])]) == [1, 2]
+    assert set(state) == {"listing_hash:1", "listing_hash:2"}
+    assert run([(1, ["a", "b"]), (2, ["c", "d"])]) == [2]
+    # Order matters: a reordered page is a changed page
+    assert run([(1, ["b", "a"]), (2, ["c", "d"])]) == [1]
+    assert run([(1, ["b", "a"]), (2, ["c", "d"])], skip_unchanged=False) == [1, 2]
+
+
+def test_listing_walk_schedules_full_sweeps():
+    now = time.time()
+    assert listing_walk("full", None) == "full"
+    assert listing_walk("incremental", None) == "sweep"
+    assert listing_walk("incremental", "garbage") == "sweep"
+    assert listing_walk("incremental", str(now - 60), interval_s=3600) == "newest"
+    assert listing_walk("incremental", str(now - 7200), interval_s=3600) == "sweep"
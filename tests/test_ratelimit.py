@@ -0,0 +1,131 @@
+"""Token buckets and response-driven throttling, on a fake clock."""
+
+from __future__ import annotations
+
+from email.utils import formatdate
+
+import pytest
+
+from crawlers import ratelimit
+from crawlers.ratelimit import BASE_BACKOFF_S, HostRateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.epoch = 1_700_000_000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.epoch + self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    return clock
+
+
+def test_bucket_allows_burst_then_spaces_calls(clock):
+    bucket = TokenBucket(1.0, burst=3)
+    assert [bucket.reserve() for _ in range(5)] == [0.0, 0.0, 0.0, 1.0, 2.0]
+
+    clock.now += 2.0  # refills the two tokens borrowed above
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_bucket_refill_is_capped_at_burst(clock):
+    bucket = TokenBucket(1.0, burst=2)
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 1.0]
+
+
+def test_block_until_holds_every_caller(clock):
+    bucket = TokenBucket(0.1, burst=5)
+    bucket.block_until(clock.now + 30)
+    assert bucket.reserve() == pytest.approx(30)
+    bucket.block_until(clock.now + 10)  # an earlier deadline never shortens the block
+    assert bucket.reserve() == pytest.approx(30)
+    clock.now += 30
+    assert bucket.reserve() == 0.0
+
+
+def test_pace_widens_interval_until_deadline(clock):
+    bucket = TokenBucket(0.1)
+    bucket.pace(5.0, until=clock.now + 60)
+    bucket.reserve()
+    assert bucket.reserve() == pytest.approx(5.0)
+
+    clock.now += 120
+    bucket.reserve()
+    assert bucket.reserve() == pytest.approx(0.1)
+
+
+def test_buckets_keyed_by_longest_prefix(clock):
+    limiter = HostRateLimiter(500, limits={"clawhub.ai": (100, 1), "clawhub.ai/api/v1/download": (3000, 1)})
+
+    assert limiter.bucket("https://clawhub.ai/api/v1/download?slug=x").interval_s == 3.0
+    assert limiter.bucket("https://clawhub.ai/api/v1/skills").interval_s == 0.1
+    assert limiter.bucket("https://example.com/x").interval_s == 0.5
+    assert limiter.bucket("https://example.com/y") is limiter.bucket("https://example.com/x")
+    assert limiter.bucket() is not limiter.bucket("https://example.com/x")
+
+
+def test_observe_retry_after_blocks_host(clock):
+    limiter = HostRateLimiter(100)
+    statuses = []
+    limiter.on_status = statuses.append
+    limiter.observe("https://api.github.com/x", 429, {"Retry-After": "30"})
+
+    assert statuses == [429]
+    assert limiter.bucket("https://api.github.com/y").reserve() == pytest.approx(30)
+    assert limiter.bucket("https://raw.githubusercontent.com/y").reserve() == 0.0
+
+
+def test_observe_retry_after_http_date(clock):
+    limiter = HostRateLimiter(100)
+    limiter.observe("https://h/x", 503, {"retry-after": formatdate(clock.time() + 60, usegmt=True)})
+    assert limiter.bucket("https://h/x").reserve() == pytest.approx(60, abs=1)
+
+
+def test_observe_backs_off_exponentially_without_retry_after(clock):
+    limiter = HostRateLimiter(100)
+    bucket = limiter.bucket("https://h/x")
+    for strike in range(3):
+        limiter.observe("https://h/x", 429, {})
+        assert bucket.reserve() == pytest.approx(BASE_BACKOFF_S * 2 ** strike)
+        clock.now += 1000
+
+    limiter.observe("https://h/x", 200, {})
+    assert bucket.strikes == 0
+
+
+def test_observe_exhausted_quota_blocks_until_reset(clock):
+    limiter = HostRateLimiter(100)
+    reset = int(clock.time()) + 600
+    limiter.observe("https://api.github.com/x", 200,
+                    {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)})
+    assert limiter.bucket("https://api.github.com/x").reserve() == pytest.approx(600)
+
+
+def test_observe_low_quota_spreads_remaining_calls(clock):
+    limiter = HostRateLimiter(100)
+    bucket = limiter.bucket("https://h/x")
+    # IETF-style relative reset: 5 calls left for the next 100 seconds
+    limiter.observe("https://h/x", 200, {"RateLimit-Remaining": "5", "RateLimit-Reset": "100"})
+    bucket.reserve()
+    assert bucket.reserve() == pytest.approx(20)
+
+
+def test_observe_ignores_healthy_quota(clock):
+    limiter = HostRateLimiter(100)
+    limiter.observe("https://h/x", 200, {"X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": "100"})
+    bucket = limiter.bucket("https://h/x")
+    bucket.reserve()
+    assert bucket.reserve() == pytest.approx(0.1)
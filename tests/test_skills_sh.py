@@ -0,0 +1,125 @@
+"""skills.sh crawler: large repos are served from one archive during a real crawl()."""
+
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from crawlers import skills_sh
+from crawlers.db import get_crawl_states
+from crawlers.skills_sh import SkillsShCrawler
+
+REPO_SKILLS = [f"skill-{i:02d}" for i in range(15)]
+
+
+def _sitemap(skills: list[str]) -> bytes:
+    urls = "".join(
+        f"<url><loc>https://skills.sh/acme/tools/{skill}</loc><lastmod>2025-01-02</lastmod></url>"
+        for skill in skills
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+    ).encode()
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, url: str, headers: dict | None = None):
+        self.status_code = 200
+        self.headers = headers or {}
+        self.url = url
+        self.raw = io.BytesIO(body)
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeGitHub:
+    """Unauthenticated client whose only working source is repo archives."""
+
+    token = ""
+
+    def __init__(self, files: dict[str, str]):
+        self.files = files
+        self.archive_calls: list[tuple[str, str]] = []
+        self.raw_calls = 0
+
+    def archive_files(self, org, repo, want):
+        self.archive_calls.append((org, repo))
+        return {path: text for path, text in self.files.items() if want(path)}
+
+    def raw(self, org, repo, path):
+        self.raw_calls += 1
+        return None
+
+    def tree(self, org, repo):
+        return None
+
+
+@pytest.fixture
+def crawler(conn, tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        skills_sh.requests, "get",
+        lambda url, **kwargs: FakeResponse(_sitemap(REPO_SKILLS), url, {"ETag": '"v1"'}),
+    )
+    crawler = SkillsShCrawler(conn, output_dir=tmp_path / "skills-sh", crawl_mode="full",
+                              archive_min_skills=10)
+    crawler.github = FakeGitHub({f"skills/{s}/SKILL.md": f"# {s}\n" for s in REPO_SKILLS})
+    return crawler
+
+
+def test_crawl_fetches_large_repo_as_one_archive(crawler):
+    stats = crawler.crawl()
+
+    assert crawler._repo_skill_counts == {"acme/tools": len(REPO_SKILLS)}
+    assert crawler.github.archive_calls == [("acme", "tools")]
+    assert crawler.github.raw_calls == 0
+    assert stats["downloaded"] == len(REPO_SKILLS)
+    assert crawler.store.get("acme_tools__skill-03") == "# skill-03\n"
+
+
+def test_crawl_concurrent_uses_archive(crawler):
+    crawler.max_workers = 4
+    stats = crawler.crawl()
+
+    assert crawler.github.archive_calls == [("acme", "tools")]
+    assert stats["downloaded"] == len(REPO_SKILLS)
+
+
+def test_small_repo_is_not_archived(crawler, monkeypatch):
+    monkeypatch.setattr(crawler, "_scrape_skills_sh", lambda url: None)
+    crawler.archive_min_skills = len(REPO_SKILLS) + 1
+    stats = crawler.crawl()
+
+    assert crawler.github.archive_calls == []
+    assert crawler.github.raw_calls > 0
+    assert stats["failed"] == len(REPO_SKILLS)
+
+
+def test_sitemap_etag_waits_for_downloads(crawler, conn, monkeypatch):
+    save = crawler._save_content
+
+    def crash_on(slug, content):
+        if slug == "acme_tools__skill-07":
+            raise OSError("disk full")
+        save(slug, content)
+
+    monkeypatch.setattr(crawler, "_save_content", crash_on)
+    with pytest.raises(OSError):
+        crawler.crawl()
+    # A stored ETag would turn the next incremental run into a 304 no-op
+    assert "sitemap_etag" not in get_crawl_states(conn, "skills-sh")
+
+    monkeypatch.setattr(crawler, "_save_content", save)
+    crawler.crawl()
+    assert get_crawl_states(conn, "skills-sh")["sitemap_etag"] == '"v1"'